@@ -0,0 +1,70 @@
+import threading
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI
+from starlette.routing import BaseRoute, Match
+from starlette.types import Receive, Scope, Send
+
+
+class LazyRouter(BaseRoute):
+    """
+    Stands in for the routes of an endpoint module until the first request
+    under its prefix, then imports the module and serves its routes.
+
+    Matching order and route templates are those of an eager
+    include_router; the routes are left out of the generated OpenAPI schema
+    until load_lazy_routers() puts them in place.
+    """
+
+    def __init__(self, app: FastAPI, prefix: str, module: str, tags: List[str]) -> None:
+        self.app = app
+        self.prefix = prefix
+        self.module = module
+        self.tags = tags
+        self._router: Optional[APIRouter] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> APIRouter:
+        if self._router is None:
+            with self._lock:
+                if self._router is None:
+                    router = APIRouter(dependency_overrides_provider=self.app)
+                    router.include_router(import_module(self.module).router, prefix=self.prefix, tags=self.tags)
+                    self._router = router
+        return self._router
+
+    def matches(self, scope: Scope) -> Tuple[Match, Dict[str, Any]]:
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path == self.prefix or path.startswith(self.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # The module's own router matches the route, or answers 404/405
+        await self.load()(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params: Any) -> Any:
+        return self.load().url_path_for(name, **path_params)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._router is not None else "not loaded"
+        return f"<LazyRouter {self.prefix} -> {self.module} ({state})>"
+
+
+def load_lazy_routers(app: FastAPI) -> int:
+    """
+    Import every lazily included module and put its routes in place of the
+    stand-in; returns how many modules were loaded
+    """
+    routes: List[BaseRoute] = []
+    loaded = 0
+    for route in app.router.routes:
+        if isinstance(route, LazyRouter):
+            routes.extend(route.load().routes)
+            loaded += 1
+        else:
+            routes.append(route)
+    app.router.routes[:] = routes
+    return loaded
@@ -1,13 +1,50 @@
-from fastapi import APIRouter
-
-from app.api.v1.endpoints import auth, users, tasks, equipment, parts, reports, trips, knowledge
-
-api_router = APIRouter()
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-api_router.include_router(equipment.router, prefix="/equipment", tags=["equipment"])
-api_router.include_router(parts.router, prefix="/parts", tags=["parts"])
-api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
-api_router.include_router(trips.router, prefix="/trips", tags=["trips"])
-api_router.include_router(knowledge.router, prefix="/knowledge", tags=["knowledge"])
\ No newline at end of file
+from importlib import import_module
+from typing import List, Tuple
+
+from fastapi import APIRouter, FastAPI
+
+from app.api.lazy import LazyRouter
+
+# Endpoint modules of app.api.v1.endpoints in matching order: (module, prefix, tags)
+ROUTERS: List[Tuple[str, str, List[str]]] = [
+    ("auth", "/auth", ["auth"]),
+    ("users", "/users", ["users"]),
+    ("tasks", "/tasks", ["tasks"]),
+    ("equipment", "/equipment", ["equipment"]),
+    ("parts", "/parts", ["parts"]),
+    ("inventory", "/inventory", ["inventory"]),
+    ("reports", "/reports", ["reports"]),
+    ("trips", "/trips", ["trips"]),
+    ("knowledge", "/knowledge", ["knowledge"]),
+    ("uploads", "/uploads", ["uploads"]),
+    ("files", "/files", ["files"]),
+    ("jobs", "/jobs", ["jobs"]),
+    ("maintenance", "/maintenance", ["maintenance"]),
+    ("dashboard", "/dashboard", ["dashboard"]),
+    ("sync", "/sync", ["sync"]),
+    ("audit", "/audit", ["audit"]),
+    ("metrics", "/metrics", ["metrics"]),
+]
+
+
+def _module(name: str) -> str:
+    return f"app.api.v1.endpoints.{name}"
+
+
+def build_api_router() -> APIRouter:
+    api_router = APIRouter()
+    for name, prefix, tags in ROUTERS:
+        api_router.include_router(import_module(_module(name)).router, prefix=prefix, tags=tags)
+    return api_router
+
+
+def include_api_routers(app: FastAPI, prefix: str, lazy: bool = False) -> None:
+    """
+    Add the API routes to the app. Lazily, each endpoint module (and what it
+    imports) is only loaded by the first request under its prefix.
+    """
+    if not lazy:
+        app.include_router(build_api_router(), prefix=prefix)
+        return
+    for name, router_prefix, tags in ROUTERS:
+        app.router.routes.append(LazyRouter(app, prefix + router_prefix, _module(name), tags))
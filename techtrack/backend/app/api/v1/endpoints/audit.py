@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_active_superuser, get_db
+from app.models.user import User
+from app.schemas.audit import AuditEvent
+from app.schemas.pagination import CursorPage
+from app.services.audit import audit_log, get_audit_events
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[AuditEvent])
+def read_audit_events(
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    entity: Optional[str] = Query(None, description="Table name: users, tasks or equipment"),
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Retrieve the audit log, latest first.
+
+    Other processes write their records within a few seconds.
+    """
+    if since and until and since >= until:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="since must be before until",
+        )
+    # Records still buffered in this process
+    audit_log.flush()
+    try:
+        events, next_cursor = get_audit_events(
+            db, cursor=cursor, limit=limit, entity=entity, entity_id=entity_id,
+            actor_id=actor_id, since=since, until=until,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": events, "next_cursor": next_cursor, "total": None}
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db
+from app.schemas.token import Token
+from app.services.auth import login_user_async
+
+router = APIRouter()
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    db: AsyncSession = Depends(get_async_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
+) -> Any:
+    """
+    OAuth2 compatible token login, get an access token for future requests.
+    """
+    return await login_user_async(db, form_data.username, form_data.password)
@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.models.user import User
+from app.schemas.dashboard import DashboardStats
+from app.services.dashboard import get_dashboard_stats_async
+
+router = APIRouter()
+
+
+@router.get("/stats", response_model=DashboardStats)
+async def read_dashboard_stats(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Task and equipment counters from the precomputed dashboard snapshot.
+    """
+    snapshot = await get_dashboard_stats_async(db)
+    return {**snapshot.data, "refreshed_at": snapshot.refreshed_at}
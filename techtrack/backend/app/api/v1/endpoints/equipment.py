@@ -0,0 +1,144 @@
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_superuser, get_current_active_user
+from app.core.http_cache import (
+    REFERENCE_DATA_POLICY,
+    REVALIDATE_POLICY,
+    cached_version,
+    conditional_response,
+    make_etag,
+)
+from app.models.equipment import Equipment
+from app.models.part import Part
+from app.models.report import Report
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.equipment import Equipment as EquipmentSchema
+from app.schemas.equipment import EquipmentStatus
+from app.schemas.nested import EquipmentDetail
+from app.schemas.pagination import CursorPage
+from app.services.bulk_import import detect_format, import_equipment, stream_import
+from app.services.equipment import (
+    get_equipment_async,
+    get_equipment_list_async,
+    get_equipment_list_version_async,
+    get_equipment_version_async,
+)
+from app.services.export import EXPORT_FORMATS, export_table
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[EquipmentSchema])
+async def read_equipment_list(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    city: Optional[str] = None,
+    equipment_status: Optional[EquipmentStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve equipment, one keyset page at a time.
+
+    Supports If-None-Match revalidation.
+    """
+    filters = {"city": city, "status": equipment_status}
+    version = await cached_version(
+        f"equipment:{city}:{equipment_status}",
+        lambda: get_equipment_list_version_async(db, **filters),
+        tags=[Equipment.__tablename__],
+    )
+    etag = make_etag(request, *version)
+
+    async def load() -> Any:
+        items, next_cursor = await get_equipment_list_async(db, cursor=cursor, limit=limit, **filters)
+        return {"items": items, "next_cursor": next_cursor, "total": None}
+
+    try:
+        return await conditional_response(
+            request, etag, REFERENCE_DATA_POLICY, load, CursorPage[EquipmentSchema]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/import")
+def import_equipment_route(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    chunk_size: int = Query(1000, ge=1, le=5000),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Bulk upsert equipment by serial number from CSV or JSONL.
+
+    Progress and per-row errors are streamed back as NDJSON, one line per chunk.
+    """
+    try:
+        fmt = detect_format(file.filename, fmt)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return StreamingResponse(
+        stream_import(import_equipment, file.file, fmt, chunk_size=chunk_size),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/export")
+def export_equipment_route(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    city: Optional[str] = None,
+    equipment_status: Optional[EquipmentStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Stream equipment as NDJSON or CSV with constant memory.
+    """
+    return StreamingResponse(
+        export_table(Equipment.__table__, fmt, filters={"city": city, "status": equipment_status}),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="equipment.{fmt}"'},
+    )
+
+
+@router.get("/{equipment_id}", response_model=EquipmentDetail)
+async def read_equipment(
+    request: Request,
+    equipment_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get equipment with its tasks, parts and reports.
+
+    Supports If-None-Match revalidation.
+    """
+    version = await cached_version(
+        f"equipment:{equipment_id}",
+        lambda: get_equipment_version_async(db, equipment_id),
+        tags=[model.__tablename__ for model in (Equipment, Task, Part, Report)],
+    )
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Equipment not found",
+        )
+    return await conditional_response(
+        request,
+        make_etag(request, *version),
+        REVALIDATE_POLICY,
+        lambda: get_equipment_async(db, equipment_id),
+        EquipmentDetail,
+    )
@@ -0,0 +1,82 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.core.http_cache import file_response
+from app.core.storage import storage
+from app.models.upload import FileBlob
+from app.models.user import User
+from app.services.upload import can_read_blob, get_blob
+
+router = APIRouter()
+
+SHA256_PATTERN = "^[0-9a-f]{64}$"
+
+
+def _opens_inline(media_type: str) -> bool:
+    """
+    Whether a browser may show an uploaded file in place: photos and PDFs.
+    Anything else, SVG included, could run script in the API's origin.
+    """
+    return media_type == "application/pdf" or (
+        media_type.startswith("image/") and media_type != "image/svg+xml"
+    )
+
+
+async def _get_blob(db: AsyncSession, sha256: str, current_user: User) -> FileBlob:
+    blob = await db.run_sync(get_blob, sha256)
+    # Files the user may not read are reported as missing, so that a known
+    # hash doesn't tell whether the content is stored
+    if blob is None or not await db.run_sync(can_read_blob, blob, current_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found",
+        )
+    return blob
+
+
+@router.get("/{sha256}")
+async def read_file(
+    request: Request,
+    sha256: str = Path(..., pattern=SHA256_PATTERN),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download an uploaded file; supports Range requests and revalidation.
+    """
+    blob = await _get_blob(db, sha256, current_user)
+    media_type = blob.content_type or "application/octet-stream"
+    return file_response(
+        request,
+        storage.local_path(blob.storage_key),
+        media_type,
+        etag=f'"{blob.sha256}"',
+        inline=_opens_inline(media_type.split(";")[0].strip().lower()),
+    )
+
+
+@router.get("/{sha256}/thumbnail")
+async def read_file_thumbnail(
+    request: Request,
+    sha256: str = Path(..., pattern=SHA256_PATTERN),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    JPEG preview of an uploaded photo; 404 until the worker has made it.
+    """
+    blob = await _get_blob(db, sha256, current_user)
+    if not blob.thumbnail_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not ready",
+        )
+    return file_response(
+        request,
+        storage.local_path(blob.thumbnail_key),
+        "image/jpeg",
+        etag=f'"{blob.sha256}-thumbnail"',
+    )
@@ -0,0 +1,246 @@
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_active_superuser, get_current_active_user, get_db
+from app.models.user import User
+from app.schemas.inventory import (
+    CompatiblePart,
+    ReservationStatus,
+    StockLevel,
+    StockMovement,
+    StockMovementCreate,
+    StockReservation,
+    StockReservationCreate,
+    StockTransferCreate,
+    Warehouse,
+    WarehouseCreate,
+)
+from app.schemas.pagination import CursorPage
+from app.schemas.part import Part as PartSchema
+from app.services.inventory import (
+    StockConflict,
+    consume_reservation,
+    create_warehouse,
+    find_compatible_parts,
+    get_movements,
+    get_reservation,
+    get_reservations,
+    get_stock_levels,
+    get_warehouses,
+    record_movement,
+    release_reservation,
+    reserve_part,
+    transfer_stock,
+)
+
+router = APIRouter()
+
+
+def _stock_error(e: ValueError) -> HTTPException:
+    # Not enough stock is a conflict with the current state, not a bad request
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT if isinstance(e, StockConflict) else status.HTTP_400_BAD_REQUEST,
+        detail=str(e),
+    )
+
+
+@router.get("/warehouses", response_model=List[Warehouse])
+def read_warehouses(
+    db: Session = Depends(get_db),
+    include_inactive: bool = False,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve warehouses.
+    """
+    return get_warehouses(db, include_inactive=include_inactive)
+
+
+@router.post("/warehouses", response_model=Warehouse)
+def create_warehouse_route(
+    *,
+    db: Session = Depends(get_db),
+    warehouse_in: WarehouseCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Create new warehouse.
+    """
+    try:
+        return create_warehouse(db, warehouse_in)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/stock", response_model=List[StockLevel])
+def read_stock(
+    db: Session = Depends(get_db),
+    part_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Stock on hand, reserved and available, per part and warehouse.
+    """
+    if part_id is None and warehouse_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Filter by part_id or warehouse_id",
+        )
+    return get_stock_levels(db, part_id=part_id, warehouse_id=warehouse_id)
+
+
+@router.get("/compatible", response_model=List[CompatiblePart])
+def read_compatible_parts(
+    equipment_type: str,
+    db: Session = Depends(get_db),
+    year: Optional[int] = Query(None, ge=1950, le=2100),
+    warehouse_id: Optional[int] = None,
+    in_stock: bool = False,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Parts that fit the equipment type and year, most available first.
+    """
+    rows = find_compatible_parts(
+        db, equipment_type, year=year, warehouse_id=warehouse_id, in_stock=in_stock, limit=limit
+    )
+    return [
+        CompatiblePart(
+            **PartSchema.model_validate(part, from_attributes=True).model_dump(), available=available
+        )
+        for part, available in rows
+    ]
+
+
+@router.get("/movements", response_model=CursorPage[StockMovement])
+def read_movements(
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    part_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve the stock ledger, latest first.
+    """
+    try:
+        movements, next_cursor = get_movements(
+            db, cursor=cursor, limit=limit, part_id=part_id, warehouse_id=warehouse_id, task_id=task_id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": movements, "next_cursor": next_cursor, "total": None}
+
+
+@router.post("/movements", response_model=StockMovement, status_code=status.HTTP_201_CREATED)
+def create_movement(
+    *,
+    db: Session = Depends(get_db),
+    movement_in: StockMovementCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Record a receipt, an issue or a correction in the stock ledger.
+    """
+    try:
+        return record_movement(db, movement_in, current_user.id)
+    except ValueError as e:
+        raise _stock_error(e)
+
+
+@router.post("/transfers", response_model=List[StockMovement], status_code=status.HTTP_201_CREATED)
+def create_transfer(
+    *,
+    db: Session = Depends(get_db),
+    transfer_in: StockTransferCreate,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Move parts between warehouses, e.g. into an engineer's van.
+    """
+    try:
+        return transfer_stock(db, transfer_in, current_user.id)
+    except ValueError as e:
+        raise _stock_error(e)
+
+
+@router.get("/reservations", response_model=List[StockReservation])
+def read_reservations(
+    db: Session = Depends(get_db),
+    task_id: Optional[int] = None,
+    part_id: Optional[int] = None,
+    reservation_status: Optional[ReservationStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve reservations of a task or a part.
+    """
+    return get_reservations(db, task_id=task_id, part_id=part_id, status=reservation_status)
+
+
+@router.post("/reservations", response_model=StockReservation, status_code=status.HTTP_201_CREATED)
+def create_reservation(
+    *,
+    db: Session = Depends(get_db),
+    reservation_in: StockReservationCreate,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Reserve parts for a task; 409 when not enough are available.
+    """
+    try:
+        return reserve_part(db, reservation_in, current_user.id)
+    except ValueError as e:
+        raise _stock_error(e)
+
+
+def _get_reservation_or_404(db: Session, reservation_id: int) -> None:
+    if get_reservation(db, reservation_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reservation not found",
+        )
+
+
+@router.post("/reservations/{reservation_id}/release", response_model=StockReservation)
+def release_reservation_route(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Return reserved parts to the available stock.
+    """
+    _get_reservation_or_404(db, reservation_id)
+    try:
+        return release_reservation(db, reservation_id)
+    except ValueError as e:
+        raise _stock_error(e)
+
+
+@router.post("/reservations/{reservation_id}/consume", response_model=StockReservation)
+def consume_reservation_route(
+    reservation_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Issue reserved parts from stock to the task.
+    """
+    _get_reservation_or_404(db, reservation_id)
+    try:
+        return consume_reservation(db, reservation_id, current_user.id)
+    except ValueError as e:
+        raise _stock_error(e)
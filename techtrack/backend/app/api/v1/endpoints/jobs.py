@@ -0,0 +1,106 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_active_superuser, get_current_active_user, get_db
+from app.models.user import User
+from app.schemas.job import Job, JobCreate, JobStatus
+from app.schemas.pagination import CursorPage
+from app.services.jobs import cancel_job, enqueue_job, get_job, get_jobs
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[Job])
+def read_jobs(
+    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    kind: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve background jobs, latest first; users see only their own.
+    """
+    created_by_id = None if current_user.is_superuser else current_user.id
+    try:
+        jobs, next_cursor = get_jobs(
+            db, cursor=cursor, limit=limit, status=job_status, kind=kind, created_by_id=created_by_id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": jobs, "next_cursor": next_cursor, "total": None}
+
+
+@router.post("/", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def create_job(
+    *,
+    db: Session = Depends(get_db),
+    job_in: JobCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Queue a background job; poll GET /jobs/{job_id} for its result.
+    """
+    try:
+        return enqueue_job(
+            db,
+            job_in.kind,
+            job_in.payload,
+            priority=job_in.priority,
+            run_at=job_in.run_at,
+            max_attempts=job_in.max_attempts,
+            dedupe_key=job_in.dedupe_key,
+            created_by_id=current_user.id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+def _get_visible_job(db: Session, job_id: int, current_user: User) -> Any:
+    job = get_job(db, job_id)
+    if not job or (not current_user.is_superuser and job.created_by_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+    return job
+
+
+@router.get("/{job_id}", response_model=Job)
+def read_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get job status, result or last error.
+    """
+    return _get_visible_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+def cancel_job_route(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Cancel a job that hasn't started yet.
+    """
+    _get_visible_job(db, job_id, current_user)
+    try:
+        return cancel_job(db, job_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
@@ -0,0 +1,104 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.core.http_cache import (
+    REFERENCE_DATA_POLICY,
+    REVALIDATE_POLICY,
+    cached_version,
+    conditional_response,
+    make_etag,
+)
+from app.models.knowledge import KnowledgeItem
+from app.models.user import User
+from app.schemas.knowledge import KnowledgeItem as KnowledgeItemSchema
+from app.schemas.knowledge import KnowledgeItemCreate, KnowledgeSearchResult
+from app.services.knowledge import (
+    create_knowledge_item,
+    get_knowledge_item,
+    get_knowledge_item_version,
+    get_knowledge_version,
+    search_knowledge,
+)
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=KnowledgeSearchResult)
+async def search_knowledge_route(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Ranked full-text search over manuals and fault procedures.
+
+    Supports If-None-Match revalidation.
+    """
+    version = await cached_version(
+        "knowledge", lambda: db.run_sync(get_knowledge_version), tags=[KnowledgeItem.__tablename__]
+    )
+    etag = make_etag(request, *version)
+    try:
+        return await conditional_response(
+            request,
+            etag,
+            REVALIDATE_POLICY,
+            lambda: db.run_sync(search_knowledge, q, category=category, tag=tag, limit=limit),
+            KnowledgeSearchResult,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/", response_model=KnowledgeItemSchema)
+async def create_knowledge_item_route(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    item_in: KnowledgeItemCreate,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Create new knowledge item.
+    """
+    return await db.run_sync(create_knowledge_item, item_in, current_user.id)
+
+
+@router.get("/{item_id}", response_model=KnowledgeItemSchema)
+async def read_knowledge_item(
+    request: Request,
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a specific knowledge item by id.
+
+    Supports If-None-Match revalidation.
+    """
+    version = await cached_version(
+        f"knowledge:{item_id}",
+        lambda: db.run_sync(get_knowledge_item_version, item_id),
+        tags=[KnowledgeItem.__tablename__],
+    )
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Knowledge item not found",
+        )
+    return await conditional_response(
+        request,
+        make_etag(request, *version),
+        REFERENCE_DATA_POLICY,
+        lambda: db.run_sync(get_knowledge_item, item_id),
+        KnowledgeItemSchema,
+    )
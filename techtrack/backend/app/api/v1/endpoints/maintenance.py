@@ -0,0 +1,55 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_active_superuser, get_current_active_user, get_db
+from app.models.user import User
+from app.schemas.job import Job
+from app.schemas.maintenance import MaintenanceRule, MaintenanceRuleCreate
+from app.services.jobs import enqueue_job
+from app.services.maintenance import create_maintenance_rule, get_maintenance_rules
+
+router = APIRouter()
+
+
+@router.get("/rules", response_model=List[MaintenanceRule])
+def read_maintenance_rules(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve maintenance rules.
+    """
+    return get_maintenance_rules(db)
+
+
+@router.post("/rules", response_model=MaintenanceRule)
+def create_maintenance_rule_route(
+    *,
+    db: Session = Depends(get_db),
+    rule_in: MaintenanceRuleCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Create new maintenance rule; matching equipment is evaluated on the next run.
+    """
+    try:
+        return create_maintenance_rule(db, rule_in, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/run", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def run_maintenance_route(
+    full: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Queue a maintenance run; the job result holds the run statistics.
+    """
+    return enqueue_job(db, "maintenance.run", {"full": full}, priority=10, created_by_id=current_user.id)
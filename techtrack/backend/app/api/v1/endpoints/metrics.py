@@ -0,0 +1,23 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_current_active_superuser
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine
+from app.models.user import User
+
+router = APIRouter()
+
+
+@router.get("/db-pool")
+async def read_db_pool_metrics(
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Connection pool occupancy and checkout wait times.
+    """
+    return {
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
@@ -0,0 +1,90 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.core.http_cache import REFERENCE_DATA_POLICY, cached_version, conditional_response, make_etag
+from app.models.part import Part
+from app.models.user import User
+from app.schemas.pagination import CursorPage
+from app.schemas.part import Part as PartSchema
+from app.schemas.part import PartStatus
+from app.services.part import (
+    get_part_async,
+    get_part_version_async,
+    get_parts_async,
+    get_parts_version_async,
+)
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[PartSchema])
+async def read_parts(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    equipment_id: Optional[int] = None,
+    equipment_type: Optional[str] = None,
+    part_status: Optional[PartStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve the parts catalog, one keyset page at a time.
+
+    Supports If-None-Match revalidation.
+    """
+    filters = {"equipment_id": equipment_id, "equipment_type": equipment_type, "status": part_status}
+    version = await cached_version(
+        f"parts:{equipment_id}:{equipment_type}:{part_status}",
+        lambda: get_parts_version_async(db, **filters),
+        tags=[Part.__tablename__],
+    )
+    etag = make_etag(request, *version)
+
+    async def load() -> Any:
+        parts, next_cursor = await get_parts_async(db, cursor=cursor, limit=limit, **filters)
+        return {"items": parts, "next_cursor": next_cursor, "total": None}
+
+    try:
+        return await conditional_response(
+            request, etag, REFERENCE_DATA_POLICY, load, CursorPage[PartSchema]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/{part_id}", response_model=PartSchema)
+async def read_part(
+    request: Request,
+    part_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a specific part by id.
+
+    Supports If-None-Match revalidation.
+    """
+    version = await cached_version(
+        f"parts:{part_id}",
+        lambda: get_part_version_async(db, part_id),
+        tags=[Part.__tablename__],
+    )
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Part not found",
+        )
+    return await conditional_response(
+        request,
+        make_etag(request, *version),
+        REFERENCE_DATA_POLICY,
+        lambda: get_part_async(db, part_id),
+        PartSchema,
+    )
@@ -0,0 +1,100 @@
+import os
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_active_superuser, get_current_active_user, get_db
+from app.core.http_cache import file_response
+from app.models.report import Report
+from app.models.user import User
+from app.schemas.job import Job
+from app.schemas.report import RenderedReport, ReportFormat, ReportRenderRequest, ReportType
+from app.services.export import EXPORT_FORMATS, export_table
+from app.services.jobs import enqueue_job
+from app.services.report import render_report, report_file_path
+from app.services.report_render import REPORT_MEDIA_TYPES
+
+router = APIRouter()
+
+
+@router.get("/export")
+def export_reports_route(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    report_type: Optional[ReportType] = Query(None, alias="type"),
+    task_id: Optional[int] = None,
+    equipment_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Stream reports as NDJSON or CSV with constant memory.
+    """
+    filters = {"type": report_type, "task_id": task_id, "equipment_id": equipment_id}
+    return StreamingResponse(
+        export_table(Report.__table__, fmt, filters=filters),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="reports.{fmt}"'},
+    )
+
+
+@router.post("/render", response_model=Job, status_code=status.HTTP_202_ACCEPTED)
+def render_reports_route(
+    *,
+    db: Session = Depends(get_db),
+    render_in: ReportRenderRequest,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Queue rendering of many reports, e.g. all of a month; the job result has the counts.
+    """
+    if not render_in.report_ids and not (render_in.year and render_in.month):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give report_ids or a year and month",
+        )
+    return enqueue_job(
+        db, "reports.render", render_in.model_dump(exclude_none=True), created_by_id=current_user.id
+    )
+
+
+@router.post("/{report_id}/render", response_model=RenderedReport)
+def render_report_route(
+    report_id: int,
+    fmt: ReportFormat = Query("pdf", alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Render a service report and return its file URL; unchanged reports are not rendered again.
+    """
+    try:
+        file_url = render_report(db, report_id, fmt)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    return {"report_id": report_id, "format": fmt, "file_url": file_url}
+
+
+@router.get("/files/{file_name}")
+def read_report_file(
+    file_name: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download a rendered report; supports Range requests and revalidation.
+    """
+    try:
+        path = report_file_path(file_name)
+    except ValueError:
+        path = None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report file not found",
+        )
+    digest, _, fmt = file_name.partition(".")
+    return file_response(request, path, REPORT_MEDIA_TYPES[fmt], etag=f'"{digest}"', filename=file_name)
@@ -0,0 +1,59 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.models.user import User
+from app.schemas.sync import SyncBatch, SyncBatchResult, SyncChanges
+from app.services.sync import SyncConflict, SyncForbidden, apply_batch, get_changes
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=SyncChanges)
+async def read_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Rows changed or deleted since the given sync token.
+
+    Call again with next_token while has_more is true.
+    """
+    try:
+        return await db.run_sync(get_changes, since, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.post("/batch", response_model=SyncBatchResult)
+async def apply_sync_batch(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch: SyncBatch,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Apply queued offline mutations in one transaction, all or nothing.
+
+    409 on a conflict, 403 when the user may not make one of the changes.
+    """
+    try:
+        results = await db.run_sync(apply_batch, batch.mutations, current_user)
+    except SyncForbidden as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={"index": e.index, "message": e.detail},
+        )
+    except SyncConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"index": e.index, "message": e.detail},
+        )
+    return {"results": results}
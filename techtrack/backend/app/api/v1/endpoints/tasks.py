@@ -0,0 +1,123 @@
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_async_db, get_current_active_superuser, get_current_active_user
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.nested import TaskDetail, TaskListItem
+from app.schemas.pagination import CursorPage
+from app.schemas.task import TaskStatus
+from app.services.bulk_import import detect_format, import_tasks, stream_import
+from app.services.export import EXPORT_FORMATS, export_table
+from app.services.task import get_task_async, get_tasks_async
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[TaskListItem])
+async def read_tasks(
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    city: Optional[str] = None,
+    assigned_to_id: Optional[int] = None,
+    equipment_id: Optional[int] = None,
+    trip_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve tasks with their equipment, assignee, author and trip, newest first.
+    """
+    try:
+        tasks, next_cursor = await get_tasks_async(
+            db,
+            cursor=cursor,
+            limit=limit,
+            status=task_status,
+            city=city,
+            assigned_to_id=assigned_to_id,
+            equipment_id=equipment_id,
+            trip_id=trip_id,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": tasks, "next_cursor": next_cursor, "total": None}
+
+
+@router.post("/import")
+def import_tasks_route(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    chunk_size: int = Query(1000, ge=1, le=5000),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Bulk insert tasks from CSV or JSONL.
+
+    Progress and per-row errors are streamed back as NDJSON, one line per chunk.
+    """
+    try:
+        fmt = detect_format(file.filename, fmt)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return StreamingResponse(
+        stream_import(
+            import_tasks, file.file, fmt, created_by_id=current_user.id, chunk_size=chunk_size
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/export")
+def export_tasks_route(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    city: Optional[str] = None,
+    assigned_to_id: Optional[int] = None,
+    equipment_id: Optional[int] = None,
+    trip_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Stream tasks as NDJSON or CSV with constant memory.
+    """
+    filters = {
+        "status": task_status,
+        "city": city,
+        "assigned_to_id": assigned_to_id,
+        "equipment_id": equipment_id,
+        "trip_id": trip_id,
+    }
+    return StreamingResponse(
+        export_table(Task.__table__, fmt, filters=filters),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"'},
+    )
+
+
+@router.get("/{task_id}", response_model=TaskDetail)
+async def read_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a task with its relationships and reports.
+    """
+    task = await get_task_async(db, task_id)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found",
+        )
+    return task
@@ -0,0 +1,94 @@
+from typing import Any, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import (
+    get_async_db,
+    get_current_active_superuser,
+    get_current_active_user,
+    get_db,
+)
+from app.models.user import User
+from app.schemas.nested import TripDetail, TripListItem
+from app.schemas.pagination import CursorPage
+from app.schemas.route_plan import TripPlan, TripPlanRequest
+from app.schemas.trip import TripStatus
+from app.services.route_planner import PlanConflict, plan_trips
+from app.services.trip import get_trip_async, get_trips_async
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CursorPage[TripListItem])
+async def read_trips(
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    user_id: Optional[int] = None,
+    trip_status: Optional[TripStatus] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve trips with their engineer, latest first.
+    """
+    try:
+        trips, next_cursor = await get_trips_async(
+            db, cursor=cursor, limit=limit, user_id=user_id, status=trip_status
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return {"items": trips, "next_cursor": next_cursor, "total": None}
+
+
+@router.post("/plan", response_model=TripPlan)
+def plan_trips_route(
+    *,
+    db: Session = Depends(get_db),
+    plan_in: TripPlanRequest,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Plan multi-day itineraries for engineers over the open tasks; with
+    commit, 409 when a task was put on another trip meanwhile.
+
+    Runs in the threadpool: planning 500 tasks is CPU work of a few seconds.
+    """
+    try:
+        return plan_trips(
+            db,
+            engineer_ids=plan_in.engineer_ids,
+            start_date=plan_in.start_date,
+            days=plan_in.days,
+            cities=plan_in.cities,
+            service_minutes=plan_in.service_minutes,
+            commit=plan_in.commit,
+        )
+    except ValueError as e:
+        # A task taken meanwhile is a conflict with the current state
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT if isinstance(e, PlanConflict) else status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+
+@router.get("/{trip_id}", response_model=TripDetail)
+async def read_trip(
+    trip_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get a trip with its tasks.
+    """
+    trip = await get_trip_async(db, trip_id)
+    if not trip:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trip not found",
+        )
+    return trip
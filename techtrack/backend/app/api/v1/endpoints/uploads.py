@@ -0,0 +1,238 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app.core.config import settings
+from app.core.dependencies import get_async_db, get_current_active_user
+from app.models.upload import Upload
+from app.models.user import User
+from app.schemas.upload import Upload as UploadSchema
+from app.schemas.upload import UploadCreate
+from app.services.jobs import enqueue_job
+from app.services.upload import (
+    UploadBusy,
+    abort_upload,
+    create_upload,
+    finalize_upload,
+    get_uploads,
+    lock_upload_file,
+    record_offset,
+    write_chunk,
+)
+
+router = APIRouter()
+
+# Content type of upload chunks, as in the tus protocol
+CHUNK_CONTENT_TYPE = "application/offset+octet-stream"
+
+# One chunk at a time per upload in this process, checked before the file
+# lock that serializes chunks across processes
+_upload_locks: Dict[str, asyncio.Lock] = {}
+
+
+def _offset_headers(upload: Upload) -> Dict[str, str]:
+    return {
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store",
+    }
+
+
+async def _get_own_upload(db: AsyncSession, upload_id: str, current_user: User) -> Upload:
+    upload = await db.get(Upload, upload_id)
+    if not upload or (upload.created_by_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload not found",
+        )
+    return upload
+
+
+async def _request_body(request: Request) -> AsyncIterator[bytes]:
+    # A dropped connection just ends the chunk; what arrived is kept
+    try:
+        async for data in request.stream():
+            yield data
+    except ClientDisconnect:
+        return
+
+
+async def _enqueue_thumbnail(db: AsyncSession, upload: Upload) -> None:
+    if (upload.content_type or "").startswith("image/"):
+        await db.run_sync(
+            enqueue_job, "uploads.thumbnail", {"blob_id": upload.blob_id},
+            dedupe_key=f"uploads.thumbnail:{upload.blob_id}",
+        )
+
+
+@router.get("/", response_model=List[UploadSchema])
+async def read_uploads(
+    db: AsyncSession = Depends(get_async_db),
+    report_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Retrieve completed uploads attached to a report or a task.
+    """
+    created_by_id = None if report_id or task_id or current_user.is_superuser else current_user.id
+    return await db.run_sync(get_uploads, report_id=report_id, task_id=task_id, created_by_id=created_by_id)
+
+
+@router.post("/", response_model=UploadSchema, status_code=status.HTTP_201_CREATED)
+async def create_upload_route(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    upload_in: UploadCreate,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Start a resumable upload, then send the file with PATCH in chunks.
+    """
+    try:
+        upload = await db.run_sync(create_upload, upload_in, current_user.id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+    if upload.length == 0 and upload.status != "complete":
+        upload_id = upload.id
+        await run_in_threadpool(finalize_upload, upload_id)
+        db.expire_all()
+        upload = await db.get(Upload, upload_id)
+    response.headers["Location"] = f"{settings.API_V1_STR}/uploads/{upload.id}"
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@router.head("/{upload_id}")
+async def read_upload_offset(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Offset to resume the upload from.
+    """
+    upload = await _get_own_upload(db, upload_id, current_user)
+    return Response(headers=_offset_headers(upload))
+
+
+@router.get("/{upload_id}", response_model=UploadSchema)
+async def read_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Get upload progress and, once complete, the file URL.
+    """
+    return await _get_own_upload(db, upload_id, current_user)
+
+
+@router.patch("/{upload_id}", response_model=UploadSchema)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    content_type: str = Header(..., alias="Content-Type"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Append a chunk at Upload-Offset; the body is streamed to disk.
+
+    A wrong offset is a 409: ask HEAD for the current one and resume there.
+    """
+    if content_type.split(";")[0].strip() != CHUNK_CONTENT_TYPE:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Chunks must be sent as {CHUNK_CONTENT_TYPE}",
+        )
+    upload = await _get_own_upload(db, upload_id, current_user)
+    lock = _upload_locks.setdefault(upload_id, asyncio.Lock())
+    if lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another chunk of this upload is being received",
+        )
+    try:
+        async with lock:
+            try:
+                with lock_upload_file(upload_id):
+                    # The upload may have moved on in another process
+                    await db.refresh(upload)
+                    if upload.status == "complete" or upload_offset != upload.offset:
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Upload is at offset {upload.offset}",
+                            headers=_offset_headers(upload),
+                        )
+                    # Return the connection to the pool while the body streams
+                    # in; record_offset's compare-and-swap catches any change
+                    await db.commit()
+                    try:
+                        new_offset = await write_chunk(upload, upload_offset, _request_body(request))
+                    except ValueError as e:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=str(e),
+                        )
+                    if not await db.run_sync(record_offset, upload_id, upload_offset, new_offset):
+                        raise HTTPException(
+                            status_code=status.HTTP_409_CONFLICT,
+                            detail="Upload was changed by another request",
+                        )
+                    if new_offset == upload.length:
+                        try:
+                            _, created = await run_in_threadpool(finalize_upload, upload_id)
+                        except ValueError as e:
+                            raise HTTPException(
+                                status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=str(e),
+                            )
+                    else:
+                        created = False
+            except UploadBusy:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Another chunk of this upload is being received",
+                )
+    finally:
+        if not lock.locked() and _upload_locks.get(upload_id) is lock:
+            del _upload_locks[upload_id]
+
+    db.expire_all()
+    upload = await db.get(Upload, upload_id)
+    if created:
+        # Thumbnails are made by the workers, off the request path
+        await _enqueue_thumbnail(db, upload)
+    response.headers.update(_offset_headers(upload))
+    return upload
+
+
+@router.delete("/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_upload(
+    upload_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Response:
+    """
+    Abort an unfinished upload and drop the received data.
+    """
+    upload = await _get_own_upload(db, upload_id, current_user)
+    try:
+        await db.run_sync(abort_upload, upload)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
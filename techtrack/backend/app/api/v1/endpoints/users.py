@@ -1,45 +1,57 @@
-from typing import Any, List
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import (
     get_current_active_superuser,
     get_current_active_user,
-    get_db,
+    get_async_db,
 )
 from app.models.user import User
+from app.schemas.pagination import CursorPage
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.bulk_import import detect_format, import_users, stream_import
 from app.services.user import (
-    create_user,
-    delete_user,
-    get_user_by_id,
-    get_users,
-    update_user,
+    count_users_async,
+    create_user_async,
+    delete_user_async,
+    get_user_by_id_async,
+    get_users_async,
+    update_user_async,
 )
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[UserSchema])
-def read_users(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+@router.get("/", response_model=CursorPage[UserSchema])
+async def read_users(
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    with_total: bool = False,
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users, one keyset page at a time.
     """
-    users = get_users(db, skip=skip, limit=limit)
-    return users
+    try:
+        users, next_cursor = await get_users_async(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    total = await count_users_async(db) if with_total else None
+    return {"items": users, "next_cursor": next_cursor, "total": total}
 
 
 @router.post("/", response_model=UserSchema)
-def create_user_route(
+async def create_user_route(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserCreate,
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
@@ -47,7 +59,7 @@ def create_user_route(
     Create new user.
     """
     try:
-        user = create_user(db, user_in)
+        user = await create_user_async(db, user_in)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,8 +68,33 @@ def create_user_route(
     return user
 
 
+@router.post("/import")
+def import_users_route(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    chunk_size: int = Query(1000, ge=1, le=5000),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Bulk insert users from CSV or JSONL, skipping taken emails/usernames.
+
+    Progress and per-row errors are streamed back as NDJSON, one line per chunk.
+    """
+    try:
+        fmt = detect_format(file.filename, fmt)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return StreamingResponse(
+        stream_import(import_users, file.file, fmt, chunk_size=chunk_size),
+        media_type="application/x-ndjson",
+    )
+
+
 @router.get("/me", response_model=UserSchema)
-def read_user_me(
+async def read_user_me(
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -67,30 +104,30 @@ def read_user_me(
 
 
 @router.put("/me", response_model=UserSchema)
-def update_user_me(
+async def update_user_me(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_in: UserUpdate,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Update own user.
     """
-    user = update_user(db, current_user, user_in)
+    user = await update_user_async(db, current_user, user_in)
     return user
 
 
 @router.get("/{user_id}", response_model=UserSchema)
-def read_user_by_id(
+async def read_user_by_id(
     user_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get a specific user by id.
     """
-    user = get_user_by_id(db, user_id)
-    if user == current_user:
+    user = await get_user_by_id_async(db, user_id)
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -106,9 +143,9 @@ def read_user_by_id(
 
 
 @router.put("/{user_id}", response_model=UserSchema)
-def update_user_route(
+async def update_user_route(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     user_in: UserUpdate,
     current_user: User = Depends(get_current_active_superuser),
@@ -116,27 +153,27 @@ def update_user_route(
     """
     Update a user.
     """
-    user = get_user_by_id(db, user_id)
+    user = await get_user_by_id_async(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-    user = update_user(db, user, user_in)
+    user = await update_user_async(db, user, user_in)
     return user
 
 
 @router.delete("/{user_id}", response_model=UserSchema)
-def delete_user_route(
+async def delete_user_route(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
     Delete a user.
     """
-    user = delete_user(db, user_id)
+    user = await delete_user_async(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,357 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from anyio import to_thread
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional: only needed for CACHE_URL=redis://...
+    redis = None
+
+
+class CacheBackend:
+    """
+    Minimal key/value store the cache runs on. Values are strings.
+    """
+
+    # Whether calls do network I/O and must be kept off the event loop
+    blocking = False
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        raise NotImplementedError
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        """
+        Set only if the key is absent; True when it was set
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        """
+        Increment a counter that never expires
+        """
+        raise NotImplementedError
+
+    def incr_many(self, keys: List[str]) -> None:
+        for key in keys:
+            self.incr(key)
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU with per-key TTL; private to one worker process
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Kept out of the LRU: an evicted counter could restart at an old value
+        self._counters: Dict[str, int] = {}
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                if key in self._counters:
+                    values.append(str(self._counters[key]))
+                    continue
+                entry = self._entries.get(key)
+                if entry is None or entry[0] < now:
+                    self._entries.pop(key, None)
+                    values.append(None)
+                    continue
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+        return values
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return False
+            self._entries[key] = (time.monotonic() + ttl, value)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Backend on any Redis-protocol server, shared by all worker processes.
+
+    Takes a client created with decode_responses=True; fakeredis works for
+    local runs and tests. Tag counters have no TTL, so the server should
+    not evict keys without one (noeviction or a volatile-* policy).
+
+    The client is synchronous. Async endpoints reach it through a thread,
+    except for services they run with AsyncSession.run_sync, which call it
+    on the event loop: those only invalidate tags after a commit, which is
+    one pipelined round-trip per write request, well under the cost of the
+    commit before it.
+    """
+
+    blocking = True
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return self.client.mget(keys) if keys else []
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def add(self, key: str, value: str, ttl: int) -> bool:
+        return bool(self.client.set(key, value, ex=ttl, nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(key)
+
+    def incr_many(self, keys: List[str]) -> None:
+        if not keys:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.incr(key)
+        pipe.execute()
+
+
+def create_cache_backend(url: Optional[str]) -> CacheBackend:
+    """
+    Backend for CACHE_URL: memory:// (or unset) or redis://, rediss://
+    """
+    if not url or url.startswith("memory://"):
+        return MemoryCacheBackend(settings.CACHE_MAX_ENTRIES)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        if redis is None:
+            raise RuntimeError("CACHE_URL points to Redis but the redis package is not installed")
+        return RedisCacheBackend(redis.Redis.from_url(url, decode_responses=True))
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Cache:
+    """
+    Namespaced JSON cache with TTLs, tags and single-flight loading.
+
+    Tags are generation counters: an entry records the generation of each of
+    its tags when it was loaded, and invalidating a tag bumps the counter, so
+    every entry carrying it becomes a miss without being enumerated. An entry
+    loaded while a write was invalidating its tags records the old
+    generation and is never served.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        default_ttl: int,
+        lock_timeout: float = 10,
+    ) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.lock_timeout = lock_timeout
+        self._thread_locks: Dict[str, threading.Lock] = {}
+        self._async_locks: Dict[str, asyncio.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    # Synchronous API (services, workers, run_sync callers)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._lookup(key)[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        tags = list(tags)
+        self._store(key, value, ttl, dict(zip(tags, self._generations(tags))))
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._key(key))
+
+    def invalidate_tags(self, *tags: str) -> None:
+        self.backend.incr_many([self._tag_key(tag) for tag in tags])
+
+    def get_or_set(
+        self,
+        key: str,
+        load: Callable[[], Any],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Cached value, or the result of `load` stored under the key.
+
+        Concurrent misses of the same key load once: threads of this process
+        wait on a lock, other processes on a short-lived lock key.
+        """
+        tags = list(tags)
+        found, value = self._lookup(key)
+        if found:
+            return value
+        with self._thread_lock(key):
+            found, value = self._lookup(key)
+            if found:
+                return value
+            token = self._acquire(key)
+            while token is None:
+                time.sleep(0.05)
+                found, value = self._lookup(key)
+                if found:
+                    return value
+                token = self._acquire(key)
+            try:
+                generations = dict(zip(tags, self._generations(tags)))
+                value = load()
+                self._store(key, value, ttl, generations)
+                return value
+            finally:
+                self._release(key, token)
+
+    # Asynchronous API (endpoints); blocking backends run in a thread
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.backend.blocking:
+            return await to_thread.run_sync(fn, *args)
+        return fn(*args)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        return (await self._call(self._lookup, key))[1]
+
+    async def set_async(
+        self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()
+    ) -> None:
+        await self._call(self.set, key, value, ttl, list(tags))
+
+    async def invalidate_tags_async(self, *tags: str) -> None:
+        await self._call(self.invalidate_tags, *tags)
+
+    async def get_or_set_async(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Async `get_or_set`; concurrent misses in this process share one load
+        """
+        tags = list(tags)
+        found, value = await self._call(self._lookup, key)
+        if found:
+            return value
+        lock = self._async_locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                found, value = await self._call(self._lookup, key)
+                if found:
+                    return value
+                token = await self._call(self._acquire, key)
+                while token is None:
+                    await asyncio.sleep(0.05)
+                    found, value = await self._call(self._lookup, key)
+                    if found:
+                        return value
+                    token = await self._call(self._acquire, key)
+                try:
+                    generations = dict(zip(tags, await self._call(self._generations, tags)))
+                    value = await load()
+                    await self._call(self._store, key, value, ttl, generations)
+                    return value
+                finally:
+                    await self._call(self._release, key, token)
+        finally:
+            if not lock.locked() and self._async_locks.get(key) is lock:
+                del self._async_locks[key]
+
+    # Internals
+
+    def _generations(self, tags: List[str]) -> List[str]:
+        return [g or "0" for g in self.backend.get_many([self._tag_key(t) for t in tags])]
+
+    def _store(self, key: str, value: Any, ttl: Optional[int], generations: Dict[str, str]) -> None:
+        payload = json.dumps({"v": value, "t": generations}, default=_encode, separators=(",", ":"))
+        self.backend.set(self._key(key), payload, ttl or self.default_ttl)
+
+    def _lookup(self, key: str) -> Tuple[bool, Optional[Any]]:
+        raw = self.backend.get_many([self._key(key)])[0]
+        if raw is None:
+            return False, None
+        entry = json.loads(raw)
+        tags = list(entry["t"])
+        if tags and self._generations(tags) != [entry["t"][t] for t in tags]:
+            return False, None
+        return True, entry["v"]
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            if len(self._thread_locks) > 10000:
+                self._thread_locks = {k: v for k, v in self._thread_locks.items() if v.locked()}
+            return self._thread_locks.setdefault(key, threading.Lock())
+
+    def _acquire(self, key: str) -> Optional[str]:
+        # Cross-process lock; it expires on its own if the holder dies
+        token = uuid.uuid4().hex
+        ttl = max(1, int(self.lock_timeout))
+        return token if self.backend.add(self._key(f"lock:{key}"), token, ttl) else None
+
+    def _release(self, key: str, token: str) -> None:
+        lock_key = self._key(f"lock:{key}")
+        if self.backend.get_many([lock_key])[0] == token:
+            self.backend.delete(lock_key)
+
+
+cache = Cache(
+    create_cache_backend(settings.CACHE_URL),
+    namespace=settings.CACHE_NAMESPACE,
+    default_ttl=settings.CACHE_DEFAULT_TTL_SECONDS,
+    lock_timeout=settings.CACHE_LOCK_TIMEOUT_SECONDS,
+)
@@ -2,7 +2,7 @@ import os
 import secrets
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import AnyHttpUrl, PostgresDsn, validator
+from pydantic import AnyHttpUrl, validator
 from pydantic_settings import BaseSettings
 
 
@@ -11,6 +11,13 @@ class Settings(BaseSettings):
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "TechTrack"
 
+    # Cold start: with LAZY_ROUTERS each endpoint module is imported by the
+    # first request under its prefix rather than at startup. The schema in
+    # OPENAPI_SCHEMA_FILE, written at build time by `python -m app.openapi`,
+    # is served instead of one generated on the first /docs request.
+    LAZY_ROUTERS: bool = False
+    OPENAPI_SCHEMA_FILE: Optional[str] = None
+
     # CORS settings
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
@@ -26,12 +33,37 @@ class Settings(BaseSettings):
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
 
+    # Password hashing: bcrypt runs in a dedicated process pool (0 workers
+    # falls back to threads). Rounds are calibrated at startup to the target
+    # latency unless PASSWORD_HASH_ROUNDS pins them. Under the production
+    # server the pool size is per host, split between the workers.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 15
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+
+    # Shared cache: memory:// is private to each worker process, use
+    # redis://host:6379/0 to share it between workers
+    CACHE_URL: Optional[str] = "memory://"
+    CACHE_NAMESPACE: str = "techtrack"
+    CACHE_DEFAULT_TTL_SECONDS: int = 300
+    CACHE_MAX_ENTRIES: int = 10000  # memory backend only
+    CACHE_LOCK_TIMEOUT_SECONDS: int = 10
+    # Cached data versions behind ETags; writes invalidate them at once,
+    # the TTL only bounds staleness after writes made outside the app
+    CACHE_VERSION_TTL_SECONDS: int = 30
+
+    # Authenticated principal cache (0 disables it)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
     # Database settings
     POSTGRES_SERVER: str
     POSTGRES_USER: str
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
-    SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
+    # Any SQLAlchemy URL; sqlite:///./techtrack.db works for local/offline runs
+    SQLALCHEMY_DATABASE_URI: Optional[str] = None
 
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
@@ -42,6 +74,131 @@ class Settings(BaseSettings):
         postgres_dsn = f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB')}"
         return postgres_dsn
 
+    # Async driver URI for the AsyncSession path (asyncpg, aiosqlite)
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+
+    @validator("SQLALCHEMY_ASYNC_DATABASE_URI", pre=True)
+    def assemble_async_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
+        if isinstance(v, str):
+            return v
+
+        sync_uri = str(values.get("SQLALCHEMY_DATABASE_URI"))
+        if sync_uri.startswith("sqlite://"):
+            return sync_uri.replace("sqlite://", "sqlite+aiosqlite://", 1)
+        return sync_uri.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+    # Connection pool settings (applied to both sync and async engines)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800  # seconds, -1 disables recycling
+    DB_POOL_PRE_PING: bool = True
+    # Open DB_POOL_SIZE connections per engine on startup. Every worker
+    # process has its own pools: WEB_CONCURRENCY x 2 x (DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW) must stay within the server's max_connections.
+    DB_POOL_WARM_UP: bool = True
+
+    # Production server (python -m app.server): gunicorn with uvicorn
+    # workers, one per available core unless WEB_CONCURRENCY is set. A worker
+    # is replaced after SERVER_MAX_REQUESTS requests, plus a random jitter so
+    # that workers don't restart together. On SIGTERM workers stop accepting
+    # and get SERVER_GRACEFUL_TIMEOUT seconds to finish in-flight requests.
+    WEB_CONCURRENCY: Optional[int] = None
+    SERVER_BIND: str = "0.0.0.0:8000"
+    SERVER_MAX_REQUESTS: int = 10000  # 0 disables recycling
+    SERVER_MAX_REQUESTS_JITTER: int = 1000
+    SERVER_GRACEFUL_TIMEOUT: int = 30
+    SERVER_TIMEOUT: int = 60  # a worker silent for longer is killed
+    SERVER_KEEPALIVE: int = 5
+
+    # Metrics: Prometheus text at /metrics. Set METRICS_TOKEN to require
+    # "Authorization: Bearer <token>" from the scraper. With several workers
+    # app.server sets METRICS_MULTIPROCESS_DIR (a temporary one unless given)
+    # and every worker exports its values there each METRICS_EXPORT_SECONDS,
+    # so that any of them answers for all. Statements slower than
+    # SLOW_QUERY_SECONDS are logged to app.db.slow_query (0 disables).
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+    METRICS_MULTIPROCESS_DIR: Optional[str] = None
+    METRICS_EXPORT_SECONDS: float = 5
+    SLOW_QUERY_SECONDS: float = 0.5
+
+    # Dashboard snapshot: refreshed after task/equipment writes (by any
+    # process) at most every DASHBOARD_REFRESH_SECONDS, and at least every
+    # DASHBOARD_MAX_AGE_SECONDS so that time-based counters (overdue tasks)
+    # stay current. One process at a time recomputes it. With a lock file,
+    # only the process holding it polls (the production server sets one per
+    # host, so its workers don't all poll).
+    DASHBOARD_REFRESH_SECONDS: int = 30
+    DASHBOARD_MAX_AGE_SECONDS: int = 300
+    DASHBOARD_REFRESHER_LOCK_FILE: Optional[str] = None
+
+    # HTTP caching of reference data: clients reuse responses for
+    # HTTP_CACHE_MAX_AGE_SECONDS, then revalidate with If-None-Match.
+    # Serialized bodies are kept per ETag in the shared cache (TTL 0 disables).
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 60
+    HTTP_CACHE_BODY_TTL_SECONDS: int = 300
+
+    # Trip planning: driving model and working day of the route planner
+    ROUTE_AVERAGE_SPEED_KMH: float = 70
+    ROUTE_DETOUR_FACTOR: float = 1.3  # road distance over straight-line distance
+    ROUTE_INTRA_CITY_MINUTES: int = 30
+    ROUTE_SERVICE_MINUTES: int = 90
+    ROUTE_WORKDAY_MINUTES: int = 540
+    ROUTE_TIME_LIMIT_SECONDS: float = 5
+    ROUTE_MAX_TASKS: int = 2000
+
+    # Preventive maintenance scheduler: units evaluated per batch (one commit each)
+    MAINTENANCE_BATCH_SIZE: int = 500
+
+    # Service report rendering: worker processes (0 renders in-process;
+    # per host under the production server, split between its workers),
+    # reports per batch, and where the files go; they are named by the hash
+    # of their inputs, so an unchanged report is never rendered twice.
+    # The PDF font must have Cyrillic glyphs.
+    REPORT_RENDER_PROCESSES: int = 2
+    REPORT_RENDER_BATCH_SIZE: int = 200
+    REPORT_STORAGE_DIR: str = "storage/reports"
+    REPORT_FONT_PATH: str = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+    # Resumable uploads: stored files live in STORAGE_URL (file://<dir>)
+    # keyed by SHA-256, chunks go to UPLOAD_TEMP_DIR until the upload is
+    # complete, and unfinished uploads are dropped after UPLOAD_EXPIRY_HOURS
+    STORAGE_URL: str = "file://storage/files"
+    UPLOAD_TEMP_DIR: str = "storage/uploads"
+    UPLOAD_MAX_BYTES: int = 200 * 1024 * 1024
+    UPLOAD_EXPIRY_HOURS: int = 24
+    UPLOAD_CLEANUP_INTERVAL_SECONDS: int = 3600
+    THUMBNAIL_SIZE: int = 320
+
+    # Background jobs: threads per worker process, idle poll interval,
+    # retries with exponential backoff, and the lease after which the job of
+    # a worker that stopped heartbeating is picked up again
+    JOB_CONCURRENCY: int = 4
+    JOB_POLL_SECONDS: float = 2
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 10
+    JOB_RETRY_MAX_SECONDS: float = 3600
+    JOB_LEASE_SECONDS: int = 300
+    JOB_SHUTDOWN_TIMEOUT_SECONDS: int = 60
+    JOB_RETENTION_DAYS: int = 30
+    # Maintenance runs enqueued by the workers (0 disables)
+    MAINTENANCE_RUN_INTERVAL_SECONDS: int = 3600
+
+    # Audit log: committed changes of users, tasks and equipment are buffered
+    # in each process and written in batches every AUDIT_FLUSH_INTERVAL_SECONDS
+    # or once AUDIT_BATCH_SIZE records wait. Past AUDIT_BUFFER_MAX_RECORDS new
+    # records are dropped and counted. Monthly partitions on PostgreSQL.
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 2
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_BUFFER_MAX_RECORDS: int = 10000
+    AUDIT_RETENTION_MONTHS: int = 24
+    AUDIT_MAINTENANCE_INTERVAL_SECONDS: int = 86400
+
+    # Offline sync: rows changed more recently than this are held back until
+    # the next pull, so transactions still in flight are never skipped
+    SYNC_SAFETY_LAG_SECONDS: int = 10
+
     # First superuser
     FIRST_SUPERUSER: str
     FIRST_SUPERUSER_PASSWORD: str
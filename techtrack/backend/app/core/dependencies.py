@@ -1,17 +1,19 @@
-from typing import Generator, Optional
+from typing import AsyncGenerator, Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from app.core.security import ALGORITHM
-from app.db.session import SessionLocal
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.user import User
 from app.schemas.token import TokenPayload
-from app.services.user import get_user_by_id
+from app.services.audit import audit_actor
+from app.services.user import get_user_by_id_async
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(
@@ -30,8 +32,16 @@ def get_db() -> Generator:
         db.close()
 
 
-def get_current_user(
-        db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency for async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_current_user(
+        db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """
     Dependency to get the current authenticated user
@@ -47,17 +57,27 @@ def get_current_user(
             detail="Could not validate credentials",
         )
 
-    user = get_user_by_id(db, token_data.sub)
+    # Served from the principal cache when possible, so the hot path
+    # doesn't need a query (the session only connects on first use)
+    user = await principal_cache.get_async(token_data.sub, token)
+    if user is not None:
+        audit_actor.set(user.id)
+        return user
+
+    user = await get_user_by_id_async(db, token_data.sub)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
 
+    await principal_cache.set_async(token_data.sub, token, user)
+    # Writes of this request are audited as this user
+    audit_actor.set(user.id)
     return user
 
 
-def get_current_active_user(
+async def get_current_active_user(
         current_user: User = Depends(get_current_user),
 ) -> User:
     """
@@ -71,7 +91,7 @@ def get_current_active_user(
     return current_user
 
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
         current_user: User = Depends(get_current_active_user),
 ) -> User:
     """
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from app.core.cache import Cache, cache
+from app.core.config import settings
+
+
+def cache_control(max_age: int = 0, stale_while_revalidate: int = 0) -> str:
+    """
+    Cache-Control value for authenticated reference data.
+
+    Responses are private to the client. With a max-age the client reuses
+    its copy without asking; after that (or always, with max-age 0) it has
+    to revalidate, which costs a 304 when nothing changed.
+    """
+    if max_age <= 0:
+        return "private, no-cache"
+    value = f"private, max-age={max_age}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+
+async def cached_version(
+    key: str, load: Callable[[], Awaitable[Any]], tags: Iterable[str]
+) -> Optional[Any]:
+    """
+    Data version from the shared cache, so a revalidation that ends in 304
+    costs no query. Writers invalidate the tags of the tables they change.
+    """
+    return await cache.get_or_set_async(
+        f"version:{key}", load, ttl=settings.CACHE_VERSION_TTL_SECONDS, tags=tags
+    )
+
+
+def version_statement(model: Any, *criteria: Any) -> Select:
+    """
+    Cheap version of the rows matching the criteria: (count, max(updated_at)).
+
+    Any insert, update or delete changes one of the two, so it can stand in
+    for the rows themselves when deriving an ETag.
+    """
+    return select(func.count(), func.max(model.updated_at)).select_from(model).where(*criteria)
+
+
+def make_etag(request: Request, *version: Any) -> str:
+    """
+    Weak ETag of a representation: the URL plus the version of its data
+    """
+    # Versions may come from the cache as JSON; dates must hash the same either way
+    payload = json.dumps(
+        [request.url.path, request.url.query, version],
+        default=lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v),
+    )
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Weak comparison of the ETag against If-None-Match
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+class ResponseBodyCache:
+    """
+    Serialized response bodies on the shared cache, with a TTL.
+
+    Keys include the ETag, so an entry can never be stale: a change in the
+    data changes the ETag and the old entry simply ages out.
+    """
+
+    def __init__(self, cache: Cache, ttl: int) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    def _key(self, url: str, etag: str) -> str:
+        return f"http:{hashlib.sha1(url.encode()).hexdigest()}:{etag}"
+
+    async def get(self, url: str, etag: str) -> Optional[bytes]:
+        if self.ttl <= 0:
+            return None
+        body = await self.cache.get_async(self._key(url, etag))
+        return body.encode() if body is not None else None
+
+    async def set(self, url: str, etag: str, body: bytes) -> None:
+        if self.ttl <= 0:
+            return
+        await self.cache.set_async(self._key(url, etag), body.decode(), self.ttl)
+
+
+response_body_cache = ResponseBodyCache(cache, ttl=settings.HTTP_CACHE_BODY_TTL_SECONDS)
+
+
+async def conditional_response(
+    request: Request,
+    etag: str,
+    policy: str,
+    load: Callable[[], Awaitable[Any]],
+    response_model: Any,
+) -> Response:
+    """
+    Answer a GET from its ETag before doing the expensive part.
+
+    A matching If-None-Match gets an empty 304. Otherwise the body comes from
+    the body cache, or `load` is awaited and its result serialized with the
+    route's response model.
+    """
+    headers = {"ETag": etag, "Cache-Control": policy}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    url = str(request.url)
+    body = await response_body_cache.get(url, etag)
+    if body is None:
+        adapter = TypeAdapter(response_model)
+        body = adapter.dump_json(adapter.validate_python(await load(), from_attributes=True))
+        await response_body_cache.set(url, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# Route policies: catalogs are reused for a while before revalidating,
+# data that embeds work in progress is revalidated on every use
+REFERENCE_DATA_POLICY = cache_control(settings.HTTP_CACHE_MAX_AGE_SECONDS)
+REVALIDATE_POLICY = cache_control(0)
+
+
+# Content-addressed files: a changed file gets a new URL
+IMMUTABLE_POLICY = "private, max-age=31536000, immutable"
+
+_FILE_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single-range `bytes=` header.
+
+    Returns None for headers to ignore (malformed, other units, several
+    ranges: the full file is sent) and raises ValueError when the range
+    can't be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first.isdigit() or last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last.isdigit() else size - 1
+    if last.isdigit() and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(_FILE_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    etag: str,
+    policy: str = IMMUTABLE_POLICY,
+    filename: Optional[str] = None,
+    inline: bool = True,
+) -> Response:
+    """
+    Serve a file with ETag revalidation and single byte-range requests.
+
+    Resumed downloads and PDF viewers fetching pages on demand get 206
+    responses; If-Range falls back to the whole file when the client's
+    copy is of another version. Browsers never guess another type than
+    the media type, and with `inline` False they save the file instead
+    of opening it.
+    """
+    size = os.stat(path).st_size
+    headers = {
+        "ETag": etag,
+        "Cache-Control": policy,
+        "Accept-Ranges": "bytes",
+        "X-Content-Type-Options": "nosniff",
+    }
+    disposition = "inline" if inline else "attachment"
+    if filename:
+        headers["Content-Disposition"] = f"{disposition}; filename*=UTF-8''{quote(filename)}"
+    elif not inline:
+        headers["Content-Disposition"] = disposition
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    headers["Content-Length"] = str(length)
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=206 if byte_range is not None else 200,
+        media_type=media_type,
+        headers=headers,
+    )
@@ -0,0 +1,413 @@
+"""
+Request and database metrics in the Prometheus text format.
+
+RequestMetricsMiddleware times every request and keeps per-route latency
+histograms, query counts and database time; the query hooks in
+app.db.query_counter report each statement to the request being served.
+
+With METRICS_MULTIPROCESS_DIR (set by app.server for several workers) each
+worker exports its values to a file there every METRICS_EXPORT_SECONDS and
+the worker that answers a scrape adds up the files of all of them. Counters
+and histograms of exited workers are folded into one file by the master, so
+totals never go back; gauges count only the running workers.
+"""
+import asyncio
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+from app.core.config import settings
+from app.db.pool import pool_status
+from app.db.session import async_engine, engine
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.db.slow_query")
+
+_PREFIX = "techtrack"
+
+# Requests whose path matched no route share one label, so scans of random
+# URLs can't grow the number of series
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = f"{_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: LabelValues = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def snapshot(self, values: Optional[Dict[LabelValues, Any]] = None) -> List[Any]:
+        """
+        JSON rows of these values (this process's by default), for merge()
+        """
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        return [[list(labels), value] for labels, value in values.items()]
+
+    def merge(self, values: Dict[LabelValues, Any], snapshot: List[Any]) -> None:
+        for labels, value in snapshot:
+            key = tuple(labels)
+            values[key] = values.get(key, 0) + value
+
+    def collect(self, values: Optional[Dict[LabelValues, Any]] = None) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        if values is None:
+            with self._lock:
+                values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, labels: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class CounterSnapshot(Gauge):
+    """
+    A counter kept elsewhere, copied in on every scrape
+    """
+    kind = "counter"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, buckets: Sequence[float], labels: Sequence[str] = ()
+    ) -> None:
+        self.name = f"{_PREFIX}_{name}"
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        # Per label set: count in each bucket (not cumulative), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labels, ([0] * len(self.buckets), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def snapshot(self, values: Optional[Dict[LabelValues, Any]] = None) -> List[Any]:
+        if values is None:
+            with self._lock:
+                values = {labels: (list(counts), list(total)) for labels, (counts, total) in self._values.items()}
+        return [[list(labels), counts, total[0]] for labels, (counts, total) in values.items()]
+
+    def merge(self, values: Dict[LabelValues, Any], snapshot: List[Any]) -> None:
+        for labels, counts, total in snapshot:
+            merged_counts, merged_total = values.setdefault(tuple(labels), ([0] * len(self.buckets), [0.0]))
+            for index, count in enumerate(counts):
+                merged_counts[index] += count
+            merged_total[0] += total
+
+    def collect(self, values: Optional[Dict[LabelValues, Any]] = None) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        if values is None:
+            with self._lock:
+                values = {labels: (list(counts), list(total)) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(total[0])}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests being served")
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    ("method", "route"),
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements per HTTP request by route",
+    (0, 1, 2, 3, 5, 10, 20, 50, 100),
+    ("method", "route"),
+)
+REQUEST_DB_SECONDS = Counter(
+    "http_request_db_seconds_total", "Time spent in database statements by route", ("method", "route")
+)
+QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency, requests and background work alike",
+    (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_SECONDS")
+POOL = Gauge("db_pool_connections", "Connection pool occupancy", ("engine", "state"))
+POOL_WAIT = CounterSnapshot("db_pool_checkout_wait_seconds_total", "Time spent waiting for a pooled connection", ("engine",))
+POOL_TIMEOUTS = CounterSnapshot("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting", ("engine",))
+AUDIT_DROPPED = Counter("audit_records_dropped_total", "Audit records dropped because the buffer was full")
+
+METRICS = (
+    REQUESTS, REQUESTS_IN_PROGRESS, REQUEST_DURATION, REQUEST_QUERIES, REQUEST_DB_SECONDS,
+    QUERY_DURATION, SLOW_QUERIES, POOL, POOL_WAIT, POOL_TIMEOUTS, AUDIT_DROPPED,
+)
+
+
+class RequestStats:
+    """
+    Database work of the request being served
+    """
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope: Dict[str, Any]) -> None:
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def observe_query(statement: str, duration: float) -> None:
+    """
+    Record a finished statement; called from the engine hooks
+    """
+    QUERY_DURATION.observe(duration)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += duration
+    if settings.SLOW_QUERY_SECONDS and duration >= settings.SLOW_QUERY_SECONDS:
+        SLOW_QUERIES.inc()
+        where = f"{stats.scope['method']} {route_template(stats.scope)}" if stats is not None else "background"
+        # Parameters are left out: they may hold personal data
+        slow_query_logger.warning("Slow query %.3fs in %s: %s", duration, where, " ".join(statement.split())[:2000])
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware: responses are streamed through untouched and the
+    request context, where the query hooks find the stats, is the app's own
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            REQUESTS_IN_PROGRESS.inc(amount=-1)
+            _request_stats.reset(token)
+            labels = (scope["method"], route_template(scope))
+            REQUESTS.inc(labels + (str(status_code),))
+            REQUEST_DURATION.observe(duration, labels)
+            REQUEST_QUERIES.observe(stats.queries, labels)
+            REQUEST_DB_SECONDS.inc(labels, stats.db_seconds)
+
+
+def _update_pool_gauges() -> None:
+    for name, bind in (("sync", engine), ("async", async_engine.sync_engine)):
+        status = pool_status(bind)
+        for state in ("checked_out", "checked_in", "overflow"):
+            POOL.set((name, state), status[state])
+        POOL_WAIT.set((name,), status.get("wait_seconds_total", 0))
+        POOL_TIMEOUTS.set((name,), status.get("timeouts", 0))
+
+
+# Multiprocess export: one file per running worker plus the folded totals
+# of the exited ones
+_EXITED_FILE = "exited.json"
+_LOCK_FILE = ".lock"
+
+
+def _worker_file(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"worker-{pid}.json")
+
+
+@contextmanager
+def _dir_lock(directory: str, exclusive: bool) -> Iterator[None]:
+    """
+    Readers share the lock; folding an exited worker takes it alone, so that
+    no scrape counts that worker twice or not at all
+    """
+    fd = os.open(os.path.join(directory, _LOCK_FILE), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _read(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write(path: str, data: Dict[str, Any]) -> None:
+    # Written aside and renamed, so that a reader never sees half a file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def _snapshot() -> Dict[str, Any]:
+    _update_pool_gauges()
+    return {metric.name: metric.snapshot() for metric in METRICS}
+
+
+def export_metrics() -> None:
+    """
+    Write this worker's values for the others to read; a no-op with one process
+    """
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if directory:
+        _write(_worker_file(directory, os.getpid()), _snapshot())
+
+
+async def run_metrics_export() -> None:
+    """
+    Background loop exporting this worker's values; started with the app
+    """
+    if not settings.METRICS_MULTIPROCESS_DIR:
+        return
+    while True:
+        try:
+            export_metrics()
+        except Exception:
+            logger.exception("Metrics export failed")
+        await asyncio.sleep(settings.METRICS_EXPORT_SECONDS)
+
+
+def fold_exited_worker(pid: int) -> None:
+    """
+    Add an exited worker's counters and histograms to the exited totals and
+    drop its gauges; called by the server master when it reaps a worker
+    """
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return
+    path = _worker_file(directory, pid)
+    with _dir_lock(directory, exclusive=True):
+        worker = _read(path)
+        if not worker:
+            return
+        exited = _read(os.path.join(directory, _EXITED_FILE))
+        for metric in METRICS:
+            if metric.kind == "gauge":
+                continue
+            values: Dict[LabelValues, Any] = {}
+            metric.merge(values, exited.get(metric.name, []))
+            metric.merge(values, worker.get(metric.name, []))
+            exited[metric.name] = metric.snapshot(values)
+        _write(os.path.join(directory, _EXITED_FILE), exited)
+        os.remove(path)
+
+
+def clear_multiprocess_dir(directory: str) -> None:
+    """
+    Drop the files of a previous run, whose workers are gone
+    """
+    for path in glob.glob(os.path.join(directory, "*.json")):
+        os.remove(path)
+
+
+def _merged_values() -> Dict[str, Dict[LabelValues, Any]]:
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    own = _snapshot()
+    merged: Dict[str, Dict[LabelValues, Any]] = {metric.name: {} for metric in METRICS}
+    with _dir_lock(directory, exclusive=False):
+        # This worker's own file may be stale: its live values are used instead
+        own_file = _worker_file(directory, os.getpid())
+        snapshots = [own, _read(os.path.join(directory, _EXITED_FILE))] + [
+            _read(path) for path in glob.glob(os.path.join(directory, "worker-*.json")) if path != own_file
+        ]
+    for snapshot in snapshots:
+        for metric in METRICS:
+            metric.merge(merged[metric.name], snapshot.get(metric.name, []))
+    return merged
+
+
+def render_metrics() -> str:
+    """
+    Metrics of this process, or of all workers with METRICS_MULTIPROCESS_DIR
+    """
+    if settings.METRICS_MULTIPROCESS_DIR:
+        merged = _merged_values()
+        lines = (line for metric in METRICS for line in metric.collect(merged[metric.name]))
+    else:
+        _update_pool_gauges()
+        lines = (line for metric in METRICS for line in metric.collect())
+    return "\n".join(lines) + "\n"
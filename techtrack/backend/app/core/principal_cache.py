@@ -0,0 +1,82 @@
+import hashlib
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import Cache, cache
+from app.core.config import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """
+    Cache of authenticated users keyed by (user id, token). Invalidations
+    reach every worker only through a shared (redis://) cache; app.server
+    turns this cache off for several workers on memory://.
+
+    Only column values are stored. Every hit builds a fresh detached
+    ``User``, so no ORM instance is ever shared between sessions and the
+    returned object can still be added to a session for updates.
+    """
+
+    def __init__(self, cache: Cache, ttl: int) -> None:
+        self.cache = cache
+        self.ttl = ttl
+
+    def _key(self, user_id: int, token: str) -> str:
+        # Tokens are credentials: only a digest ends up in the cache
+        return f"principal:{user_id}:{hashlib.sha256(token.encode()).hexdigest()}"
+
+    def _tag(self, user_id: int) -> str:
+        return f"user:{user_id}"
+
+    def _dump(self, user: User) -> Dict[str, Any]:
+        return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+    def _load(self, values: Optional[Dict[str, Any]]) -> Optional[User]:
+        if values is None:
+            return None
+        for attr in inspect(User).column_attrs:
+            value = values.get(attr.key)
+            python_type = attr.columns[0].type.python_type
+            if isinstance(value, str) and python_type in (date, datetime):
+                values[attr.key] = python_type.fromisoformat(value)
+        user = User(**values)
+        make_transient_to_detached(user)
+        return user
+
+    def get(self, user_id: int, token: str) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        return self._load(self.cache.get(self._key(user_id, token)))
+
+    def set(self, user_id: int, token: str, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        self.cache.set(self._key(user_id, token), self._dump(user), self.ttl, tags=[self._tag(user_id)])
+
+    def invalidate(self, user_id: int) -> None:
+        """
+        Drop every cached token of the user
+        """
+        self.cache.invalidate_tags(self._tag(user_id))
+
+    async def get_async(self, user_id: int, token: str) -> Optional[User]:
+        if self.ttl <= 0:
+            return None
+        return self._load(await self.cache.get_async(self._key(user_id, token)))
+
+    async def set_async(self, user_id: int, token: str, user: User) -> None:
+        if self.ttl <= 0:
+            return
+        await self.cache.set_async(
+            self._key(user_id, token), self._dump(user), self.ttl, tags=[self._tag(user_id)]
+        )
+
+    async def invalidate_async(self, user_id: int) -> None:
+        await self.cache.invalidate_tags_async(self._tag(user_id))
+
+
+principal_cache = PrincipalCache(cache, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
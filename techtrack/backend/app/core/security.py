@@ -1,17 +1,27 @@
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from typing import Any, List, Optional, Tuple, Union
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Password context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT settings
 ALGORITHM = "HS256"
 
+# Process pool for bcrypt, created by start_password_hashing()
+_hash_executor: Optional[Executor] = None
+
 
 def create_access_token(
         subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -38,8 +48,103 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+        plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return a new hash if the stored one is outdated
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password
     """
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords, in parallel on the hashing pool when it is running
+    """
+    if _hash_executor is None:
+        return [get_password_hash(password) for password in passwords]
+    return list(_hash_executor.map(get_password_hash, passwords))
+
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    """
+    Use the given cost for new hashes and flag weaker hashes for rehashing
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+
+def calibrate_bcrypt_rounds(
+        target_ms: int = settings.PASSWORD_HASH_TARGET_MS,
+        min_rounds: int = settings.PASSWORD_HASH_MIN_ROUNDS,
+        max_rounds: int = settings.PASSWORD_HASH_MAX_ROUNDS,
+) -> int:
+    """
+    Pick the highest bcrypt cost that hashes within the target latency.
+
+    Each extra round doubles the cost, so one measurement at the minimum
+    cost is enough to extrapolate. The result never drops below min_rounds.
+    """
+    probe = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=min_rounds)
+    start = time.perf_counter()
+    probe.hash("calibration-probe")
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.001)
+
+    extra = math.floor(math.log2(target_ms / elapsed_ms)) if elapsed_ms < target_ms else 0
+    return max(min_rounds, min(max_rounds, min_rounds + extra))
+
+
+def _init_hash_worker(rounds: int) -> None:
+    set_bcrypt_rounds(rounds)
+
+
+def start_password_hashing() -> None:
+    """
+    Calibrate bcrypt and start the hashing pool; called on app startup
+    """
+    global _hash_executor
+
+    rounds = settings.PASSWORD_HASH_ROUNDS or calibrate_bcrypt_rounds()
+    set_bcrypt_rounds(rounds)
+    logger.info("Using bcrypt cost %s for password hashing", rounds)
+
+    if settings.PASSWORD_HASH_WORKERS > 0 and _hash_executor is None:
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            initializer=_init_hash_worker,
+            initargs=(rounds,),
+        )
+
+
+def stop_password_hashing() -> None:
+    global _hash_executor
+
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password without blocking the event loop
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, get_password_hash, password)
+
+
+async def verify_and_update_password_async(
+        plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Async verify_and_update_password running in the hashing pool
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
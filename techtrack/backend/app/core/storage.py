@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Optional
+
+from app.core.config import settings
+
+
+class Storage:
+    """
+    Blob store for uploaded files, addressed by key.
+
+    Files are put whole from a local path, so an object store backend only
+    has to implement an upload and a download.
+    """
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def put_file(self, key: str, src_path: str) -> None:
+        """
+        Move a finished local file into the store under the key
+        """
+        raise NotImplementedError
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, key: str) -> Optional[str]:
+        """
+        Path of the file when it is on local disk (served with range support)
+        """
+        return None
+
+
+class LocalStorage(Storage):
+    """
+    Files under a root directory on local disk or a mounted volume
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if os.path.commonpath([path, os.path.normpath(self.root)]) != os.path.normpath(self.root):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def put_file(self, key: str, src_path: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A rename within one filesystem, a copy across filesystems
+        shutil.move(src_path, path)
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+
+def create_storage(url: str) -> Storage:
+    """
+    Storage for STORAGE_URL: file://<directory> or a plain directory path
+    """
+    if "://" not in url:
+        return LocalStorage(url)
+    if url.startswith("file://"):
+        return LocalStorage(url[len("file://"):])
+    raise ValueError(f"Unsupported storage URL: {url}")
+
+
+storage = create_storage(settings.STORAGE_URL)
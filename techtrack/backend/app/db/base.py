@@ -7,4 +7,12 @@ from app.models.equipment import Equipment  # noqa
 from app.models.part import Part  # noqa
 from app.models.report import Report  # noqa
 from app.models.trip import Trip  # noqa
-from app.models.knowledge import KnowledgeItem  # noqa
\ No newline at end of file
+from app.models.knowledge import KnowledgeItem  # noqa
+from app.models.dashboard import DashboardSnapshot  # noqa
+from app.models.sync import SyncTombstone  # noqa
+from app.models.geocode import Geocode  # noqa
+from app.models.maintenance import MaintenanceRule, MaintenanceSchedule  # noqa
+from app.models.job import Job  # noqa
+from app.models.upload import FileBlob, Upload  # noqa
+from app.models.inventory import StockLevel, StockMovement, StockReservation, Warehouse  # noqa
+from app.models.audit import AuditEvent  # noqa
@@ -0,0 +1,68 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.core.security import start_password_hashing, stop_password_hashing
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services.bulk_import import (
+    detect_format,
+    import_equipment,
+    import_tasks,
+    import_users,
+    iter_records,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk import TechTrack data from CSV or JSONL")
+    parser.add_argument("entity", choices=["equipment", "tasks", "users"])
+    parser.add_argument("path")
+    parser.add_argument("--format", dest="fmt", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--created-by",
+        default=settings.FIRST_SUPERUSER_EMAIL,
+        help="Email of the user recorded as creator of imported tasks",
+    )
+    args = parser.parse_args()
+
+    fmt = detect_format(args.path, args.fmt)
+    db = SessionLocal()
+    try:
+        if args.entity == "equipment":
+            importer = import_equipment
+            kwargs = {}
+        elif args.entity == "tasks":
+            creator = db.query(User).filter(User.email == args.created_by).first()
+            if not creator:
+                parser.error(f"User {args.created_by} not found")
+            importer = import_tasks
+            kwargs = {"created_by_id": creator.id}
+        else:
+            # Passwords are hashed in parallel on the hashing pool
+            start_password_hashing()
+            importer = import_users
+            kwargs = {}
+
+        progress = {}
+        with open(args.path, "rb") as stream:
+            for progress in importer(db, iter_records(stream, fmt), chunk_size=args.chunk_size, **kwargs):
+                for error in progress["errors"]:
+                    logger.warning("Line %s: %s", error["line"], error["error"])
+                logger.info(
+                    "Processed %s rows: %s written, %s skipped, %s failed",
+                    progress["processed"], progress["written"], progress["skipped"], progress["failed"],
+                )
+        if not progress:
+            logger.info("Nothing to import")
+    finally:
+        stop_password_hashing()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
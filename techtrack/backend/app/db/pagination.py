@@ -0,0 +1,145 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import exc, func, select, text, tuple_
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import TextClause
+
+
+class Keyset:
+    """
+    Keyset (cursor) pagination over a fixed ordering.
+
+    The ordering columns should be indexed and non-nullable, and the last one
+    must be unique (normally the primary key) so that pages never overlap.
+    Cursors are opaque url-safe strings holding the sort key of the last row
+    of the previous page, so fetching page N costs the same as page 1.
+    """
+
+    def __init__(self, *columns: InstrumentedAttribute, descending: bool = False) -> None:
+        if not columns:
+            raise ValueError("Keyset needs at least one column")
+        self.columns = columns
+        self.descending = descending
+
+    def apply(self, stmt: Select, cursor: Optional[str], limit: int) -> Select:
+        """
+        Restrict the statement to the page after the cursor.
+
+        One extra row is fetched to know whether a next page exists.
+        """
+        if cursor:
+            key = tuple_(*self.columns)
+            values = tuple_(*self.decode(cursor))
+            stmt = stmt.where(key < values if self.descending else key > values)
+        order = [c.desc() if self.descending else c.asc() for c in self.columns]
+        return stmt.order_by(*order).limit(limit + 1)
+
+    def page(self, rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+        """
+        Split fetched rows into the page items and the next cursor
+        """
+        items = list(rows[:limit])
+        if len(rows) <= limit or not items:
+            return items, None
+        last = items[-1]
+        return items, self.encode([getattr(last, c.key) for c in self.columns])
+
+    def encode(self, values: Sequence[Any]) -> str:
+        payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    def decode(self, cursor: str) -> List[Any]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+        except (binascii.Error, ValueError):
+            raise ValueError("Invalid cursor")
+        if not isinstance(payload, list) or len(payload) != len(self.columns):
+            raise ValueError("Invalid cursor")
+
+        return [self._decode_value(column, value) for column, value in zip(self.columns, payload)]
+
+    @staticmethod
+    def _decode_value(column: InstrumentedAttribute, value: Any) -> Any:
+        """
+        Check a cursor value against the column type; whatever is bound
+        here reaches the database, so a mismatch must fail as a bad cursor
+        """
+        if value is None:
+            return None
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return value
+        if python_type in (date, datetime):
+            if not isinstance(value, str):
+                raise ValueError("Invalid cursor")
+            try:
+                return python_type.fromisoformat(value)
+            except ValueError:
+                raise ValueError("Invalid cursor")
+        # bool is an int subclass, but never a valid key for a number column
+        if isinstance(value, bool) and python_type is not bool:
+            raise ValueError("Invalid cursor")
+        if python_type is float and isinstance(value, int):
+            return float(value)
+        if not isinstance(value, python_type):
+            raise ValueError("Invalid cursor")
+        return value
+
+
+def _count_statement(stmt: Select) -> Select:
+    return select(func.count()).select_from(stmt.order_by(None).limit(None).offset(None).subquery())
+
+
+def _explain_statement(dialect: Dialect, stmt: Select) -> Optional[TextClause]:
+    """
+    EXPLAIN of the statement on PostgreSQL, None where no estimate is available
+    """
+    if dialect.name != "postgresql":
+        return None
+    try:
+        compiled = stmt.order_by(None).limit(None).offset(None).compile(
+            dialect=dialect, compile_kwargs={"literal_binds": True}
+        )
+    except exc.CompileError:
+        return None
+    # Colons in rendered literals must not be parsed as bind parameters
+    return text("EXPLAIN (FORMAT JSON) " + str(compiled).replace(":", "\\:"))
+
+
+def _plan_rows(plan: Any) -> int:
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_count(db: Session, stmt: Select) -> int:
+    """
+    Row count of the statement; planner estimate on PostgreSQL.
+
+    Exact counts over the large tables cost a full scan, while the planner's
+    estimate is free and accurate enough for "about N results".
+    """
+    explain = _explain_statement(db.get_bind().dialect, stmt)
+    if explain is not None:
+        return _plan_rows(db.execute(explain).scalar())
+    return db.execute(_count_statement(stmt)).scalar_one()
+
+
+async def estimate_count_async(db: AsyncSession, stmt: Select) -> int:
+    """
+    Async version of estimate_count
+    """
+    explain = _explain_statement(db.get_bind().dialect, stmt)
+    if explain is not None:
+        return _plan_rows((await db.execute(explain)).scalar())
+    return (await db.execute(_count_statement(stmt))).scalar_one()
@@ -0,0 +1,77 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import observe_query
+from app.db.session import async_engine, engine
+
+
+class QueryCounter:
+    """
+    Statements executed while the counter is active, on any engine
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.statements: List[str] = []
+
+    def __repr__(self) -> str:
+        return f"<QueryCounter {self.count}>"
+
+
+# Counting is process wide (not per request or task): it is meant for tests
+# and one-off profiling, not for concurrent production traffic
+_active: List[QueryCounter] = []
+
+
+def _on_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    for counter in _active:
+        counter.count += 1
+        counter.statements.append(statement)
+    # A stack: a statement may run from inside another one's event handlers
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _on_executed(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    duration = time.perf_counter() - starts.pop()
+    observe_query(statement, duration)
+
+
+def instrument(bind: Engine) -> None:
+    if not event.contains(bind, "before_cursor_execute", _on_execute):
+        event.listen(bind, "before_cursor_execute", _on_execute)
+    if not event.contains(bind, "after_cursor_execute", _on_executed):
+        event.listen(bind, "after_cursor_execute", _on_executed)
+
+
+instrument(engine)
+instrument(async_engine.sync_engine)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    _active.append(counter)
+    try:
+        yield counter
+    finally:
+        _active.remove(counter)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryCounter]:
+    """
+    Fail when the block runs more than `budget` statements, which usually
+    means a relationship is lazy-loaded per row (N+1)
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > budget:
+        listing = "\n".join(f"  {s}" for s in counter.statements)
+        raise AssertionError(f"{counter.count} queries run, budget is {budget}:\n{listing}")
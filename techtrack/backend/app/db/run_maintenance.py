@@ -0,0 +1,31 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.maintenance import run_maintenance
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate equipment against the maintenance rules")
+    parser.add_argument("--full", action="store_true", help="Evaluate every unit, not only changed ones")
+    parser.add_argument("--batch-size", type=int, default=settings.MAINTENANCE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = run_maintenance(db, full=args.full, batch_size=args.batch_size)
+        logger.info(
+            "Evaluated %s units in %s batches: %s tasks created, %s updated, %s status changes",
+            stats["evaluated"], stats["batches"], stats["tasks_created"],
+            stats["tasks_updated"], stats["status_changed"],
+        )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,46 @@
+import logging
 from typing import Generator
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    pool_options,
+    warm_up_async_pool,
+    warm_up_pool,
+)
+
+logger = logging.getLogger(__name__)
 
 # Create SQLAlchemy engine
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **pool_options(),
+)
 
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Create async engine (asyncpg) for endpoints running on the event loop
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options(),
+)
+
+# Objects must stay readable after commit: lazy refresh is not possible
+# outside of an awaited call, so expiring them would break serialization.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -22,4 +51,27 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def warm_up_pools() -> None:
+    """
+    Fill both pools up to DB_POOL_SIZE connections, so that the first
+    requests don't wait for connects; called on app startup
+    """
+    try:
+        await run_in_threadpool(warm_up_pool, engine, settings.DB_POOL_SIZE)
+        await warm_up_async_pool(async_engine, settings.DB_POOL_SIZE)
+    except Exception:
+        # The pools connect on demand; a database that is down yet is no
+        # reason to stop the app from starting
+        logger.warning("Could not warm up the database pools", exc_info=True)
+
+
+async def close_pools() -> None:
+    """
+    Close the pooled connections; called on app shutdown. Open aiosqlite
+    connections would otherwise keep the process from exiting.
+    """
+    await async_engine.dispose()
+    engine.dispose()
@@ -0,0 +1,85 @@
+"""
+Import-time cost of the app, per module.
+
+    python -m app.importtime              # top modules, eager routers
+    python -m app.importtime --lazy       # the same with LAZY_ROUTERS
+    python -m app.importtime --json       # machine-readable
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter, so
+nothing is cached from this process, and sums the timings by module and by
+top-level package.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+
+def measure(target: str = "app.main", lazy: bool = False) -> Dict[str, Any]:
+    env = dict(os.environ, LAZY_ROUTERS="true" if lazy else "false")
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, env=env,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr[-2000:]}")
+
+    modules: List[Dict[str, Any]] = []
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+
+    packages: Dict[str, float] = {}
+    for module in modules:
+        name = module["module"]
+        package = ".".join(name.split(".")[:2]) if name.startswith("app.") else name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + module["self_ms"]
+    total = sum(m["cumulative_ms"] for m in modules if m["depth"] == 0)
+    return {
+        "target": target,
+        "lazy_routers": lazy,
+        "wall_ms": round(wall * 1000, 1),
+        "import_ms": round(total, 1),
+        "packages": dict(sorted(((k, round(v, 1)) for k, v in packages.items()), key=lambda kv: -kv[1])),
+        "modules": sorted(modules, key=lambda m: -m["self_ms"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report the import-time cost of the app per module")
+    parser.add_argument("--target", default="app.main", help="module to import")
+    parser.add_argument("--lazy", action="store_true", help="import with LAZY_ROUTERS enabled")
+    parser.add_argument("--top", type=int, default=25, help="rows per table")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.target, args.lazy)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"import {report['target']}: {report['import_ms']:.0f} ms "
+          f"({report['wall_ms']:.0f} ms with interpreter start), lazy routers {report['lazy_routers']}")
+    print(f"\n{'package':<40}{'self ms':>10}")
+    for package, ms in list(report["packages"].items())[:args.top]:
+        print(f"{package:<40}{ms:>10.1f}")
+    print(f"\n{'module':<60}{'self ms':>10}{'cumul. ms':>12}")
+    for module in report["modules"][:args.top]:
+        print(f"{module['module']:<60}{module['self_ms']:>10.1f}{module['cumulative_ms']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
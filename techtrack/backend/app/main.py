@@ -1,10 +1,22 @@
+import asyncio
+import secrets
+from typing import List, Optional
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.responses import RedirectResponse
+from starlette.responses import RedirectResponse, Response
 
-from app.api.v1.api import api_router
+from app.api.v1.api import include_api_routers
 from app.core.config import settings
+from app.core.metrics import RequestMetricsMiddleware, export_metrics, render_metrics, run_metrics_export
+from app.core.security import start_password_hashing, stop_password_hashing
+from app.db import query_counter  # noqa: F401 - installs the query timing hooks
+from app.db.session import close_pools, warm_up_pools
+from app.openapi import install_openapi
+from app.services.audit import stop_audit_log
+from app.services.dashboard import run_dashboard_refresher, warm_up_dashboard
+from app.services.report import stop_report_rendering
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -19,10 +31,45 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Lets the PWA read validators for its own revalidation requests
+        expose_headers=["ETag"],
     )
 
+# Outermost, so that latency includes the other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include API router
-app.include_router(api_router, prefix=settings.API_V1_STR)
+include_api_routers(app, prefix=settings.API_V1_STR, lazy=settings.LAZY_ROUTERS)
+install_openapi(app, settings.OPENAPI_SCHEMA_FILE)
+
+
+# Background tasks started with the app, cancelled on shutdown
+background_tasks: List[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def on_startup() -> None:
+    start_password_hashing()
+    if settings.DB_POOL_WARM_UP:
+        await warm_up_pools()
+        await warm_up_dashboard()
+    background_tasks.append(asyncio.create_task(run_dashboard_refresher()))
+    if settings.METRICS_ENABLED:
+        background_tasks.append(asyncio.create_task(run_metrics_export()))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in background_tasks:
+        task.cancel()
+    if settings.METRICS_ENABLED:
+        # The last requests still count once this worker has exited
+        export_metrics()
+    stop_password_hashing()
+    stop_report_rendering()
+    stop_audit_log()
+    await close_pools()
 
 
 @app.get("/", include_in_schema=False)
@@ -33,5 +80,21 @@ def root():
     return RedirectResponse(url="/docs")
 
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    def metrics(authorization: Optional[str] = Header(None)) -> Response:
+        """
+        Request and database metrics of all workers, Prometheus text format
+        """
+        if settings.METRICS_TOKEN and not secrets.compare_digest(
+            authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated",
+            )
+        return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
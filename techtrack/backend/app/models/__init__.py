@@ -0,0 +1,20 @@
+# Every model is registered with the mapper as soon as any one of them is
+# imported: relationships name their targets as strings, and eager-loading
+# options built at import time configure all mappers at once
+from app.models import (  # noqa
+    audit,
+    dashboard,
+    equipment,
+    geocode,
+    inventory,
+    job,
+    knowledge,
+    maintenance,
+    part,
+    report,
+    sync,
+    task,
+    trip,
+    upload,
+    user,
+)
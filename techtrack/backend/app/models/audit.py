@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Enum, Index, Integer, String
+
+from app.db.session import Base
+
+
+class AuditEvent(Base):
+    """
+    Who changed what and when, one row per changed entity.
+
+    On PostgreSQL the table is partitioned by month of occurred_at (see
+    app.services.audit.ensure_audit_partitions): time range queries only
+    read the months they cover and old months are dropped whole.
+    """
+    __tablename__ = "audit_events"
+
+    # Made by the app, so rows can be written in batches without RETURNING;
+    # the primary key has to include the partition key
+    id = Column(String(32), primary_key=True)
+    occurred_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
+    # No foreign key: the history outlives deleted users
+    actor_id = Column(Integer, nullable=True, index=True)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    action = Column(Enum("create", "update", "delete", name="audit_action"), nullable=False)
+    # {field: [old, new]}; values of secret fields are not recorded
+    changes = Column(JSON, nullable=False, default=dict)
+
+    __table_args__ = (
+        # History of one entity in a time range
+        Index("ix_audit_events_entity_occurred_at", "entity", "entity_id", "occurred_at"),
+        Index("ix_audit_events_occurred_at", "occurred_at"),
+        {"postgresql_partition_by": "RANGE (occurred_at)"},
+    )
+
+    def __repr__(self):
+        return f"<AuditEvent {self.action} {self.entity}/{self.entity_id} by {self.actor_id}>"
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Integer
+
+from app.db.session import Base
+
+
+class DashboardSnapshot(Base):
+    """
+    Precomputed dashboard counters, one row refreshed in the background.
+
+    `stale` is set by any process that writes tasks or equipment, and
+    `refresh_claimed_until` is the lease of the process recomputing the row.
+    """
+    __tablename__ = "dashboard_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    data = Column(JSON, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    stale = Column(Boolean, default=False, nullable=False)
+    refresh_claimed_until = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<DashboardSnapshot {self.refreshed_at}>"
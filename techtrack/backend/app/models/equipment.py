@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Enum, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -50,10 +50,18 @@ class Equipment(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Maintenance scheduler state: the unit is evaluated again once it has
+    # changed since maintenance_checked_at or maintenance_next_check_at passed
+    maintenance_checked_at = Column(DateTime, nullable=True)
+    maintenance_next_check_at = Column(DateTime, nullable=True, index=True)
+
     # Relationships
     tasks = relationship("Task", back_populates="equipment")
     parts = relationship("Part", back_populates="equipment")
     reports = relationship("Report", back_populates="equipment")
 
+    # Keyset scans of the offline sync feed
+    __table_args__ = (Index("ix_equipment_updated_at_id", "updated_at", "id"),)
+
     def __repr__(self):
         return f"<Equipment {self.name} ({self.serial_number})>"
\ No newline at end of file
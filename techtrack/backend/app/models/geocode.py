@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from app.db.session import Base
+
+
+class Geocode(Base):
+    """
+    Coordinates of a city or of a site within it (empty location), used for
+    route planning without calling an external geocoder
+    """
+    __tablename__ = "geocodes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    city = Column(String, nullable=False, index=True)
+    location = Column(String, nullable=False, default="")
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (UniqueConstraint("city", "location", name="uq_geocodes_city_location"),)
+
+    def __repr__(self):
+        return f"<Geocode {self.city} {self.location}: {self.latitude}, {self.longitude}>"
@@ -0,0 +1,168 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+)
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .part import Part  # noqa
+    from .task import Task  # noqa
+    from .user import User  # noqa
+
+
+class Warehouse(Base):
+    """
+    Place where parts are stocked: a central warehouse or an engineer's van
+    """
+    __tablename__ = "warehouses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False, unique=True)
+    city = Column(String, nullable=True, index=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Warehouse {self.name}>"
+
+
+class StockLevel(Base):
+    """
+    Current stock of a part in a warehouse: a snapshot of the movement ledger.
+
+    Every change bumps `version`; reservations are made with a conditional
+    update on the available quantity, so the last unit can't be promised twice.
+    """
+    __tablename__ = "stock_levels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    on_hand = Column(Integer, default=0, nullable=False)
+    # Promised to tasks but still on the shelf
+    reserved = Column(Integer, default=0, nullable=False)
+    version = Column(Integer, default=1, nullable=False)
+
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    part_id = Column(Integer, ForeignKey("parts.id", ondelete="CASCADE"), nullable=False)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False, index=True)
+
+    # Relationships
+    part = relationship("Part", back_populates="stock_levels")
+    warehouse = relationship("Warehouse", lazy="joined")
+
+    __table_args__ = (
+        UniqueConstraint("part_id", "warehouse_id", name="uq_stock_levels_part_warehouse"),
+        # The last guard against overselling, whatever the code path
+        CheckConstraint("reserved >= 0 AND reserved <= on_hand", name="ck_stock_levels_reserved"),
+    )
+    # Updates through the ORM check the version they read (optimistic locking)
+    __mapper_args__ = {"version_id_col": version}
+
+    @property
+    def available(self) -> int:
+        return self.on_hand - self.reserved
+
+    def __repr__(self):
+        return f"<StockLevel part={self.part_id} warehouse={self.warehouse_id}: {self.on_hand}/{self.reserved}>"
+
+
+class StockMovement(Base):
+    """
+    Append-only ledger of stock changes; stock levels are its running sums
+    """
+    __tablename__ = "stock_movements"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(
+        Enum("receipt", "issue", "adjustment", "transfer_in", "transfer_out", name="stock_movement_kind"),
+        nullable=False,
+    )
+    # Signed change of the quantity on hand
+    quantity = Column(Integer, nullable=False)
+    # Quantity on hand in the warehouse after this movement
+    balance = Column(Integer, nullable=False)
+    note = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Foreign keys
+    part_id = Column(Integer, ForeignKey("parts.id", ondelete="CASCADE"), nullable=False)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True, index=True)
+    reservation_id = Column(Integer, ForeignKey("stock_reservations.id"), nullable=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Relationships
+    part = relationship("Part")
+    warehouse = relationship("Warehouse")
+    task = relationship("Task")
+    created_by = relationship("User")
+
+    # History of a part, latest first
+    __table_args__ = (Index("ix_stock_movements_part_warehouse_id", "part_id", "warehouse_id", "id"),)
+
+    def __repr__(self):
+        return f"<StockMovement {self.kind} {self.quantity:+d} part={self.part_id}>"
+
+
+@event.listens_for(StockMovement, "before_update")
+@event.listens_for(StockMovement, "before_delete")
+def _ledger_is_append_only(mapper: Any, connection: Any, target: StockMovement) -> None:
+    # Mistakes are corrected with an adjustment, never by rewriting history
+    raise ValueError("Stock movements can't be changed or deleted")
+
+
+class StockReservation(Base):
+    """
+    Parts set aside for a task until the engineer takes or returns them
+    """
+    __tablename__ = "stock_reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    quantity = Column(Integer, nullable=False)
+    status = Column(
+        Enum("active", "consumed", "released", name="stock_reservation_status"),
+        default="active",
+        nullable=False,
+    )
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    part_id = Column(Integer, ForeignKey("parts.id", ondelete="CASCADE"), nullable=False, index=True)
+    warehouse_id = Column(Integer, ForeignKey("warehouses.id"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Relationships
+    part = relationship("Part")
+    warehouse = relationship("Warehouse")
+    task = relationship("Task")
+    created_by = relationship("User")
+
+    __table_args__ = (CheckConstraint("quantity > 0", name="ck_stock_reservations_quantity"),)
+
+    def __repr__(self):
+        return f"<StockReservation {self.id}: {self.quantity} of part={self.part_id} for task={self.task_id}>"
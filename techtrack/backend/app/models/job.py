@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .user import User  # noqa
+
+
+class Job(Base):
+    """
+    Unit of background work, claimed by workers with FOR UPDATE SKIP LOCKED
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(
+        Enum("queued", "running", "succeeded", "failed", "cancelled", name="job_status"),
+        default="queued",
+        nullable=False,
+        index=True,
+    )
+    priority = Column(Integer, default=0, nullable=False)
+    # Idempotency key: enqueuing an existing key returns the existing job
+    dedupe_key = Column(String, nullable=True, unique=True)
+
+    # Retries
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+
+    # Worker lease, renewed by heartbeats while the job runs
+    locked_by = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Timestamps
+    run_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Foreign keys
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Relationships
+    created_by = relationship("User")
+
+    # Dequeue scans queued jobs in claim order
+    __table_args__ = (Index("ix_jobs_status_priority_run_at", "status", "priority", "run_at"),)
+
+    def __repr__(self):
+        return f"<Job {self.id}: {self.kind} {self.status}>"
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DDL, JSON, Column, DateTime, ForeignKey, Integer, String, Text, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .user import User  # noqa
+
+
+class KnowledgeItem(Base):
+    __tablename__ = "knowledge_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, index=True, nullable=False)
+    content = Column(Text)
+    category = Column(String, index=True)
+    tags = Column(JSON().with_variant(JSONB(), "postgresql"), default=list)
+    file_url = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Relationships
+    created_by = relationship("User")
+
+    def __repr__(self):
+        return f"<KnowledgeItem {self.id}: {self.title}>"
+
+
+# Full-text search structures live outside the ORM model because they are
+# dialect specific.
+#
+# PostgreSQL: a stored generated tsvector with a GIN index. The "russian"
+# configuration stems Cyrillic words with the Russian stemmer and ASCII
+# words with the English one, so mixed-language manuals are covered.
+for statement in (
+    """
+    ALTER TABLE knowledge_items ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_knowledge_items_search_vector ON knowledge_items USING GIN (search_vector)",
+    "CREATE INDEX ix_knowledge_items_tags ON knowledge_items USING GIN (tags)",
+):
+    event.listen(
+        KnowledgeItem.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+
+# SQLite (local/offline runs): an external-content FTS5 table kept in sync
+# by triggers. unicode61 folds case for Cyrillic; porter stems English only.
+for statement in (
+    """
+    CREATE VIRTUAL TABLE knowledge_fts USING fts5(
+        title, category, content,
+        content='knowledge_items', content_rowid='id',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER knowledge_items_fts_insert AFTER INSERT ON knowledge_items BEGIN
+        INSERT INTO knowledge_fts(rowid, title, category, content)
+        VALUES (new.id, new.title, new.category, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER knowledge_items_fts_delete AFTER DELETE ON knowledge_items BEGIN
+        INSERT INTO knowledge_fts(knowledge_fts, rowid, title, category, content)
+        VALUES ('delete', old.id, old.title, old.category, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER knowledge_items_fts_update AFTER UPDATE ON knowledge_items BEGIN
+        INSERT INTO knowledge_fts(knowledge_fts, rowid, title, category, content)
+        VALUES ('delete', old.id, old.title, old.category, old.content);
+        INSERT INTO knowledge_fts(rowid, title, category, content)
+        VALUES (new.id, new.title, new.category, new.content);
+    END
+    """,
+):
+    event.listen(
+        KnowledgeItem.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite")
+    )
+
+event.listen(
+    KnowledgeItem.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS knowledge_fts").execute_if(dialect="sqlite"),
+)
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .equipment import Equipment  # noqa
+    from .task import Task  # noqa
+    from .user import User  # noqa
+
+
+class MaintenanceRule(Base):
+    """
+    When equipment needs service: every N working hours and/or every N days,
+    or ahead of the end of its warranty
+    """
+    __tablename__ = "maintenance_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+
+    # Which equipment the rule covers (empty matches any)
+    equipment_model = Column(String, nullable=True, index=True)
+    manufacturer = Column(String, nullable=True, index=True)
+
+    # Intervals; the first one reached makes the service due
+    hours_interval = Column(Float, nullable=True)
+    days_interval = Column(Integer, nullable=True)
+    # Warranty rule: notify this many days before warranty_expiry
+    warranty_notice_days = Column(Integer, nullable=True)
+
+    # How early the service task is created
+    lead_days = Column(Integer, default=14, nullable=False)
+    lead_hours = Column(Float, default=50, nullable=False)
+
+    priority = Column(Enum("низкий", "средний", "высокий", name="priority_types"), default="средний")
+    is_active = Column(Boolean, default=True, index=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Relationships
+    created_by = relationship("User")
+
+    def __repr__(self):
+        return f"<MaintenanceRule {self.id}: {self.name}>"
+
+
+class MaintenanceSchedule(Base):
+    """
+    Evaluation state of one rule for one unit: when it is next due and the
+    task raised for it
+    """
+    __tablename__ = "maintenance_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Next service, by date and/or by working hours
+    due_at = Column(DateTime, nullable=True)
+    due_hours = Column(Float, nullable=True)
+    is_due = Column(Boolean, default=False, nullable=False)
+
+    # Last service seen and the hour meter at that point, the baseline of
+    # hour intervals
+    serviced_at = Column(DateTime, nullable=True)
+    service_hours = Column(Float, nullable=True)
+    # First reading of the hour meter, to estimate usage per day
+    observed_hours = Column(Float, nullable=True)
+    observed_at = Column(DateTime, nullable=True)
+
+    evaluated_at = Column(DateTime, nullable=True)
+
+    # Foreign keys
+    equipment_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), nullable=False)
+    rule_id = Column(Integer, ForeignKey("maintenance_rules.id", ondelete="CASCADE"), nullable=False)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    # Relationships
+    equipment = relationship("Equipment")
+    rule = relationship("MaintenanceRule")
+    task = relationship("Task")
+
+    __table_args__ = (
+        UniqueConstraint("equipment_id", "rule_id", name="uq_maintenance_schedules_equipment_rule"),
+    )
+
+    def __repr__(self):
+        return f"<MaintenanceSchedule equipment={self.equipment_id} rule={self.rule_id}>"
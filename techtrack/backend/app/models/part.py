@@ -0,0 +1,70 @@
+import re
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship, validates
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .equipment import Equipment  # noqa
+    from .inventory import StockLevel  # noqa
+
+_YEAR = re.compile(r"(?<!\d)(19[5-9]\d|20\d\d)(?!\d)")
+# "2015+", "2015-", "с 2015 по н.в.": no upper bound
+_OPEN_RANGE = re.compile(r"(\+|[-–—]|н\.\s*в\.?|наст\w*)\s*$", re.IGNORECASE)
+
+
+def parse_year_range(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    First and last compatible year from free text such as "2012-2018",
+    "2015, 2017" or "2019+"; (None, None) when no year is given
+    """
+    years = [int(y) for y in _YEAR.findall(text or "")]
+    if not years:
+        return None, None
+    last = None if _OPEN_RANGE.search(text) else max(years)
+    return min(years), last
+
+
+class Part(Base):
+    __tablename__ = "parts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    article_number = Column(String, index=True)
+    equipment_type = Column(String, index=True)
+    compatible_years = Column(String, nullable=True)
+    # Parsed from compatible_years for indexed compatibility lookups
+    compatible_from_year = Column(Integer, nullable=True)
+    compatible_to_year = Column(Integer, nullable=True)
+    # Total on hand in all warehouses, kept up to date by the stock ledger
+    quantity = Column(Integer, default=0)
+    status = Column(Enum("В наличии", "Заказано", "Требуется", name="part_status"), default="В наличии")
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=True, index=True)
+
+    # Relationships
+    equipment = relationship("Equipment", back_populates="parts")
+    stock_levels = relationship("StockLevel", back_populates="part", passive_deletes=True)
+
+    __table_args__ = (
+        # Keyset scans of the offline sync feed
+        Index("ix_parts_updated_at_id", "updated_at", "id"),
+        # Parts that fit a given equipment type and year
+        Index("ix_parts_compatibility", "equipment_type", "compatible_from_year", "compatible_to_year"),
+    )
+
+    @validates("compatible_years")
+    def _parse_compatible_years(self, key: str, value: Optional[str]) -> Optional[str]:
+        self.compatible_from_year, self.compatible_to_year = parse_year_range(value)
+        return value
+
+    def __repr__(self):
+        return f"<Part {self.article_number}: {self.name}>"
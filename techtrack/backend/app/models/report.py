@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .user import User  # noqa
+    from .task import Task  # noqa
+    from .equipment import Equipment  # noqa
+
+
+class Report(Base):
+    __tablename__ = "reports"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, index=True)
+    content = Column(Text)
+    type = Column(
+        Enum(
+            "Акт выполненных работ",
+            "Акт ТО",
+            "Отчет о поломке",
+            "Ежемесячный отчет",
+            name="report_types",
+        ),
+        index=True,
+    )
+    file_url = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True, index=True)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=True, index=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Relationships
+    task = relationship("Task", back_populates="reports")
+    equipment = relationship("Equipment", back_populates="reports")
+    created_by = relationship("User", back_populates="reports")
+
+    # Keyset scans of the offline sync feed
+    __table_args__ = (Index("ix_reports_updated_at_id", "updated_at", "id"),)
+
+    def __repr__(self):
+        return f"<Report {self.id}: {self.title}>"
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -42,10 +42,10 @@ class Task(Base):
     completed_at = Column(DateTime, nullable=True)
 
     # Foreign keys
-    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=True)
-    assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    equipment_id = Column(Integer, ForeignKey("equipment.id"), nullable=True, index=True)
+    assigned_to_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=True)
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=True, index=True)
 
     # Relationships
     equipment = relationship("Equipment", back_populates="tasks")
@@ -54,5 +54,8 @@ class Task(Base):
     trip = relationship("Trip", back_populates="tasks")
     reports = relationship("Report", back_populates="task")
 
+    # Keyset scans of the offline sync feed
+    __table_args__ = (Index("ix_tasks_updated_at_id", "updated_at", "id"),)
+
     def __repr__(self):
         return f"<Task {self.id}: {self.title}>"
\ No newline at end of file
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .user import User  # noqa
+    from .task import Task  # noqa
+
+
+class Trip(Base):
+    __tablename__ = "trips"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, index=True)
+    description = Column(Text)
+    city = Column(String, index=True)
+    status = Column(
+        Enum("Запланирована", "В процессе", "Завершена", "Отменена", name="trip_status"),
+        default="Запланирована",
+        index=True,
+    )
+
+    # Dates
+    start_date = Column(DateTime, index=True)
+    end_date = Column(DateTime)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Foreign keys
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Relationships
+    user = relationship("User", back_populates="trips")
+    tasks = relationship("Task", back_populates="trip")
+
+    def __repr__(self):
+        return f"<Trip {self.id}: {self.title}>"
@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import BigInteger, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+
+from app.core.config import settings
+from app.db.session import Base
+
+if TYPE_CHECKING:
+    from .report import Report  # noqa
+    from .task import Task  # noqa
+    from .user import User  # noqa
+
+
+class FileBlob(Base):
+    """
+    Stored file content, kept once per SHA-256 however often it is uploaded
+    """
+    __tablename__ = "file_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=True)
+    # Storage key of the JPEG preview of photos, made by a background job
+    thumbnail_key = Column(String, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def storage_key(self) -> str:
+        return f"{self.sha256[:2]}/{self.sha256}"
+
+    @property
+    def file_url(self) -> str:
+        return f"{settings.API_V1_STR}/files/{self.sha256}"
+
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return f"{self.file_url}/thumbnail" if self.thumbnail_key else None
+
+    def __repr__(self):
+        return f"<FileBlob {self.sha256[:12]}: {self.size} bytes>"
+
+
+class Upload(Base):
+    """
+    Resumable upload of one file; its id is the capability to send chunks
+    """
+    __tablename__ = "uploads"
+
+    id = Column(String(32), primary_key=True)
+    filename = Column(String, nullable=False)
+    content_type = Column(String, nullable=True)
+    length = Column(BigInteger, nullable=False)
+    offset = Column(BigInteger, default=0, nullable=False)
+    status = Column(Enum("uploading", "complete", name="upload_status"), default="uploading", nullable=False)
+    # SHA-256 announced by the client, checked once all bytes have arrived
+    checksum = Column(String(64), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)
+
+    # Foreign keys
+    blob_id = Column(Integer, ForeignKey("file_blobs.id"), nullable=True, index=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    report_id = Column(Integer, ForeignKey("reports.id"), nullable=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=True, index=True)
+
+    # Relationships
+    blob = relationship("FileBlob", lazy="joined")
+    created_by = relationship("User")
+
+    @property
+    def file_url(self) -> Optional[str]:
+        return self.blob.file_url if self.blob is not None else None
+
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return self.blob.thumbnail_url if self.blob is not None else None
+
+    def __repr__(self):
+        return f"<Upload {self.id}: {self.filename} {self.offset}/{self.length}>"
@@ -0,0 +1,58 @@
+"""
+OpenAPI schema computed at build time.
+
+    python -m app.openapi --output openapi.json
+
+With OPENAPI_SCHEMA_FILE pointing at the file the app serves it as is,
+instead of building the schema (and, with LAZY_ROUTERS, importing every
+endpoint module) on the first /docs request. Build the file from the same
+code it is served with.
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from fastapi import FastAPI
+
+from app.api.lazy import load_lazy_routers
+
+
+def generate_openapi(app: FastAPI) -> Dict[str, Any]:
+    load_lazy_routers(app)
+    app.openapi_schema = None
+    return FastAPI.openapi(app)
+
+
+def install_openapi(app: FastAPI, schema_file: Optional[str] = None) -> None:
+    def openapi() -> Dict[str, Any]:
+        if app.openapi_schema is None:
+            if schema_file and os.path.exists(schema_file):
+                with open(schema_file, encoding="utf-8") as f:
+                    app.openapi_schema = json.load(f)
+            else:
+                generate_openapi(app)
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema of the API")
+    parser.add_argument("--output", help="schema file, stdout by default")
+    args = parser.parse_args()
+
+    from app.main import app
+
+    text = json.dumps(generate_openapi(app), ensure_ascii=False, separators=(",", ":"))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"OpenAPI schema written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel
+
+AuditAction = Literal["create", "update", "delete"]
+
+
+# Properties shared by models stored in DB
+class AuditEventInDBBase(BaseModel):
+    id: str
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    entity: str
+    entity_id: int
+    action: AuditAction
+    # field -> [old, new]
+    changes: Dict[str, List[Any]]
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class AuditEvent(AuditEventInDBBase):
+    pass
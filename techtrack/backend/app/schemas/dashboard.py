@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class TaskCounters(BaseModel):
+    by_status: Dict[str, int]
+    open_by_city: Dict[str, int]
+    open_by_priority: Dict[str, int]
+    overdue: int
+
+
+class EquipmentCounters(BaseModel):
+    by_status: Dict[str, int]
+    by_city: Dict[str, int]
+    requiring_maintenance: int
+
+
+class DashboardStats(BaseModel):
+    """
+    Dashboard counters as of refreshed_at
+    """
+    tasks: TaskCounters
+    equipment: EquipmentCounters
+    refreshed_at: datetime
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+EquipmentStatus = Literal["Рабочий", "Требует ТО", "В ремонте"]
+
+
+# Properties shared by all equipment schemas
+class EquipmentBase(BaseModel):
+    name: Optional[str] = None
+    model: Optional[str] = None
+    serial_number: Optional[str] = None
+    manufacturer: Optional[str] = None
+    year: Optional[int] = None
+    city: Optional[str] = None
+    location: Optional[str] = None
+    organization: Optional[str] = None
+    address: Optional[str] = None
+    contact_person: Optional[str] = None
+    contact_phone: Optional[str] = None
+    contact_email: Optional[str] = None
+    status: Optional[EquipmentStatus] = "Рабочий"
+    working_hours: Optional[float] = 0
+    max_energy: Optional[str] = None
+    warranty_expiry: Optional[datetime] = None
+    notes: Optional[str] = None
+    installed_at: Optional[datetime] = None
+    last_service: Optional[datetime] = None
+
+
+# Properties received on equipment creation
+class EquipmentCreate(EquipmentBase):
+    name: str
+    serial_number: str
+
+
+# Properties to receive via API for updating equipment
+class EquipmentUpdate(EquipmentBase):
+    status: Optional[EquipmentStatus] = None
+    working_hours: Optional[float] = None
+
+
+# Properties shared by models stored in DB
+class EquipmentInDBBase(EquipmentBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Equipment(EquipmentInDBBase):
+    pass
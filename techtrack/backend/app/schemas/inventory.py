@@ -0,0 +1,127 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.part import Part
+
+StockMovementKind = Literal["receipt", "issue", "adjustment", "transfer_in", "transfer_out"]
+ReservationStatus = Literal["active", "consumed", "released"]
+
+
+# Properties shared by all warehouse schemas
+class WarehouseBase(BaseModel):
+    name: Optional[str] = None
+    city: Optional[str] = None
+    is_active: Optional[bool] = True
+
+
+# Properties received on warehouse creation
+class WarehouseCreate(WarehouseBase):
+    name: str = Field(..., min_length=1)
+
+
+# Properties shared by models stored in DB
+class WarehouseInDBBase(WarehouseBase):
+    id: int
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Warehouse(WarehouseInDBBase):
+    pass
+
+
+# Stock of a part in one warehouse
+class StockLevel(BaseModel):
+    part_id: int
+    warehouse_id: int
+    on_hand: int
+    reserved: int
+    available: int
+    version: int
+    updated_at: datetime
+    warehouse: Warehouse
+
+    class Config:
+        orm_mode = True
+
+
+# Properties received when recording a movement by hand. Quantities of
+# receipts and issues are positive; adjustments are signed corrections.
+class StockMovementCreate(BaseModel):
+    part_id: int
+    warehouse_id: int
+    kind: Literal["receipt", "issue", "adjustment"]
+    quantity: int
+    task_id: Optional[int] = None
+    note: Optional[str] = None
+
+
+# Properties received when moving stock between warehouses
+class StockTransferCreate(BaseModel):
+    part_id: int
+    from_warehouse_id: int
+    to_warehouse_id: int
+    quantity: int = Field(..., gt=0)
+    note: Optional[str] = None
+
+
+# Properties shared by models stored in DB
+class StockMovementInDBBase(BaseModel):
+    id: int
+    kind: StockMovementKind
+    quantity: int
+    balance: int
+    note: Optional[str] = None
+    part_id: int
+    warehouse_id: int
+    task_id: Optional[int] = None
+    reservation_id: Optional[int] = None
+    created_by_id: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class StockMovement(StockMovementInDBBase):
+    pass
+
+
+# Properties received when reserving parts for a task
+class StockReservationCreate(BaseModel):
+    part_id: int
+    warehouse_id: int
+    task_id: int
+    quantity: int = Field(..., gt=0)
+
+
+# Properties shared by models stored in DB
+class StockReservationInDBBase(BaseModel):
+    id: int
+    part_id: int
+    warehouse_id: int
+    task_id: int
+    quantity: int
+    status: ReservationStatus
+    created_by_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class StockReservation(StockReservationInDBBase):
+    pass
+
+
+# Catalog part that fits the equipment, with what can still be reserved
+class CompatiblePart(Part):
+    available: int
@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+
+
+# Properties received when enqueuing a job
+class JobCreate(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    priority: int = 0
+    run_at: Optional[datetime] = None
+    max_attempts: Optional[int] = Field(None, ge=1, le=50)
+    dedupe_key: Optional[str] = None
+
+
+# Properties shared by models stored in DB
+class JobInDBBase(BaseModel):
+    id: int
+    kind: str
+    payload: Dict[str, Any]
+    status: JobStatus
+    priority: int
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    result: Optional[Any] = None
+    run_at: datetime
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_by_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Job(JobInDBBase):
+    pass
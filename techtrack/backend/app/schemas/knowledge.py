@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+# Properties shared by all knowledge item schemas
+class KnowledgeItemBase(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+    category: Optional[str] = None
+    tags: List[str] = []
+    file_url: Optional[str] = None
+
+
+# Properties received on knowledge item creation
+class KnowledgeItemCreate(KnowledgeItemBase):
+    title: str
+    content: str
+    category: str
+
+
+# Properties to receive via API for updating a knowledge item
+class KnowledgeItemUpdate(KnowledgeItemBase):
+    tags: Optional[List[str]] = None
+
+
+# Properties shared by models stored in DB
+class KnowledgeItemInDBBase(KnowledgeItemBase):
+    id: int
+    created_by_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class KnowledgeItem(KnowledgeItemInDBBase):
+    pass
+
+
+# Search results
+class KnowledgeSearchHit(BaseModel):
+    id: int
+    title: str
+    category: Optional[str] = None
+    tags: List[str] = []
+    file_url: Optional[str] = None
+    updated_at: datetime
+    rank: float
+    snippet: Optional[str] = None
+
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+
+class KnowledgeSearchResult(BaseModel):
+    items: List[KnowledgeSearchHit]
+    facets: List[TagFacet]
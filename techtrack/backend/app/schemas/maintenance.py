@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.task import TaskPriority
+
+
+# Properties shared by all maintenance rule schemas
+class MaintenanceRuleBase(BaseModel):
+    name: Optional[str] = None
+    equipment_model: Optional[str] = None
+    manufacturer: Optional[str] = None
+    hours_interval: Optional[float] = Field(None, gt=0)
+    days_interval: Optional[int] = Field(None, gt=0)
+    warranty_notice_days: Optional[int] = Field(None, gt=0)
+    lead_days: int = Field(14, ge=0)
+    lead_hours: float = Field(50, ge=0)
+    priority: Optional[TaskPriority] = "средний"
+    is_active: bool = True
+
+
+# Properties received on rule creation
+class MaintenanceRuleCreate(MaintenanceRuleBase):
+    name: str
+
+
+# Properties shared by models stored in DB
+class MaintenanceRuleInDBBase(MaintenanceRuleBase):
+    id: int
+    created_by_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class MaintenanceRule(MaintenanceRuleInDBBase):
+    pass
+
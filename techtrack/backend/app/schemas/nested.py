@@ -0,0 +1,46 @@
+"""
+Read schemas with nested relationships.
+
+They live apart from the per-entity modules because tasks nest equipment
+and trips while equipment and trips nest tasks, which would otherwise be a
+circular import. Each one matches a loading profile of its service, so
+serialization never triggers lazy loads.
+"""
+from typing import List, Optional
+
+from app.schemas.equipment import Equipment
+from app.schemas.part import Part
+from app.schemas.report import Report
+from app.schemas.task import Task
+from app.schemas.trip import Trip
+from app.schemas.user import User
+
+
+# Task as shown in lists ("list" profile)
+class TaskListItem(Task):
+    equipment: Optional[Equipment] = None
+    assigned_to: Optional[User] = None
+    created_by: Optional[User] = None
+    trip: Optional[Trip] = None
+
+
+# Task with everything the detail screen shows ("detail" profile)
+class TaskDetail(TaskListItem):
+    reports: List[Report] = []
+
+
+# Equipment with its history ("detail" profile)
+class EquipmentDetail(Equipment):
+    tasks: List[Task] = []
+    parts: List[Part] = []
+    reports: List[Report] = []
+
+
+# Trip as shown in lists ("list" profile)
+class TripListItem(Trip):
+    user: Optional[User] = None
+
+
+# Trip with its itinerary ("detail" profile)
+class TripDetail(TripListItem):
+    tasks: List[TaskListItem] = []
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+PartStatus = Literal["В наличии", "Заказано", "Требуется"]
+
+
+# Properties shared by all part schemas
+class PartBase(BaseModel):
+    name: Optional[str] = None
+    article_number: Optional[str] = None
+    equipment_type: Optional[str] = None
+    compatible_years: Optional[str] = None
+    status: Optional[PartStatus] = "В наличии"
+    equipment_id: Optional[int] = None
+
+
+# Properties received on part creation
+class PartCreate(PartBase):
+    name: str
+    article_number: str
+
+
+# Properties to receive via API for updating a part
+class PartUpdate(PartBase):
+    status: Optional[PartStatus] = None
+
+
+# Properties shared by models stored in DB
+class PartInDBBase(PartBase):
+    id: int
+    # Read-only: the stock ledger keeps it equal to the stock on hand
+    quantity: Optional[int] = 0
+    compatible_from_year: Optional[int] = None
+    compatible_to_year: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Part(PartInDBBase):
+    pass
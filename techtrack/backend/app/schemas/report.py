@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+ReportType = Literal["Акт выполненных работ", "Акт ТО", "Отчет о поломке", "Ежемесячный отчет"]
+
+
+# Properties shared by all report schemas
+class ReportBase(BaseModel):
+    title: Optional[str] = None
+    content: Optional[str] = None
+    type: Optional[ReportType] = None
+    task_id: Optional[int] = None
+    equipment_id: Optional[int] = None
+    file_url: Optional[str] = None
+
+
+# Properties received on report creation
+class ReportCreate(ReportBase):
+    title: str
+    type: ReportType
+
+
+# Properties to receive via API for updating a report
+class ReportUpdate(ReportBase):
+    pass
+
+
+# Properties shared by models stored in DB
+class ReportInDBBase(ReportBase):
+    id: int
+    created_by_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Report(ReportInDBBase):
+    pass
+
+
+ReportFormat = Literal["pdf", "html"]
+
+
+# Reports to render in the background: explicit ids, or a whole month
+class ReportRenderRequest(BaseModel):
+    report_ids: Optional[List[int]] = Field(None, min_length=1)
+    year: Optional[int] = Field(None, ge=2000, le=2100)
+    month: Optional[int] = Field(None, ge=1, le=12)
+    type: Optional[ReportType] = None
+    format: ReportFormat = "pdf"
+
+
+class RenderedReport(BaseModel):
+    report_id: int
+    format: ReportFormat
+    file_url: str
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TripPlanRequest(BaseModel):
+    engineer_ids: List[int] = Field(..., min_length=1)
+    start_date: date
+    days: int = Field(5, ge=1, le=31)
+    # Only plan open tasks in these cities (all cities when omitted)
+    cities: Optional[List[str]] = None
+    service_minutes: Optional[int] = Field(None, ge=1, le=24 * 60)
+    # Create the trips and assign the tasks instead of only previewing
+    commit: bool = False
+
+
+class PlannedStop(BaseModel):
+    task_id: int
+    title: Optional[str] = None
+    city: Optional[str] = None
+    location: Optional[str] = None
+    priority: Optional[str] = None
+    due_date: Optional[datetime] = None
+    late_days: int = 0
+
+
+class PlannedDay(BaseModel):
+    date: date
+    stops: List[PlannedStop]
+    travel_km: float
+    travel_minutes: float
+
+
+class EngineerItinerary(BaseModel):
+    user_id: int
+    full_name: Optional[str] = None
+    start_city: Optional[str] = None
+    days: List[PlannedDay]
+    travel_km: float
+    trip_id: Optional[int] = None
+
+
+class UnplannedTask(BaseModel):
+    task_id: int
+    reason: str
+
+
+class TripPlan(BaseModel):
+    """
+    Itineraries per engineer, and the tasks that could not be planned
+    """
+    itineraries: List[EngineerItinerary]
+    unplanned: List[UnplannedTask]
+    total_travel_km: float
+    elapsed_ms: int
@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SyncChanges(BaseModel):
+    """
+    Delta feed page for the offline stores
+    """
+    changes: Dict[str, List[Dict[str, Any]]]
+    deleted: Dict[str, List[int]]
+    next_token: str
+    has_more: bool
+
+
+# One entry of the PWA sync-queue store
+class SyncMutation(BaseModel):
+    client_id: Optional[int] = Field(None, alias="id")
+    type: Literal["CREATE", "UPDATE", "DELETE"]
+    store_name: str = Field(..., alias="storeName")
+    data: Dict[str, Any] = {}
+    # updated_at of the copy the client edited; defaults to data["updated_at"]
+    base_updated_at: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class SyncBatch(BaseModel):
+    mutations: List[SyncMutation]
+
+
+class SyncMutationResult(BaseModel):
+    client_id: Optional[int] = None
+    id: int
+    updated_at: Optional[datetime] = None
+
+
+class SyncBatchResult(BaseModel):
+    results: List[SyncMutationResult]
@@ -0,0 +1,52 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+TaskPriority = Literal["низкий", "средний", "высокий"]
+TaskStatus = Literal["новая", "назначена", "в работе", "выполнена", "отменена"]
+DateType = Literal["fixed", "nextService"]
+
+
+# Properties shared by all task schemas
+class TaskBase(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    city: Optional[str] = None
+    location: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    status: Optional[TaskStatus] = "новая"
+    date_type: Optional[DateType] = "fixed"
+    due_date: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    equipment_id: Optional[int] = None
+    assigned_to_id: Optional[int] = None
+    trip_id: Optional[int] = None
+
+
+# Properties received on task creation
+class TaskCreate(TaskBase):
+    title: str
+
+
+# Properties to receive via API for updating a task
+class TaskUpdate(TaskBase):
+    status: Optional[TaskStatus] = None
+    date_type: Optional[DateType] = None
+
+
+# Properties shared by models stored in DB
+class TaskInDBBase(TaskBase):
+    id: int
+    created_by_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Task(TaskInDBBase):
+    pass
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+TripStatus = Literal["Запланирована", "В процессе", "Завершена", "Отменена"]
+
+
+# Properties shared by all trip schemas
+class TripBase(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    city: Optional[str] = None
+    status: Optional[TripStatus] = "Запланирована"
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+# Properties received on trip creation
+class TripCreate(TripBase):
+    title: str
+    city: str
+    start_date: datetime
+    end_date: datetime
+
+
+# Properties to receive via API for updating a trip
+class TripUpdate(TripBase):
+    status: Optional[TripStatus] = None
+
+
+# Properties shared by models stored in DB
+class TripInDBBase(TripBase):
+    id: int
+    user_id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Trip(TripInDBBase):
+    pass
@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+# Properties received when starting an upload
+class UploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    content_type: Optional[str] = None
+    length: int = Field(..., ge=0)
+    # SHA-256 of the file, hex: checked once all bytes have arrived
+    checksum: Optional[str] = Field(None, pattern="^[0-9a-f]{64}$")
+    report_id: Optional[int] = None
+    task_id: Optional[int] = None
+
+
+# Properties shared by models stored in DB
+class UploadInDBBase(BaseModel):
+    id: str
+    filename: str
+    content_type: Optional[str] = None
+    length: int
+    offset: int
+    status: Literal["uploading", "complete"]
+    report_id: Optional[int] = None
+    task_id: Optional[int] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    file_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+# Properties to return to client
+class Upload(UploadInDBBase):
+    pass
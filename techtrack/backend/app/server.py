@@ -0,0 +1,186 @@
+"""
+Production server: gunicorn managing uvicorn worker processes.
+
+    python -m app.server                  # SERVER_BIND, WEB_CONCURRENCY workers
+    python -m app.server --workers 8 --bind 0.0.0.0:8080
+
+The app is imported once in the master and forked into the workers, with
+everything that is the same for all of them done before the fork: endpoint
+modules loaded, OpenAPI schema built, bcrypt cost calibrated. Each worker
+then fills its database pools and checks the dashboard snapshot during
+startup, before it accepts a connection.
+
+The password hashing and report rendering pools are sized per host and
+split between the workers, which already take a core each; only one worker
+at a time runs the dashboard refresher. Metrics are exported by every worker
+to a shared directory, so that /metrics answers for all of them, and the
+principal cache is turned off unless the cache is shared.
+
+Signals to the master: TERM drains the workers and exits, HUP replaces the
+workers gracefully, TTIN/TTOU add or remove a worker.
+"""
+import argparse
+import gc
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Any, Dict
+
+from fastapi import FastAPI
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError as e:
+    raise RuntimeError(
+        "The production server needs gunicorn (pip install gunicorn), which runs on Unix only; "
+        "run uvicorn app.main:app elsewhere"
+    ) from e
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Worker(UvicornWorker):
+    # A worker whose startup fails exits with a boot error instead of serving
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto", "lifespan": "on"}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Stop waiting for in-flight requests a little before the master
+        # kills the worker, so that the shutdown handlers still run
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - 5, 1)
+
+
+def default_workers() -> int:
+    """
+    One worker per core this process may run on
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        return os.cpu_count() or 1
+
+
+def prepare_app(app: FastAPI, workers: int) -> None:
+    """
+    Work shared by all workers, done once in the master before the fork
+    """
+    from app.api.lazy import load_lazy_routers
+    from app.core.security import calibrate_bcrypt_rounds
+
+    # Workers calibrating concurrently would each pick their own cost and
+    # keep flagging each other's hashes for rehashing
+    if settings.PASSWORD_HASH_ROUNDS is None:
+        settings.PASSWORD_HASH_ROUNDS = calibrate_bcrypt_rounds()
+    # A pool per worker would put workers x pool size processes on the host's
+    # cores; with fewer processes than workers the work runs in each worker
+    # (hashing in threads, as bcrypt releases the GIL)
+    settings.PASSWORD_HASH_WORKERS //= workers
+    settings.REPORT_RENDER_PROCESSES //= workers
+    if settings.DASHBOARD_REFRESHER_LOCK_FILE is None:
+        # One per database, in case several deployments share the host
+        digest = hashlib.sha256(str(settings.SQLALCHEMY_DATABASE_URI).encode()).hexdigest()[:16]
+        settings.DASHBOARD_REFRESHER_LOCK_FILE = os.path.join(
+            tempfile.gettempdir(), f"techtrack-dashboard-{digest}.lock"
+        )
+    if workers > 1:
+        _share_between_workers()
+    load_lazy_routers(app)
+    app.openapi()
+    # Objects loaded so far live as long as the workers; keeping them out of
+    # the collector spares the copy-on-write pages a full collection touches
+    gc.freeze()
+
+
+def _share_between_workers() -> None:
+    from app.core.cache import MemoryCacheBackend, cache
+    from app.core.metrics import clear_multiprocess_dir
+    from app.core.principal_cache import principal_cache
+
+    # An in-process cache would keep serving a deactivated user or an old
+    # role from the workers that did not see the invalidation
+    if isinstance(cache.backend, MemoryCacheBackend) and principal_cache.ttl > 0:
+        logger.warning(
+            "Principal cache disabled: CACHE_URL is private to each of the workers, use redis:// to share it"
+        )
+        settings.PRINCIPAL_CACHE_TTL_SECONDS = principal_cache.ttl = 0
+    if settings.METRICS_ENABLED:
+        if settings.METRICS_MULTIPROCESS_DIR is None:
+            settings.METRICS_MULTIPROCESS_DIR = tempfile.mkdtemp(prefix="techtrack-metrics-")
+        else:
+            os.makedirs(settings.METRICS_MULTIPROCESS_DIR, exist_ok=True)
+            clear_multiprocess_dir(settings.METRICS_MULTIPROCESS_DIR)
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    from app.db.session import async_engine, engine
+
+    # Nothing should have connected in the master, but a pooled connection
+    # shared between processes would corrupt both ends: drop without closing
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    from app.core.metrics import fold_exited_worker
+
+    fold_exited_worker(worker.pid)
+
+
+def on_exit(server: Any) -> None:
+    from app.core.metrics import clear_multiprocess_dir
+
+    if settings.METRICS_MULTIPROCESS_DIR:
+        clear_multiprocess_dir(settings.METRICS_MULTIPROCESS_DIR)
+
+
+class Server(BaseApplication):
+    def __init__(self, options: Dict[str, Any]) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> FastAPI:
+        from app.main import app
+
+        prepare_app(app, self.cfg.workers)
+        return app
+
+
+def server_options(bind: str, workers: int) -> Dict[str, Any]:
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": "app.server.Worker",
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": settings.SERVER_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "on_exit": on_exit,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with a worker process per core")
+    parser.add_argument("--bind", default=settings.SERVER_BIND, help="address:port or unix:path")
+    parser.add_argument(
+        "--workers", type=int, default=settings.WEB_CONCURRENCY or default_workers(),
+        help="worker processes, one per core by default",
+    )
+    args = parser.parse_args()
+
+    Server(server_options(args.bind, args.workers)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Audit log of changes to users, tasks and equipment.
+
+Changes are captured from the ORM flush, published when the transaction
+commits, and kept in an in-process buffer that a background thread writes
+to the database in multi-row INSERT batches. A write only pays for building
+the event dicts; the buffer is flushed on shutdown.
+
+Bulk UPDATE/DELETE statements bypass the flush and are not audited; bulk
+INSERT ... ON CONFLICT writers report their rows with audit_bulk_rows.
+"""
+import logging
+import threading
+import uuid
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import Table, delete, event, insert, inspect, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import AUDIT_DROPPED
+from app.db.pagination import Keyset
+from app.db.session import SessionLocal, engine
+from app.models.audit import AuditEvent
+from app.models.equipment import Equipment
+from app.models.task import Task
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# User on whose behalf the current request or job writes
+audit_actor: ContextVar[Optional[int]] = ContextVar("audit_actor", default=None)
+
+AUDITED_MODELS = (User, Task, Equipment)
+AUDITED_TABLES = {model.__tablename__ for model in AUDITED_MODELS}
+
+# Recorded as changed, never with their values
+_SECRET_FIELDS = {"hashed_password"}
+# Change on every write and tell nothing
+_IGNORED_FIELDS = {"updated_at"}
+
+_SESSION_KEY = "audit_events"
+
+audit_keyset = Keyset(AuditEvent.occurred_at, AuditEvent.id, descending=True)
+
+
+def _value(key: str, value: Any) -> Any:
+    if key in _SECRET_FIELDS:
+        return "***" if value is not None else None
+    return to_jsonable_python(value, fallback=str)
+
+
+def _changes(obj: Any, action: str) -> Dict[str, List[Any]]:
+    state = inspect(obj)
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        key = attr.key
+        if key in _IGNORED_FIELDS:
+            continue
+        if action == "update":
+            history = state.attrs[key].history
+            if not history.has_changes():
+                continue
+            # The old value is only known when it was loaded before the change;
+            # setting an attribute of an expired object records null
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            if old == new:
+                continue
+        else:
+            # Values that are set and loaded; no SQL from inside the flush
+            value = state.dict.get(key)
+            if value is None:
+                continue
+            old, new = (None, value) if action == "create" else (value, None)
+        changes[key] = [_value(key, old), _value(key, new)]
+    return changes
+
+
+def _audit_record(obj: Any, action: str, actor_id: Optional[int], now: datetime) -> Optional[Dict[str, Any]]:
+    changes = _changes(obj, action)
+    if action == "update" and not changes:
+        return None
+    return {
+        "id": uuid.uuid4().hex,
+        "occurred_at": now,
+        "actor_id": actor_id,
+        "entity": obj.__tablename__,
+        "entity_id": obj.id,
+        "action": action,
+        "changes": changes,
+    }
+
+
+def audit_bulk_rows(
+    session: Session,
+    table: Table,
+    rows: Iterable[Tuple[Optional[Mapping[str, Any]], Mapping[str, Any]]],
+) -> None:
+    """
+    Record rows written by a statement that bypassed the flush, as pairs of
+    the row before (None for an inserted row) and after the write. They are
+    published when the session commits, like the flushed changes.
+    """
+    if table.name not in AUDITED_TABLES:
+        return
+    actor_id = audit_actor.get()
+    now = datetime.utcnow()
+    records = []
+    for old, new in rows:
+        action = "create" if old is None else "update"
+        changes = {}
+        for key, value in new.items():
+            if key in _IGNORED_FIELDS:
+                continue
+            before = old.get(key) if old is not None else None
+            if (value is None) if old is None else (before == value):
+                continue
+            changes[key] = [_value(key, before), _value(key, value)]
+        if action == "update" and not changes:
+            continue
+        records.append({
+            "id": uuid.uuid4().hex,
+            "occurred_at": now,
+            "actor_id": actor_id,
+            "entity": table.name,
+            "entity_id": new["id"],
+            "action": action,
+            "changes": changes,
+        })
+    if records:
+        session.info.setdefault(_SESSION_KEY, []).extend(records)
+
+
+@event.listens_for(Session, "after_flush")
+def _capture(session: Session, flush_context: Any) -> None:
+    actor_id = audit_actor.get()
+    now = datetime.utcnow()
+    records = []
+    for action, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if isinstance(obj, AUDITED_MODELS):
+                record = _audit_record(obj, action, actor_id, now)
+                if record is not None:
+                    records.append(record)
+    if records:
+        # Held by the session until the transaction ends
+        session.info.setdefault(_SESSION_KEY, []).extend(records)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish(session: Session) -> None:
+    records = session.info.pop(_SESSION_KEY, None)
+    if records:
+        audit_log.add(records)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard(session: Session) -> None:
+    # Changes that were never committed didn't happen
+    session.info.pop(_SESSION_KEY, None)
+
+
+def _month(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"{AuditEvent.__tablename__}_{month:%Y_%m}"
+
+
+# Monthly partitions known to exist in this process
+_partitions: Set[date] = set()
+
+
+def ensure_audit_partitions(months: Iterable[date]) -> None:
+    """
+    Create the monthly partitions of the audit table (PostgreSQL only)
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    for month in sorted(set(months) - _partitions):
+        name = _partition_name(month)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {AuditEvent.__tablename__} "
+                    f"FOR VALUES FROM ('{month}') TO ('{_next_month(month)}')"
+                ))
+        except DBAPIError:
+            # Another process created it at the same moment
+            with engine.connect() as conn:
+                if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+                    raise
+        _partitions.add(month)
+
+
+def write_audit_events(records: List[Dict[str, Any]]) -> None:
+    """
+    Insert audit records in multi-row INSERT batches, in one transaction
+    """
+    ensure_audit_partitions(_month(r["occurred_at"]) for r in records)
+    db = SessionLocal()
+    try:
+        batch_size = settings.AUDIT_BATCH_SIZE
+        for offset in range(0, len(records), batch_size):
+            db.execute(insert(AuditEvent), records[offset:offset + batch_size])
+        db.commit()
+    finally:
+        db.close()
+
+
+class AuditLog:
+    """
+    Buffer of committed audit records, written by a background thread every
+    `flush_interval` seconds or as soon as `batch_size` records wait.
+
+    The thread starts with the first record, in whichever process that is.
+    Writers never wait on the database: a failed write is retried on the
+    next tick, and while `max_records` wait, further records are dropped,
+    counted and logged rather than grow the buffer without bound.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, max_records: int) -> None:
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_records = max_records
+        self._records: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._full = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._keep(records)
+            pending = len(self._records)
+            if self._thread is None and not self._stopping.is_set():
+                self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._thread.start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _keep(self, records: List[Dict[str, Any]]) -> None:
+        # Called with the lock held
+        room = max(self.max_records - len(self._records), 0)
+        self._records.extend(records[:room])
+        lost = len(records) - room
+        if lost > 0:
+            # Logged once until a write makes room again, counted always
+            if not self._full:
+                logger.error("Audit buffer is full (%d records), dropping new records", self.max_records)
+                self._full = True
+            self.dropped += lost
+            AUDIT_DROPPED.inc(amount=lost)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def flush(self) -> int:
+        """
+        Write everything buffered; returns how many records were written
+        """
+        with self._flush_lock:
+            with self._lock:
+                records, self._records = self._records, []
+            if not records:
+                return 0
+            try:
+                write_audit_events(records)
+            except Exception:
+                logger.exception("Writing %d audit records failed, will retry", len(records))
+                with self._lock:
+                    arrived, self._records = self._records, records
+                    self._keep(arrived)
+                return 0
+            with self._lock:
+                self._full = False
+            return len(records)
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.flush() == 0 and self.pending():
+            logger.error("Lost %d audit records on shutdown", self.pending())
+
+
+audit_log = AuditLog(
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    max_records=settings.AUDIT_BUFFER_MAX_RECORDS,
+)
+
+
+def stop_audit_log() -> None:
+    audit_log.stop()
+
+
+def get_audit_events(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    entity: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    actor_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Tuple[List[AuditEvent], Optional[str]]:
+    """
+    Audit events, latest first. A time range only reads the partitions it
+    covers.
+    """
+    stmt = select(AuditEvent)
+    if entity:
+        stmt = stmt.where(AuditEvent.entity == entity)
+    if entity_id is not None:
+        stmt = stmt.where(AuditEvent.entity_id == entity_id)
+    if actor_id is not None:
+        stmt = stmt.where(AuditEvent.actor_id == actor_id)
+    if since is not None:
+        stmt = stmt.where(AuditEvent.occurred_at >= since)
+    if until is not None:
+        stmt = stmt.where(AuditEvent.occurred_at < until)
+    events = db.execute(audit_keyset.apply(stmt, cursor, limit)).scalars().all()
+    return audit_keyset.page(events, limit)
+
+
+def maintain_audit_log(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Create next month's partition ahead of time and drop history older than
+    AUDIT_RETENTION_MONTHS: whole partitions on PostgreSQL, rows elsewhere
+    """
+    now = now or datetime.utcnow()
+    current = _month(now)
+    ensure_audit_partitions([current, _next_month(current)])
+    cutoff = current
+    for _ in range(settings.AUDIT_RETENTION_MONTHS):
+        cutoff = date(cutoff.year - (cutoff.month == 1), (cutoff.month - 2) % 12 + 1, 1)
+
+    if db.get_bind().dialect.name != "postgresql":
+        result = db.execute(delete(AuditEvent).where(AuditEvent.occurred_at < cutoff))
+        db.commit()
+        return {"deleted": result.rowcount, "dropped_partitions": 0}
+
+    partitions = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :parent"
+    ), {"parent": AuditEvent.__tablename__}).scalars().all()
+    dropped = 0
+    for name in sorted(partitions):
+        # audit_events_YYYY_MM holds that month only
+        if name < _partition_name(cutoff):
+            db.execute(text(f"DROP TABLE {name}"))
+            _partitions.discard(date(int(name[-7:-3]), int(name[-2:]), 1))
+            dropped += 1
+    db.commit()
+    return {"deleted": 0, "dropped_partitions": dropped}
@@ -2,12 +2,13 @@ from datetime import timedelta
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import create_access_token
 from app.models.user import User
-from app.services.user import authenticate_user, is_active_user
+from app.services.user import authenticate_user, authenticate_user_async, is_active_user
 
 
 def login_user(db: Session, username: str, password: str) -> dict:
@@ -16,6 +17,21 @@ def login_user(db: Session, username: str, password: str) -> dict:
     """
     # Authenticate user
     user = authenticate_user(db, username, password)
+    return _issue_token(user)
+
+
+async def login_user_async(db: AsyncSession, username: str, password: str) -> dict:
+    """
+    Authenticate a user without blocking the event loop on bcrypt
+    """
+    user = await authenticate_user_async(db, username, password)
+    return _issue_token(user)
+
+
+def _issue_token(user: Optional[User]) -> dict:
+    """
+    Check the authenticated user and return an access token
+    """
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,308 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.security import get_password_hashes
+from app.db.session import SessionLocal
+from app.models.equipment import Equipment
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.equipment import EquipmentCreate
+from app.schemas.task import TaskCreate
+from app.schemas.user import UserCreate
+from app.services.audit import audit_bulk_rows
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+# (line number, parsed record or None, parse error or None)
+RawRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+# (line number, validated values)
+ValidRow = Tuple[int, Dict[str, Any]]
+# (line number, column values, error or None)
+PreparedRow = Tuple[int, Dict[str, Any], Optional[str]]
+
+
+def detect_format(filename: Optional[str], fmt: Optional[str] = None) -> str:
+    """
+    Resolve the input format from an explicit value or the file extension
+    """
+    if not fmt and filename:
+        fmt = os.path.splitext(filename)[1].lstrip(".").lower()
+        if fmt in ("ndjson", "json"):
+            fmt = "jsonl"
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt or 'unknown'} (use csv or jsonl)")
+    return fmt
+
+
+def iter_records(stream: BinaryIO, fmt: str) -> Iterator[RawRecord]:
+    """
+    Lazily parse a CSV or JSONL byte stream, one record at a time
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            # Empty CSV cells mean "not set", not an empty string
+            yield reader.line_num, {k: v for k, v in row.items() if k and v != ""}, None
+        return
+
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _chunks(records: Iterable[RawRecord], size: int) -> Iterator[List[RawRecord]]:
+    chunk: List[RawRecord] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+def _insert(db: Session, table: Table) -> Any:
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise ValueError(f"Bulk import is not supported on {dialect}")
+
+
+def _write_rows(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    conflict_column: Optional[str],
+    update_on_conflict: bool,
+) -> int:
+    """
+    One multi-row INSERT ... ON CONFLICT; returns the number of rows written.
+
+    The statement bypasses the ORM flush, so the audit records are built
+    from the rows it returns and the rows it replaced.
+    """
+    stmt = _insert(db, table).values(rows)
+    before: Dict[Any, Any] = {}
+    if conflict_column and update_on_conflict:
+        keep = {"id", "created_at", conflict_column}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={k: stmt.excluded[k] for k in rows[0] if k not in keep},
+        )
+        column = table.c[conflict_column]
+        before = {
+            row[conflict_column]: row
+            for row in db.execute(
+                select(table).where(column.in_([r[conflict_column] for r in rows]))
+            ).mappings()
+        }
+    elif conflict_column:
+        # No conflict target: a clash on any unique key skips the row
+        stmt = stmt.on_conflict_do_nothing()
+    written = db.execute(stmt.returning(*table.c)).mappings().all()
+    audit_bulk_rows(
+        db, table,
+        ((before.get(row[conflict_column]) if conflict_column else None, row) for row in written),
+    )
+    return len(written)
+
+
+def _import_records(
+    db: Session,
+    records: Iterable[RawRecord],
+    schema: Type[BaseModel],
+    table: Table,
+    prepare: Callable[[Session, List[ValidRow]], List[PreparedRow]],
+    conflict_column: Optional[str] = None,
+    update_on_conflict: bool = False,
+    chunk_size: int = 1000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Validate and write records chunk by chunk, yielding progress per chunk.
+
+    Each chunk is one INSERT and one commit. If the chunk is rejected by the
+    database, its rows are retried one by one so only the bad rows fail.
+    """
+    processed = written = skipped = failed = 0
+    for chunk in _chunks(records, chunk_size):
+        errors: List[Dict[str, Any]] = []
+        valid: List[ValidRow] = []
+        for line, data, error in chunk:
+            if error is None:
+                try:
+                    valid.append((line, schema(**data).model_dump()))
+                    continue
+                except ValidationError as e:
+                    error = _validation_message(e)
+            errors.append({"line": line, "error": error})
+
+        rows: Dict[Any, ValidRow] = {}
+        for line, values, error in prepare(db, valid):
+            if error:
+                errors.append({"line": line, "error": error})
+                continue
+            # The same key twice in one statement is rejected by PostgreSQL,
+            # so the last occurrence in the file wins
+            key = values[conflict_column] if conflict_column else line
+            if key in rows:
+                errors.append({
+                    "line": rows[key][0],
+                    "error": f"Duplicate {conflict_column} {key}, superseded by line {line}",
+                })
+            rows[key] = (line, values)
+
+        chunk_written = 0
+        if rows:
+            try:
+                chunk_written = _write_rows(
+                    db, table, [v for _, v in rows.values()], conflict_column, update_on_conflict
+                )
+                db.commit()
+            except SQLAlchemyError:
+                db.rollback()
+                for line, values in rows.values():
+                    try:
+                        chunk_written += _write_rows(db, table, [values], conflict_column, update_on_conflict)
+                        db.commit()
+                    except SQLAlchemyError as e:
+                        db.rollback()
+                        errors.append({"line": line, "error": str(getattr(e, "orig", e))})
+
+        if chunk_written:
+            cache.invalidate_tags(table.name)
+        processed += len(chunk)
+        written += chunk_written
+        chunk_failed = len(errors)
+        failed += chunk_failed
+        skipped += len(chunk) - chunk_written - chunk_failed
+        yield {
+            "processed": processed,
+            "written": written,
+            "skipped": skipped,
+            "failed": failed,
+            "errors": sorted(errors, key=lambda e: e["line"]),
+        }
+
+
+def _with_timestamps(values: Dict[str, Any]) -> Dict[str, Any]:
+    now = datetime.utcnow()
+    values["created_at"] = now
+    values["updated_at"] = now
+    return values
+
+
+def _prepare_equipment(db: Session, rows: List[ValidRow]) -> List[PreparedRow]:
+    return [(line, _with_timestamps(values), None) for line, values in rows]
+
+
+def _prepare_users(db: Session, rows: List[ValidRow]) -> List[PreparedRow]:
+    hashes = get_password_hashes([values.pop("password") for _, values in rows])
+    prepared = []
+    for (line, values), hashed_password in zip(rows, hashes):
+        values["hashed_password"] = hashed_password
+        prepared.append((line, _with_timestamps(values), None))
+    return prepared
+
+
+def import_equipment(
+    db: Session, records: Iterable[RawRecord], chunk_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Upsert equipment by serial number
+    """
+    return _import_records(
+        db, records, EquipmentCreate, Equipment.__table__, _prepare_equipment,
+        conflict_column="serial_number", update_on_conflict=True, chunk_size=chunk_size,
+    )
+
+
+def import_users(
+    db: Session, records: Iterable[RawRecord], chunk_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Insert users, skipping rows whose email or username is already taken
+    """
+    return _import_records(
+        db, records, UserCreate, User.__table__, _prepare_users,
+        conflict_column="email", update_on_conflict=False, chunk_size=chunk_size,
+    )
+
+
+class TaskImport(TaskCreate):
+    # Equipment may be referenced by serial number instead of id
+    equipment_serial_number: Optional[str] = None
+
+
+def import_tasks(
+    db: Session, records: Iterable[RawRecord], created_by_id: int, chunk_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """
+    Insert tasks created by the importing user
+    """
+
+    def prepare(db: Session, rows: List[ValidRow]) -> List[PreparedRow]:
+        serials = {v["equipment_serial_number"] for _, v in rows if v["equipment_serial_number"]}
+        equipment_ids = dict(
+            db.execute(
+                select(Equipment.serial_number, Equipment.id).where(Equipment.serial_number.in_(serials))
+            ).all()
+        ) if serials else {}
+
+        prepared = []
+        for line, values in rows:
+            serial = values.pop("equipment_serial_number")
+            if serial:
+                if serial not in equipment_ids:
+                    prepared.append((line, values, f"Unknown equipment serial number {serial}"))
+                    continue
+                values["equipment_id"] = equipment_ids[serial]
+            values["created_by_id"] = created_by_id
+            prepared.append((line, _with_timestamps(values), None))
+        return prepared
+
+    return _import_records(
+        db, records, TaskImport, Task.__table__, prepare, chunk_size=chunk_size,
+    )
+
+
+def stream_import(
+    importer: Callable[..., Iterator[Dict[str, Any]]], stream: BinaryIO, fmt: str, **kwargs: Any
+) -> Iterator[str]:
+    """
+    Run an import in its own session, yielding NDJSON progress lines
+    """
+    db = SessionLocal()
+    try:
+        for progress in importer(db, iter_records(stream, fmt), **kwargs):
+            yield json.dumps(progress, ensure_ascii=False) + "\n"
+    finally:
+        db.close()
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.dashboard import DashboardSnapshot
+from app.models.equipment import Equipment
+from app.models.task import Task
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: every process polls
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID = 1
+
+# Tasks in these states are no longer counted as open or overdue
+CLOSED_TASK_STATUSES = ("выполнена", "отменена")
+
+# Tables whose writes invalidate the snapshot
+_TRACKED_TABLES = {Task.__tablename__, Equipment.__tablename__}
+
+# Session.info key: the transaction wrote tasks or equipment
+_WROTE_TRACKED = "dashboard_wrote_tracked"
+
+# How long a process may take to recompute the snapshot before another one
+# may take over
+REFRESH_LEASE = timedelta(minutes=5)
+
+
+def mark_dashboard_stale(db: Session) -> None:
+    """
+    Flag the snapshot for a refresh, in the session's transaction
+    """
+    # A no-op while the snapshot is stale already, so concurrent writers
+    # hardly ever wait on the snapshot row
+    db.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.id == SNAPSHOT_ID, DashboardSnapshot.stale.is_(False))
+        .values(stale=True)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context: Any) -> None:
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Task, Equipment)):
+            session.info[_WROTE_TRACKED] = True
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if getattr(table, "name", None) in _TRACKED_TABLES:
+            state.session.info[_WROTE_TRACKED] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    # Commit flushes pending changes only after this hook
+    session.flush()
+    # Marked last, so the snapshot row is locked only for the commit itself
+    if session.info.pop(_WROTE_TRACKED, False):
+        mark_dashboard_stale(session)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_WROTE_TRACKED, None)
+
+
+def _group_counts(db: Session, column: Any, *where: Any) -> Dict[str, int]:
+    rows = db.execute(select(column, func.count()).where(*where).group_by(column)).all()
+    return {str(key) if key is not None else "": count for key, count in rows}
+
+
+def compute_dashboard_stats(db: Session) -> Dict[str, Any]:
+    """
+    Run the dashboard GROUP BY queries over tasks and equipment
+    """
+    now = datetime.utcnow()
+    is_open = Task.status.notin_(CLOSED_TASK_STATUSES)
+    overdue = db.execute(
+        select(func.count()).select_from(Task).where(is_open, Task.due_date < now)
+    ).scalar_one()
+
+    return {
+        "tasks": {
+            "by_status": _group_counts(db, Task.status),
+            "open_by_city": _group_counts(db, Task.city, is_open),
+            "open_by_priority": _group_counts(db, Task.priority, is_open),
+            "overdue": overdue,
+        },
+        "equipment": {
+            "by_status": _group_counts(db, Equipment.status),
+            "by_city": _group_counts(db, Equipment.city),
+            "requiring_maintenance": db.execute(
+                select(func.count()).select_from(Equipment).where(Equipment.status == "Требует ТО")
+            ).scalar_one(),
+        },
+    }
+
+
+def _store_dashboard_stats(db: Session, data: Dict[str, Any]) -> DashboardSnapshot:
+    values = {"data": data, "refreshed_at": datetime.utcnow(), "refresh_claimed_until": None}
+    updated = db.execute(
+        update(DashboardSnapshot).where(DashboardSnapshot.id == SNAPSHOT_ID).values(**values)
+    ).rowcount
+    if updated:
+        db.commit()
+    else:
+        db.add(DashboardSnapshot(id=SNAPSHOT_ID, stale=False, **values))
+        try:
+            db.commit()
+        except IntegrityError:
+            # Another process stored the first snapshot meanwhile
+            db.rollback()
+    return db.get(DashboardSnapshot, SNAPSHOT_ID, populate_existing=True)
+
+
+def _compute_and_store(db: Session) -> DashboardSnapshot:
+    try:
+        data = compute_dashboard_stats(db)
+    except Exception:
+        # Give the refresh back to whichever process polls next
+        db.rollback()
+        db.execute(
+            update(DashboardSnapshot)
+            .where(DashboardSnapshot.id == SNAPSHOT_ID)
+            .values(stale=True, refresh_claimed_until=None)
+        )
+        db.commit()
+        raise
+    return _store_dashboard_stats(db, data)
+
+
+def refresh_dashboard_stats(db: Session) -> DashboardSnapshot:
+    """
+    Recompute the counters and store them in the snapshot row
+    """
+    # Cleared first: writes during the refresh mark it stale again
+    db.execute(update(DashboardSnapshot).where(DashboardSnapshot.id == SNAPSHOT_ID).values(stale=False))
+    db.commit()
+    return _compute_and_store(db)
+
+
+def refresh_dashboard_if_needed(db: Session) -> Optional[DashboardSnapshot]:
+    """
+    Recompute the snapshot if it is stale or older than
+    DASHBOARD_MAX_AGE_SECONDS and no other process is recomputing it.
+
+    Returns the new snapshot, None when there was nothing to do here.
+    """
+    now = datetime.utcnow()
+    claimed = db.execute(
+        update(DashboardSnapshot)
+        .where(
+            DashboardSnapshot.id == SNAPSHOT_ID,
+            or_(
+                DashboardSnapshot.stale.is_(True),
+                DashboardSnapshot.refreshed_at < now - timedelta(seconds=settings.DASHBOARD_MAX_AGE_SECONDS),
+            ),
+            or_(
+                DashboardSnapshot.refresh_claimed_until.is_(None),
+                DashboardSnapshot.refresh_claimed_until < now,
+            ),
+        )
+        # Cleared with the claim: writes during the refresh mark it stale again
+        .values(stale=False, refresh_claimed_until=now + REFRESH_LEASE)
+    ).rowcount
+    db.commit()
+    if claimed:
+        return _compute_and_store(db)
+    if db.get(DashboardSnapshot, SNAPSHOT_ID) is None:
+        return refresh_dashboard_stats(db)
+    return None
+
+
+def get_dashboard_stats(db: Session) -> DashboardSnapshot:
+    """
+    The stored snapshot, computed on the spot only if there is none yet
+    """
+    snapshot = db.get(DashboardSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        snapshot = refresh_dashboard_stats(db)
+    return snapshot
+
+
+async def get_dashboard_stats_async(db: AsyncSession) -> DashboardSnapshot:
+    snapshot = await db.get(DashboardSnapshot, SNAPSHOT_ID)
+    if snapshot is None:
+        snapshot = await db.run_sync(refresh_dashboard_stats)
+    return snapshot
+
+
+def _refresh_if_needed() -> None:
+    db = SessionLocal()
+    try:
+        refresh_dashboard_if_needed(db)
+    finally:
+        db.close()
+
+
+def _take_refresher_lock(path: str) -> Optional[int]:
+    """
+    File descriptor holding the refresher lock file, None if another
+    process holds it. The kernel releases it when the process exits.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+async def run_dashboard_refresher() -> None:
+    """
+    Background loop keeping the snapshot fresh; started with the app.
+
+    With DASHBOARD_REFRESHER_LOCK_FILE, only the process holding the lock
+    polls and the others keep trying to take it over, so a recycled worker
+    hands the job to another one. Between hosts the refresh lease lets one
+    process at a time recompute.
+    """
+    lock_path = settings.DASHBOARD_REFRESHER_LOCK_FILE if fcntl is not None else None
+    lock_fd = None
+    try:
+        while True:
+            if lock_path and lock_fd is None:
+                lock_fd = _take_refresher_lock(lock_path)
+            if lock_fd is not None or not lock_path:
+                try:
+                    await run_in_threadpool(_refresh_if_needed)
+                except Exception:
+                    logger.exception("Dashboard snapshot refresh failed")
+            await asyncio.sleep(settings.DASHBOARD_REFRESH_SECONDS)
+    finally:
+        if lock_fd is not None:
+            os.close(lock_fd)
+
+
+async def warm_up_dashboard() -> None:
+    """
+    Make sure a snapshot exists, so that no request computes the first one;
+    called on app startup
+    """
+    try:
+        await run_in_threadpool(_refresh_if_needed)
+    except Exception:
+        logger.warning("Could not warm up the dashboard snapshot", exc_info=True)
@@ -0,0 +1,94 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql import Select
+
+from app.core.http_cache import version_statement
+from app.db.pagination import Keyset
+from app.models.equipment import Equipment
+from app.models.part import Part
+from app.models.report import Report
+from app.models.task import Task
+
+# Loading profiles, see app.services.task. Lists show equipment columns only.
+EQUIPMENT_LOAD_PROFILES: Dict[str, Sequence[Any]] = {
+    "list": (),
+    "detail": (
+        selectinload(Equipment.tasks),
+        selectinload(Equipment.parts),
+        selectinload(Equipment.reports),
+    ),
+}
+
+equipment_keyset = Keyset(Equipment.id)
+
+
+def _equipment_filters(city: Optional[str] = None, status: Optional[str] = None) -> List[Any]:
+    criteria = []
+    if city:
+        criteria.append(Equipment.city == city)
+    if status:
+        criteria.append(Equipment.status == status)
+    return criteria
+
+
+def _equipment_statement(cursor: Optional[str], limit: int, profile: str = "list", **filters: Any) -> Select:
+    stmt = select(Equipment).options(*EQUIPMENT_LOAD_PROFILES[profile]).where(*_equipment_filters(**filters))
+    return equipment_keyset.apply(stmt, cursor, limit)
+
+
+def _equipment_version_statement(equipment_id: int) -> Select:
+    # The detail view embeds tasks, parts and reports, so their versions
+    # are part of the equipment's
+    children = []
+    for model in (Task, Part, Report):
+        related = model.equipment_id == Equipment.id
+        children.append(select(func.count()).select_from(model).where(related).scalar_subquery())
+        children.append(select(func.max(model.updated_at)).where(related).scalar_subquery())
+    return select(Equipment.updated_at, *children).where(Equipment.id == equipment_id)
+
+
+def get_equipment(db: Session, equipment_id: int, profile: str = "detail") -> Optional[Equipment]:
+    stmt = select(Equipment).options(*EQUIPMENT_LOAD_PROFILES[profile]).where(Equipment.id == equipment_id)
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def get_equipment_list(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Equipment], Optional[str]]:
+    items = db.execute(_equipment_statement(cursor, limit, **filters)).scalars().all()
+    return equipment_keyset.page(items, limit)
+
+
+async def get_equipment_async(
+    db: AsyncSession, equipment_id: int, profile: str = "detail"
+) -> Optional[Equipment]:
+    stmt = select(Equipment).options(*EQUIPMENT_LOAD_PROFILES[profile]).where(Equipment.id == equipment_id)
+    return (await db.execute(stmt)).scalar_one_or_none()
+
+
+async def get_equipment_list_async(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Equipment], Optional[str]]:
+    items = (await db.execute(_equipment_statement(cursor, limit, **filters))).scalars().all()
+    return equipment_keyset.page(items, limit)
+
+
+def get_equipment_version(db: Session, equipment_id: int) -> Optional[Tuple[Any, ...]]:
+    row = db.execute(_equipment_version_statement(equipment_id)).first()
+    return tuple(row) if row else None
+
+
+def get_equipment_list_version(db: Session, **filters: Any) -> Tuple[Any, ...]:
+    return tuple(db.execute(version_statement(Equipment, *_equipment_filters(**filters))).one())
+
+
+async def get_equipment_version_async(db: AsyncSession, equipment_id: int) -> Optional[Tuple[Any, ...]]:
+    row = (await db.execute(_equipment_version_statement(equipment_id))).first()
+    return tuple(row) if row else None
+
+
+async def get_equipment_list_version_async(db: AsyncSession, **filters: Any) -> Tuple[Any, ...]:
+    return tuple((await db.execute(version_statement(Equipment, *_equipment_filters(**filters)))).one())
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterator, Mapping, Optional
+
+from sqlalchemy import Table, select
+
+from app.db.session import engine
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def export_table(
+    table: Table, fmt: str = "ndjson", batch_size: int = 1000, filters: Optional[Mapping[str, Any]] = None
+) -> Iterator[str]:
+    """
+    Stream the rows of the table as NDJSON lines or CSV, ordered by id.
+    `filters` maps column names to the value to match; None matches all.
+
+    Rows are read through a server-side cursor one batch at a time and are
+    never turned into ORM objects, so memory stays flat whatever the table
+    size. The connection is held for the whole download and released when
+    the generator finishes or is closed by a disconnecting client.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (use ndjson or csv)")
+
+    columns = [c.key for c in table.columns]
+    stmt = select(table)
+    for name, value in (filters or {}).items():
+        if name not in table.c:
+            raise ValueError(f"Unknown export filter: {name}")
+        if value is not None:
+            stmt = stmt.where(table.c[name] == value)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=batch_size).execute(stmt.order_by(table.c.id))
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for rows in result.partitions():
+                writer.writerows(
+                    [v.isoformat() if isinstance(v, (date, datetime)) else v for v in row]
+                    for row in rows
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
@@ -0,0 +1,425 @@
+import functools
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.cache import cache
+from app.db.pagination import Keyset
+from app.models.inventory import StockLevel, StockMovement, StockReservation, Warehouse
+from app.models.part import Part
+from app.models.task import Task
+from app.schemas.inventory import (
+    StockMovementCreate,
+    StockReservationCreate,
+    StockTransferCreate,
+    WarehouseCreate,
+)
+
+logger = logging.getLogger(__name__)
+
+movement_keyset = Keyset(StockMovement.id, descending=True)
+
+# Attempts at a stock change that lost an optimistic version check
+_CONFLICT_RETRIES = 3
+
+T = TypeVar("T")
+
+
+class StockConflict(ValueError):
+    """
+    Not enough stock, or the stock changed under a concurrent request
+    """
+
+
+def _retry_on_conflict(fn: Callable[..., T]) -> Callable[..., T]:
+    # Where FOR UPDATE is a no-op (SQLite) the version check catches a
+    # concurrent change at flush; the operation is then run again afresh
+    @functools.wraps(fn)
+    def wrapper(db: Session, *args: Any, **kwargs: Any) -> T:
+        for attempt in range(1, _CONFLICT_RETRIES + 1):
+            try:
+                return fn(db, *args, **kwargs)
+            except StaleDataError:
+                db.rollback()
+                logger.info("Stock changed concurrently, %s attempt %d", fn.__name__, attempt)
+        raise StockConflict("Stock is being changed by another request, try again")
+
+    return wrapper
+
+
+def get_warehouses(db: Session, include_inactive: bool = False) -> List[Warehouse]:
+    stmt = select(Warehouse)
+    if not include_inactive:
+        stmt = stmt.where(Warehouse.is_active.is_(True))
+    return db.execute(stmt.order_by(Warehouse.name)).scalars().all()
+
+
+def create_warehouse(db: Session, warehouse_in: WarehouseCreate) -> Warehouse:
+    if db.execute(select(Warehouse.id).where(Warehouse.name == warehouse_in.name)).first():
+        raise ValueError(f"Warehouse {warehouse_in.name} already exists")
+    warehouse = Warehouse(**warehouse_in.model_dump())
+    db.add(warehouse)
+    db.commit()
+    db.refresh(warehouse)
+    return warehouse
+
+
+def get_stock_levels(
+    db: Session, part_id: Optional[int] = None, warehouse_id: Optional[int] = None
+) -> List[StockLevel]:
+    stmt = select(StockLevel)
+    if part_id is not None:
+        stmt = stmt.where(StockLevel.part_id == part_id)
+    if warehouse_id is not None:
+        stmt = stmt.where(StockLevel.warehouse_id == warehouse_id)
+    return db.execute(stmt.order_by(StockLevel.part_id, StockLevel.warehouse_id)).scalars().all()
+
+
+def get_movements(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    part_id: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+) -> Tuple[List[StockMovement], Optional[str]]:
+    """
+    Ledger entries, latest first
+    """
+    stmt = select(StockMovement)
+    if part_id is not None:
+        stmt = stmt.where(StockMovement.part_id == part_id)
+    if warehouse_id is not None:
+        stmt = stmt.where(StockMovement.warehouse_id == warehouse_id)
+    if task_id is not None:
+        stmt = stmt.where(StockMovement.task_id == task_id)
+    movements = db.execute(movement_keyset.apply(stmt, cursor, limit)).scalars().all()
+    return movement_keyset.page(movements, limit)
+
+
+def get_reservation(db: Session, reservation_id: int) -> Optional[StockReservation]:
+    return db.get(StockReservation, reservation_id)
+
+
+def get_reservations(
+    db: Session,
+    task_id: Optional[int] = None,
+    part_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = 500,
+) -> List[StockReservation]:
+    stmt = select(StockReservation)
+    if task_id is not None:
+        stmt = stmt.where(StockReservation.task_id == task_id)
+    if part_id is not None:
+        stmt = stmt.where(StockReservation.part_id == part_id)
+    if status:
+        stmt = stmt.where(StockReservation.status == status)
+    return db.execute(stmt.order_by(StockReservation.id).limit(limit)).scalars().all()
+
+
+def find_compatible_parts(
+    db: Session,
+    equipment_type: str,
+    year: Optional[int] = None,
+    warehouse_id: Optional[int] = None,
+    in_stock: bool = False,
+    limit: int = 100,
+) -> List[Tuple[Part, int]]:
+    """
+    Parts that fit equipment of the type (and year), with the quantity
+    available to reserve. Parts without a year range fit any year.
+    """
+    stock = select(
+        StockLevel.part_id, func.sum(StockLevel.on_hand - StockLevel.reserved).label("available")
+    )
+    if warehouse_id is not None:
+        stock = stock.where(StockLevel.warehouse_id == warehouse_id)
+    stock = stock.group_by(StockLevel.part_id).subquery()
+    available = func.coalesce(stock.c.available, 0)
+
+    stmt = (
+        select(Part, available)
+        .outerjoin(stock, stock.c.part_id == Part.id)
+        .where(Part.equipment_type == equipment_type)
+    )
+    if year is not None:
+        stmt = stmt.where(
+            or_(Part.compatible_from_year.is_(None), Part.compatible_from_year <= year),
+            or_(Part.compatible_to_year.is_(None), Part.compatible_to_year >= year),
+        )
+    if in_stock:
+        stmt = stmt.where(available > 0)
+    return [tuple(row) for row in db.execute(stmt.order_by(available.desc(), Part.id).limit(limit))]
+
+
+def _check_refs(db: Session, part_id: int, *warehouse_ids: int, task_id: Optional[int] = None) -> None:
+    if db.get(Part, part_id) is None:
+        raise ValueError(f"Part {part_id} not found")
+    for warehouse_id in warehouse_ids:
+        warehouse = db.get(Warehouse, warehouse_id)
+        if warehouse is None or not warehouse.is_active:
+            raise ValueError(f"Warehouse {warehouse_id} not found")
+    if task_id is not None and db.get(Task, task_id) is None:
+        raise ValueError(f"Task {task_id} not found")
+
+
+def _lock_stock(db: Session, part_id: int, warehouse_id: int, create: bool = False) -> Optional[StockLevel]:
+    """
+    Stock row of a part in a warehouse, locked for the transaction.
+
+    With `create` a missing row is inserted first; ON CONFLICT makes that
+    safe when two requests stock the same part at once.
+    """
+    if create:
+        values = {"part_id": part_id, "warehouse_id": warehouse_id, "on_hand": 0, "reserved": 0, "version": 1}
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        db.execute(
+            insert(StockLevel.__table__)
+            .values(updated_at=datetime.utcnow(), **values)
+            .on_conflict_do_nothing(index_elements=["part_id", "warehouse_id"])
+        )
+    return db.execute(
+        select(StockLevel)
+        .where(StockLevel.part_id == part_id, StockLevel.warehouse_id == warehouse_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one_or_none()
+
+
+def _available_message(db: Session, part_id: int, warehouse_id: int) -> str:
+    stock = db.execute(
+        select(StockLevel.on_hand - StockLevel.reserved)
+        .where(StockLevel.part_id == part_id, StockLevel.warehouse_id == warehouse_id)
+    ).scalar()
+    return f"Only {stock or 0} of part {part_id} available in warehouse {warehouse_id}"
+
+
+def _move(
+    db: Session,
+    stock: StockLevel,
+    kind: str,
+    quantity: int,
+    release: int = 0,
+    **refs: Any,
+) -> StockMovement:
+    """
+    Change the locked stock row by `quantity` and append the ledger entry;
+    `release` takes that many units off the reserved quantity at once
+    """
+    on_hand = stock.on_hand + quantity
+    reserved = stock.reserved - release
+    if on_hand < reserved:
+        raise StockConflict(
+            f"Only {stock.available} of part {stock.part_id} available in warehouse {stock.warehouse_id}"
+        )
+    stock.on_hand = on_hand
+    stock.reserved = reserved
+    movement = StockMovement(
+        kind=kind,
+        quantity=quantity,
+        balance=on_hand,
+        part_id=stock.part_id,
+        warehouse_id=stock.warehouse_id,
+        **refs,
+    )
+    db.add(movement)
+    # Part.quantity is the total on hand; a relative update, so concurrent
+    # movements in other warehouses don't overwrite each other
+    db.execute(
+        update(Part)
+        .where(Part.id == stock.part_id)
+        .values(quantity=func.coalesce(Part.quantity, 0) + quantity, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return movement
+
+
+def _commit_movements(db: Session) -> None:
+    db.commit()
+    # Part quantities changed
+    cache.invalidate_tags(Part.__tablename__)
+
+
+@_retry_on_conflict
+def record_movement(db: Session, movement_in: StockMovementCreate, created_by_id: int) -> StockMovement:
+    """
+    Record a receipt, an issue without a reservation, or a correction.
+
+    Reserved units can't be issued or adjusted away: release the
+    reservation first.
+    """
+    if movement_in.kind == "adjustment":
+        if movement_in.quantity == 0:
+            raise ValueError("Adjustment quantity can't be zero")
+        if not movement_in.note:
+            raise ValueError("Adjustments need a note with the reason")
+        quantity = movement_in.quantity
+    elif movement_in.quantity <= 0:
+        raise ValueError("Quantity must be positive")
+    else:
+        quantity = movement_in.quantity if movement_in.kind == "receipt" else -movement_in.quantity
+    _check_refs(db, movement_in.part_id, movement_in.warehouse_id, task_id=movement_in.task_id)
+
+    stock = _lock_stock(db, movement_in.part_id, movement_in.warehouse_id, create=quantity > 0)
+    if stock is None:
+        raise StockConflict(f"Part {movement_in.part_id} is not stocked in warehouse {movement_in.warehouse_id}")
+    try:
+        movement = _move(
+            db, stock, movement_in.kind, quantity,
+            task_id=movement_in.task_id, note=movement_in.note, created_by_id=created_by_id,
+        )
+    except StockConflict:
+        db.rollback()
+        raise
+    _commit_movements(db)
+    db.refresh(movement)
+    return movement
+
+
+@_retry_on_conflict
+def transfer_stock(db: Session, transfer_in: StockTransferCreate, created_by_id: int) -> List[StockMovement]:
+    if transfer_in.from_warehouse_id == transfer_in.to_warehouse_id:
+        raise ValueError("Source and destination warehouses are the same")
+    _check_refs(db, transfer_in.part_id, transfer_in.from_warehouse_id, transfer_in.to_warehouse_id)
+
+    # Rows are locked in warehouse order so opposite transfers can't deadlock
+    stocks = {}
+    for warehouse_id in sorted((transfer_in.from_warehouse_id, transfer_in.to_warehouse_id)):
+        create = warehouse_id == transfer_in.to_warehouse_id
+        stocks[warehouse_id] = _lock_stock(db, transfer_in.part_id, warehouse_id, create=create)
+    source = stocks[transfer_in.from_warehouse_id]
+    if source is None:
+        db.rollback()
+        raise StockConflict(f"Part {transfer_in.part_id} is not stocked in warehouse {transfer_in.from_warehouse_id}")
+    refs = {"note": transfer_in.note, "created_by_id": created_by_id}
+    try:
+        movements = [
+            _move(db, source, "transfer_out", -transfer_in.quantity, **refs),
+            _move(db, stocks[transfer_in.to_warehouse_id], "transfer_in", transfer_in.quantity, **refs),
+        ]
+    except StockConflict:
+        db.rollback()
+        raise
+    _commit_movements(db)
+    for movement in movements:
+        db.refresh(movement)
+    return movements
+
+
+def reserve_part(db: Session, reservation_in: StockReservationCreate, created_by_id: int) -> StockReservation:
+    """
+    Set parts aside for a task.
+
+    One conditional UPDATE checks and takes the available quantity, so of
+    two engineers reserving the last unit exactly one succeeds; the other
+    gets StockConflict.
+    """
+    _check_refs(db, reservation_in.part_id, reservation_in.warehouse_id, task_id=reservation_in.task_id)
+    result = db.execute(
+        update(StockLevel)
+        .where(
+            StockLevel.part_id == reservation_in.part_id,
+            StockLevel.warehouse_id == reservation_in.warehouse_id,
+            StockLevel.on_hand - StockLevel.reserved >= reservation_in.quantity,
+        )
+        .values(
+            reserved=StockLevel.reserved + reservation_in.quantity,
+            version=StockLevel.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if not result.rowcount:
+        db.rollback()
+        raise StockConflict(_available_message(db, reservation_in.part_id, reservation_in.warehouse_id))
+    reservation = StockReservation(**reservation_in.model_dump(), status="active", created_by_id=created_by_id)
+    db.add(reservation)
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+
+def _close_reservation(db: Session, reservation_id: int, status: str) -> StockReservation:
+    # Only one request can move a reservation out of "active"
+    result = db.execute(
+        update(StockReservation)
+        .where(StockReservation.id == reservation_id, StockReservation.status == "active")
+        .values(status=status, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    reservation = db.get(StockReservation, reservation_id, populate_existing=True)
+    if reservation is None:
+        raise ValueError(f"Reservation {reservation_id} not found")
+    if not result.rowcount:
+        db.rollback()
+        raise StockConflict(f"Reservation {reservation_id} is already {reservation.status}")
+    return reservation
+
+
+def release_reservation(db: Session, reservation_id: int) -> StockReservation:
+    """
+    Put reserved parts back on the shelf, e.g. when the task is cancelled
+    """
+    reservation = _close_reservation(db, reservation_id, "released")
+    db.execute(
+        update(StockLevel)
+        .where(StockLevel.part_id == reservation.part_id, StockLevel.warehouse_id == reservation.warehouse_id)
+        .values(
+            reserved=StockLevel.reserved - reservation.quantity,
+            version=StockLevel.version + 1,
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    db.refresh(reservation)
+    return reservation
+
+
+@_retry_on_conflict
+def consume_reservation(db: Session, reservation_id: int, created_by_id: int) -> StockReservation:
+    """
+    The engineer took the reserved parts: issue them from stock for the task
+    """
+    reservation = _close_reservation(db, reservation_id, "consumed")
+    stock = _lock_stock(db, reservation.part_id, reservation.warehouse_id)
+    _move(
+        db, stock, "issue", -reservation.quantity, release=reservation.quantity,
+        task_id=reservation.task_id, reservation_id=reservation.id, created_by_id=created_by_id,
+    )
+    _commit_movements(db)
+    db.refresh(reservation)
+    return reservation
+
+
+def reconcile_stock(db: Session) -> List[Dict[str, int]]:
+    """
+    Stock levels that don't match the sum of their ledger; empty when all do
+    """
+    ledger = (
+        select(
+            StockMovement.part_id,
+            StockMovement.warehouse_id,
+            func.sum(StockMovement.quantity).label("total"),
+        )
+        .group_by(StockMovement.part_id, StockMovement.warehouse_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(StockLevel.part_id, StockLevel.warehouse_id, StockLevel.on_hand, ledger.c.total)
+        .outerjoin(
+            ledger,
+            and_(ledger.c.part_id == StockLevel.part_id, ledger.c.warehouse_id == StockLevel.warehouse_id),
+        )
+        .where(StockLevel.on_hand != func.coalesce(ledger.c.total, 0))
+    ).all()
+    return [
+        {"part_id": r.part_id, "warehouse_id": r.warehouse_id, "on_hand": r.on_hand, "ledger": r.total or 0}
+        for r in rows
+    ]
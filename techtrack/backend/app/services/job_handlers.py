@@ -0,0 +1,161 @@
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.models.equipment import Equipment
+from app.models.report import Report
+from app.models.task import Task
+from app.schemas.report import ReportRenderRequest
+from app.schemas.route_plan import TripPlanRequest
+from app.services.audit import audit_actor, maintain_audit_log
+from app.services.bulk_import import detect_format, import_equipment, import_tasks, import_users, iter_records
+from app.services.dashboard import refresh_dashboard_stats
+from app.services.export import EXPORT_FORMATS, export_table
+from app.services.maintenance import run_maintenance
+from app.services.report import get_report_ids_for_month, render_reports
+from app.services.upload import cleanup_expired_uploads, get_blob, make_thumbnail, store_file
+
+# A handler runs in the worker with its own session and the job payload; its
+# return value is stored as the job result and must be JSON-serializable.
+# ValueError means the payload can never succeed: the job fails without retries.
+JobHandler = Callable[[Session, Dict[str, Any]], Any]
+
+
+def _run_maintenance(db: Session, payload: Dict[str, Any]) -> Dict[str, int]:
+    return run_maintenance(
+        db,
+        full=bool(payload.get("full")),
+        batch_size=payload.get("batch_size") or settings.MAINTENANCE_BATCH_SIZE,
+    )
+
+
+def _refresh_dashboard(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {"refreshed_at": refresh_dashboard_stats(db).refreshed_at}
+
+
+def _plan_trips(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Imported here: numpy is slow to import and only the planner needs it
+    from app.services.route_planner import plan_trips
+
+    # pydantic's ValidationError is a ValueError: a bad request is not retried
+    plan_in = TripPlanRequest(**payload)
+    return plan_trips(
+        db,
+        engineer_ids=plan_in.engineer_ids,
+        start_date=plan_in.start_date,
+        days=plan_in.days,
+        cities=plan_in.cities,
+        service_minutes=plan_in.service_minutes,
+        commit=plan_in.commit,
+    )
+
+
+def _render_reports(db: Session, payload: Dict[str, Any]) -> Dict[str, int]:
+    render_in = ReportRenderRequest(**payload)
+    if render_in.report_ids:
+        report_ids = render_in.report_ids
+    elif render_in.year and render_in.month:
+        report_ids = get_report_ids_for_month(db, render_in.year, render_in.month, render_in.type)
+    else:
+        raise ValueError("Give report_ids or a year and month")
+    return render_reports(db, report_ids, render_in.format)
+
+
+def _make_thumbnail(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    blob_id = payload.get("blob_id")
+    # A malformed payload fails the job at once instead of being retried
+    if not isinstance(blob_id, int) or isinstance(blob_id, bool):
+        raise ValueError(f"Thumbnail job needs an integer blob_id, got {blob_id!r}")
+    return make_thumbnail(db, blob_id)
+
+
+def _cleanup_uploads(db: Session, payload: Dict[str, Any]) -> Dict[str, int]:
+    return cleanup_expired_uploads(db)
+
+
+def _maintain_audit_log(db: Session, payload: Dict[str, Any]) -> Dict[str, int]:
+    return maintain_audit_log(db)
+
+
+IMPORTERS = {
+    "equipment": import_equipment,
+    "users": import_users,
+    "tasks": import_tasks,
+}
+
+EXPORT_TABLES = {
+    "equipment": Equipment.__table__,
+    "tasks": Task.__table__,
+    "reports": Report.__table__,
+}
+
+# Row errors kept in the result of an import job
+MAX_IMPORT_ERRORS = 1000
+
+
+def _run_import(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Import an uploaded CSV or JSONL file, given by its SHA-256.
+
+    Chunks are committed as they go and a retried job starts over: harmless
+    for equipment (upserted) and users (existing ones skipped), while tasks
+    written before the failure are inserted again.
+    """
+    entity = payload.get("entity")
+    if entity not in IMPORTERS:
+        raise ValueError(f"Unknown import entity: {entity} (use {', '.join(IMPORTERS)})")
+    blob = get_blob(db, str(payload.get("sha256") or ""))
+    if blob is None:
+        raise ValueError("File to import not found")
+    fmt = detect_format(payload.get("filename"), payload.get("format"))
+    kwargs: Dict[str, Any] = {"chunk_size": payload.get("chunk_size") or 1000}
+    if entity == "tasks":
+        # Tasks are created by whoever queued the job
+        kwargs["created_by_id"] = audit_actor.get()
+        if kwargs["created_by_id"] is None:
+            raise ValueError("Task imports must be queued by a user")
+
+    progress: Dict[str, Any] = {"processed": 0, "written": 0, "skipped": 0, "failed": 0}
+    errors: List[Dict[str, Any]] = []
+    with storage.open(blob.storage_key) as stream:
+        for progress in IMPORTERS[entity](db, iter_records(stream, fmt), **kwargs):
+            errors.extend(progress["errors"][:MAX_IMPORT_ERRORS - len(errors)])
+    return {**progress, "errors": errors}
+
+
+def _run_export(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Export a table to a stored file; the result links to the download
+    """
+    entity = payload.get("entity")
+    if entity not in EXPORT_TABLES:
+        raise ValueError(f"Unknown export entity: {entity} (use {', '.join(EXPORT_TABLES)})")
+    fmt = payload.get("format") or "ndjson"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt} (use ndjson or csv)")
+    chunks = (text.encode() for text in export_table(EXPORT_TABLES[entity], fmt))
+    blob = store_file(db, chunks, EXPORT_FORMATS[fmt])
+    return {"sha256": blob.sha256, "size": blob.size, "file_url": blob.file_url}
+
+
+# Job kinds the workers can run
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    "maintenance.run": _run_maintenance,
+    "dashboard.refresh": _refresh_dashboard,
+    "trips.plan": _plan_trips,
+    "reports.render": _render_reports,
+    "uploads.thumbnail": _make_thumbnail,
+    "uploads.cleanup": _cleanup_uploads,
+    "audit.maintain": _maintain_audit_log,
+    "imports.run": _run_import,
+    "exports.run": _run_export,
+}
+
+# Jobs the workers enqueue on a schedule: kind -> interval in seconds (0 disables)
+PERIODIC_JOBS: Dict[str, int] = {
+    "maintenance.run": settings.MAINTENANCE_RUN_INTERVAL_SECONDS,
+    "uploads.cleanup": settings.UPLOAD_CLEANUP_INTERVAL_SECONDS,
+    "audit.maintain": settings.AUDIT_MAINTENANCE_INTERVAL_SECONDS,
+}
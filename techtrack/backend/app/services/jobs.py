@@ -0,0 +1,289 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from tenacity import RetryCallState, wait_exponential, wait_random
+
+from app.core.config import settings
+from app.db.pagination import Keyset
+from app.db.session import SessionLocal
+from app.models.job import Job
+from app.services.audit import audit_actor
+from app.services.job_handlers import JOB_HANDLERS
+
+logger = logging.getLogger(__name__)
+
+FINISHED_JOB_STATUSES = ("succeeded", "failed", "cancelled")
+
+# Latest jobs first
+job_keyset = Keyset(Job.id, descending=True)
+
+# Delay before the next attempt of a failed job: exponential with jitter, so
+# jobs failing on the same outage don't all come back at once
+_backoff = wait_exponential(
+    multiplier=settings.JOB_RETRY_BASE_SECONDS, max=settings.JOB_RETRY_MAX_SECONDS
+) + wait_random(0, settings.JOB_RETRY_BASE_SECONDS)
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Seconds to wait after the given (1-based) failed attempt
+    """
+    state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+    state.attempt_number = attempt
+    return _backoff(state)
+
+
+def get_job(db: Session, job_id: int) -> Optional[Job]:
+    return db.get(Job, job_id)
+
+
+def get_jobs(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    created_by_id: Optional[int] = None,
+) -> Tuple[List[Job], Optional[str]]:
+    stmt = select(Job)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    if kind:
+        stmt = stmt.where(Job.kind == kind)
+    if created_by_id is not None:
+        stmt = stmt.where(Job.created_by_id == created_by_id)
+    jobs = db.execute(job_keyset.apply(stmt, cursor, limit)).scalars().all()
+    return job_keyset.page(jobs, limit)
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    priority: int = 0,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+    dedupe_key: Optional[str] = None,
+    created_by_id: Optional[int] = None,
+) -> Job:
+    """
+    Queue a job for the workers.
+
+    With a `dedupe_key`, enqueuing a key that already exists returns the
+    existing job instead of adding a second one.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    by_key = select(Job).where(Job.dedupe_key == dedupe_key)
+    if dedupe_key:
+        existing = db.execute(by_key).scalar_one_or_none()
+        if existing is not None:
+            return existing
+
+    job = Job(
+        kind=kind,
+        payload=to_jsonable_python(payload or {}),
+        priority=priority,
+        run_at=run_at or datetime.utcnow(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        dedupe_key=dedupe_key,
+        created_by_id=created_by_id,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another process enqueued the same key first
+        db.rollback()
+        if not dedupe_key:
+            raise
+        return db.execute(by_key).scalar_one()
+    db.refresh(job)
+    return job
+
+
+def cancel_job(db: Session, job_id: int) -> Job:
+    """
+    Cancel a job that hasn't started; running jobs can't be interrupted
+    """
+    result = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "queued")
+        .values(status="cancelled", finished_at=datetime.utcnow())
+    )
+    db.commit()
+    job = db.get(Job, job_id)
+    if job is None:
+        raise ValueError(f"Job {job_id} not found")
+    if not result.rowcount:
+        raise ValueError(f"Job {job_id} is {job.status}; only queued jobs can be cancelled")
+    return job
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int, now: Optional[datetime] = None) -> List[int]:
+    """
+    Lease up to `limit` due jobs to the worker, highest priority first.
+
+    On PostgreSQL the candidates are locked with FOR UPDATE SKIP LOCKED, so
+    concurrent workers each get different rows without waiting on one
+    another. The UPDATE only takes rows that are still queued, which keeps
+    the claim safe on databases that ignore the row lock (SQLite).
+    """
+    now = now or datetime.utcnow()
+    candidates = (
+        select(Job.id)
+        .where(Job.status == "queued", Job.run_at <= now)
+        .order_by(Job.priority.desc(), Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    ids = db.execute(candidates).scalars().all()
+    if not ids:
+        db.rollback()
+        return []
+    claimed = db.execute(
+        update(Job)
+        .where(Job.id.in_(ids), Job.status == "queued")
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            locked_by=worker_id,
+            heartbeat_at=now,
+            started_at=now,
+        )
+        .returning(Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    # RETURNING comes back in no particular order: submit in claim order
+    taken = set(claimed)
+    return [job_id for job_id in ids if job_id in taken]
+
+
+def heartbeat_jobs(db: Session, worker_id: str, job_ids: Sequence[int]) -> None:
+    """
+    Renew the lease of the jobs the worker is running
+    """
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == "running")
+        .values(heartbeat_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def release_jobs(db: Session, worker_id: str, job_ids: Sequence[int]) -> None:
+    """
+    Put unfinished jobs of a stopping worker back in the queue; the
+    interrupted attempt doesn't count
+    """
+    if not job_ids:
+        return
+    db.execute(
+        update(Job)
+        .where(Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == "running")
+        .values(status="queued", attempts=Job.attempts - 1, locked_by=None, run_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def recover_stale_jobs(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Requeue running jobs whose worker stopped heartbeating and drop
+    finished jobs past the retention period
+    """
+    now = now or datetime.utcnow()
+    stale = (
+        Job.status == "running",
+        Job.heartbeat_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS),
+    )
+    lost = "Worker stopped heartbeating"
+    failed = db.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status="failed", locked_by=None, last_error=lost, finished_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.execute(
+        update(Job)
+        .where(*stale)
+        .values(status="queued", locked_by=None, last_error=lost, run_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    pruned = db.execute(
+        delete(Job)
+        .where(
+            Job.status.in_(FINISHED_JOB_STATUSES),
+            Job.finished_at < now - timedelta(days=settings.JOB_RETENTION_DAYS),
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if failed or requeued:
+        logger.warning("Recovered stale jobs: %s requeued, %s failed", requeued, failed)
+    return {"requeued": requeued, "failed": failed, "pruned": pruned}
+
+
+def _finish_job(db: Session, job_id: int, worker_id: str, **values: Any) -> None:
+    # A job released or recovered meanwhile belongs to someone else now
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == "running")
+        .values(locked_by=None, **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def run_job(job_id: int, worker_id: str) -> str:
+    """
+    Run a claimed job in its own session and record the outcome.
+
+    Failures are retried with backoff until max_attempts; a ValueError
+    fails the job at once. Returns the resulting status.
+    """
+    db = SessionLocal()
+    actor = None
+    try:
+        job = db.get(Job, job_id)
+        kind, payload = job.kind, dict(job.payload or {})
+        attempts, max_attempts = job.attempts, job.max_attempts
+        # Changes made by the job are audited as the user who queued it
+        actor = audit_actor.set(job.created_by_id)
+        db.commit()
+        try:
+            handler = JOB_HANDLERS.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {kind}")
+            result = to_jsonable_python(handler(db, payload))
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"
+            now = datetime.utcnow()
+            if isinstance(e, ValueError) or attempts >= max_attempts:
+                logger.exception("Job %s (%s) failed", job_id, kind)
+                _finish_job(db, job_id, worker_id, status="failed", last_error=error, finished_at=now)
+                return "failed"
+            delay = retry_delay(attempts)
+            logger.warning("Job %s (%s) attempt %s failed, retrying in %.0fs: %s", job_id, kind, attempts, delay, error)
+            _finish_job(
+                db, job_id, worker_id,
+                status="queued", last_error=error, run_at=now + timedelta(seconds=delay),
+            )
+            return "queued"
+        _finish_job(db, job_id, worker_id, status="succeeded", result=result, finished_at=datetime.utcnow())
+        return "succeeded"
+    finally:
+        db.close()
+        if actor is not None:
+            audit_actor.reset(actor)
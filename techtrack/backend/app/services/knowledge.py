@@ -0,0 +1,195 @@
+import html
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.http_cache import version_statement
+from app.models.knowledge import KnowledgeItem
+from app.schemas.knowledge import KnowledgeItemCreate
+
+# Markers around matched terms in the returned (HTML-escaped) snippets
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# What ts_headline / snippet put around matches: private-use characters, so
+# that the content can be escaped before the markers are put in place
+_SENTINEL_START = "\ue000"
+_SENTINEL_STOP = "\ue001"
+
+_HIT_COLUMNS = "k.id, k.title, k.category, k.tags, k.file_url, k.updated_at"
+
+
+def get_knowledge_item(db: Session, item_id: int) -> Optional[KnowledgeItem]:
+    return db.query(KnowledgeItem).filter(KnowledgeItem.id == item_id).first()
+
+
+def get_knowledge_item_version(db: Session, item_id: int) -> Optional[Tuple[Any, ...]]:
+    row = db.execute(select(KnowledgeItem.updated_at).where(KnowledgeItem.id == item_id)).first()
+    return tuple(row) if row else None
+
+
+def get_knowledge_version(db: Session) -> Tuple[Any, ...]:
+    """
+    Version of the whole knowledge base; search results depend on all of it
+    """
+    return tuple(db.execute(version_statement(KnowledgeItem)).one())
+
+
+def create_knowledge_item(db: Session, item_in: KnowledgeItemCreate, created_by_id: int) -> KnowledgeItem:
+    item = KnowledgeItem(**item_in.model_dump(), created_by_id=created_by_id)
+    db.add(item)
+    db.commit()
+    db.refresh(item)
+    cache.invalidate_tags(KnowledgeItem.__tablename__)
+    return item
+
+
+def _filters(category: Optional[str], tag: Optional[str], dialect: str) -> Tuple[str, Dict[str, Any]]:
+    clauses, params = [], {}
+    if category:
+        clauses.append("k.category = :category")
+        params["category"] = category
+    if tag:
+        if dialect == "postgresql":
+            clauses.append("k.tags @> CAST(:tag_json AS jsonb)")
+            params["tag_json"] = json.dumps([tag])
+        else:
+            clauses.append("EXISTS (SELECT 1 FROM json_each(k.tags) WHERE json_each.value = :tag)")
+            params["tag"] = tag
+    return "".join(f" AND {c}" for c in clauses), params
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; the prefix
+    # match partly makes up for the missing Russian stemmer
+    return " ".join(f'"{term}"*' for term in re.findall(r"\w+", query))
+
+
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+    """
+    HTML-escape a snippet of user-written content, then mark the matches
+    """
+    if snippet is None:
+        return None
+    return (
+        html.escape(snippet)
+        .replace(_SENTINEL_START, HIGHLIGHT_START)
+        .replace(_SENTINEL_STOP, HIGHLIGHT_STOP)
+    )
+
+
+def _search_postgresql(
+    db: Session, query: str, where: str, params: Dict[str, Any], limit: int, facet_limit: int
+) -> Tuple[List[Any], List[Any]]:
+    match = "k.search_vector @@ websearch_to_tsquery('russian', :q)"
+    hits = db.execute(
+        text(
+            f"""
+            SELECT {_HIT_COLUMNS},
+                   ts_rank_cd(k.search_vector, websearch_to_tsquery('russian', :q)) AS rank,
+                   ts_headline(
+                       'russian', coalesce(k.content, ''), websearch_to_tsquery('russian', :q),
+                       'StartSel="{_SENTINEL_START}", StopSel="{_SENTINEL_STOP}", MaxFragments=2, MaxWords=30, MinWords=10'
+                   ) AS snippet
+            FROM (
+                SELECT * FROM knowledge_items k WHERE {match}{where}
+                ORDER BY ts_rank_cd(k.search_vector, websearch_to_tsquery('russian', :q)) DESC, k.id
+                LIMIT :limit
+            ) k
+            ORDER BY rank DESC, k.id
+            """
+        ),
+        {**params, "q": query, "limit": limit},
+    ).all()
+    facets = db.execute(
+        text(
+            f"""
+            SELECT tag, count(*) AS count
+            FROM knowledge_items k, jsonb_array_elements_text(k.tags) AS tag
+            WHERE {match}{where}
+            GROUP BY tag ORDER BY count DESC, tag
+            LIMIT :facet_limit
+            """
+        ),
+        {**params, "q": query, "facet_limit": facet_limit},
+    ).all()
+    return hits, facets
+
+
+def _search_sqlite(
+    db: Session, query: str, where: str, params: Dict[str, Any], limit: int, facet_limit: int
+) -> Tuple[List[Any], List[Any]]:
+    match_query = _fts5_query(query)
+    if not match_query:
+        return [], []
+    source = "knowledge_fts JOIN knowledge_items k ON k.id = knowledge_fts.rowid"
+    match = "knowledge_fts MATCH :q"
+    hits = db.execute(
+        text(
+            f"""
+            SELECT {_HIT_COLUMNS},
+                   -bm25(knowledge_fts, 10.0, 4.0, 1.0) AS rank,
+                   snippet(knowledge_fts, 2, '{_SENTINEL_START}', '{_SENTINEL_STOP}', '…', 24) AS snippet
+            FROM {source}
+            WHERE {match}{where}
+            ORDER BY rank DESC, k.id
+            LIMIT :limit
+            """
+        ),
+        {**params, "q": match_query, "limit": limit},
+    ).all()
+    facets = db.execute(
+        text(
+            f"""
+            SELECT tag.value AS tag, count(*) AS count
+            FROM {source}, json_each(k.tags) AS tag
+            WHERE {match}{where}
+            GROUP BY tag.value ORDER BY count DESC, tag.value
+            LIMIT :facet_limit
+            """
+        ),
+        {**params, "q": match_query, "facet_limit": facet_limit},
+    ).all()
+    return hits, facets
+
+
+def search_knowledge(
+    db: Session,
+    query: str,
+    category: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: int = 20,
+    facet_limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    Ranked full-text search with highlighted snippets and tag facets.
+
+    Uses the tsvector/GIN index on PostgreSQL and the FTS5 table on SQLite.
+    Facets count tags over all matches, not only the returned page.
+    """
+    dialect = db.get_bind().dialect.name
+    where, params = _filters(category, tag, dialect)
+    if dialect == "postgresql":
+        hits, facets = _search_postgresql(db, query, where, params, limit, facet_limit)
+    elif dialect == "sqlite":
+        hits, facets = _search_sqlite(db, query, where, params, limit, facet_limit)
+    else:
+        raise ValueError(f"Full-text search is not supported on {dialect}")
+
+    items = []
+    for hit in hits:
+        item = dict(hit._mapping)
+        # SQLite returns JSON columns of raw SQL as text
+        if isinstance(item["tags"], str):
+            item["tags"] = json.loads(item["tags"])
+        item["tags"] = item["tags"] or []
+        item["snippet"] = highlight_snippet(item["snippet"])
+        items.append(item)
+    return {
+        "items": items,
+        "facets": [{"tag": tag, "count": count} for tag, count in facets],
+    }
@@ -0,0 +1,286 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, exists, or_, select, update
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.cache import cache
+from app.models.equipment import Equipment
+from app.models.maintenance import MaintenanceRule, MaintenanceSchedule
+from app.models.task import Task
+from app.schemas.maintenance import MaintenanceRuleCreate
+from app.services.dashboard import CLOSED_TASK_STATUSES
+
+logger = logging.getLogger(__name__)
+
+
+def get_maintenance_rules(db: Session) -> List[MaintenanceRule]:
+    return db.query(MaintenanceRule).order_by(MaintenanceRule.id).all()
+
+
+def create_maintenance_rule(db: Session, rule_in: MaintenanceRuleCreate, created_by_id: int) -> MaintenanceRule:
+    if not (rule_in.hours_interval or rule_in.days_interval or rule_in.warranty_notice_days):
+        raise ValueError("A rule needs an hours interval, a days interval or a warranty notice")
+    rule = MaintenanceRule(**rule_in.model_dump(), created_by_id=created_by_id)
+    db.add(rule)
+    db.flush()
+    _reset_checks(db, rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+def _equipment_filter(rule: MaintenanceRule) -> List[Any]:
+    criteria = []
+    if rule.equipment_model:
+        criteria.append(Equipment.model == rule.equipment_model)
+    if rule.manufacturer:
+        criteria.append(Equipment.manufacturer == rule.manufacturer)
+    return criteria
+
+
+def _reset_checks(db: Session, rule: MaintenanceRule) -> None:
+    # Units covered by a new or changed rule are evaluated on the next run;
+    # updated_at is kept so the sync feed doesn't resend them
+    db.execute(
+        update(Equipment.__table__)
+        .where(*_equipment_filter(rule))
+        .values(maintenance_checked_at=None, updated_at=Equipment.__table__.c.updated_at)
+    )
+
+
+def _matches(rule: MaintenanceRule, equipment: Equipment) -> bool:
+    return (
+        (not rule.equipment_model or rule.equipment_model == equipment.model)
+        and (not rule.manufacturer or rule.manufacturer == equipment.manufacturer)
+    )
+
+
+def _future(now: datetime, *moments: Optional[datetime]) -> Optional[datetime]:
+    upcoming = [m for m in moments if m is not None and m > now]
+    return min(upcoming) if upcoming else None
+
+
+def evaluate_schedule(
+    equipment: Equipment, rule: MaintenanceRule, schedule: MaintenanceSchedule, now: datetime
+) -> Dict[str, Any]:
+    """
+    Recompute when the rule is next due for the unit.
+
+    Returns whether a service task should be open (``in_window``), its due
+    date, and the next moment the result changes by the passing of time
+    alone (``next_check_at``).
+    """
+    hours = equipment.working_hours or 0.0
+
+    # A completed service task counts as a service of the unit
+    task = schedule.task
+    if task is not None and task.status == "выполнена":
+        done_at = task.completed_at or task.updated_at or now
+        if equipment.last_service is None or equipment.last_service < done_at:
+            equipment.last_service = done_at
+
+    if equipment.last_service != schedule.serviced_at:
+        schedule.serviced_at = equipment.last_service
+        schedule.service_hours = hours if equipment.last_service is not None else None
+    if schedule.observed_at is None:
+        schedule.observed_at, schedule.observed_hours = now, hours
+    schedule.evaluated_at = now
+
+    if rule.warranty_notice_days:
+        expiry = equipment.warranty_expiry
+        notice_at = expiry - timedelta(days=rule.warranty_notice_days) if expiry else None
+        schedule.due_at, schedule.due_hours, schedule.is_due = expiry, None, False
+        return {
+            "in_window": bool(expiry and notice_at <= now < expiry),
+            "due_date": expiry,
+            "default_due_date": expiry,
+            "next_check_at": _future(now, notice_at, expiry),
+        }
+
+    due_hours = hours_due_at = None
+    if rule.hours_interval:
+        # Never serviced on record: counted from a new unit, so anything past
+        # its first interval is overdue
+        base = schedule.service_hours if schedule.service_hours is not None else 0.0
+        due_hours = base + rule.hours_interval
+        elapsed_days = (now - schedule.observed_at).total_seconds() / 86400
+        if elapsed_days >= 1 and hours > schedule.observed_hours:
+            per_day = (hours - schedule.observed_hours) / elapsed_days
+            hours_due_at = now + timedelta(days=max(0.0, due_hours - hours) / per_day)
+
+    due_at = None
+    if rule.days_interval:
+        base_date = equipment.last_service or equipment.installed_at or equipment.created_at or now
+        due_at = base_date + timedelta(days=rule.days_interval)
+
+    lead = timedelta(days=rule.lead_days)
+    is_due = bool((due_at and due_at <= now) or (due_hours is not None and hours >= due_hours))
+    in_window = is_due or bool(
+        (due_at and due_at - lead <= now)
+        or (due_hours is not None and hours >= due_hours - rule.lead_hours)
+        or (hours_due_at and hours_due_at - lead <= now)
+    )
+    schedule.due_at, schedule.due_hours, schedule.is_due = due_at, due_hours, is_due
+
+    due_dates = [d for d in (due_at, hours_due_at) if d is not None]
+    return {
+        "in_window": in_window,
+        # Without a date or a usage estimate the task is due after the lead time
+        "due_date": min(due_dates) if due_dates else None,
+        "default_due_date": now + lead,
+        "next_check_at": _future(
+            now,
+            due_at - lead if due_at else None,
+            due_at,
+            hours_due_at - lead if hours_due_at else None,
+        ),
+    }
+
+
+def _sync_task(
+    db: Session,
+    equipment: Equipment,
+    rule: MaintenanceRule,
+    schedule: MaintenanceSchedule,
+    result: Dict[str, Any],
+    stats: Dict[str, int],
+) -> None:
+    if not result["in_window"]:
+        return
+    priority = "высокий" if schedule.is_due else rule.priority
+    task = schedule.task
+    due_date = result["due_date"] or (task.due_date if task is not None else None)
+    if task is not None and task.status not in CLOSED_TASK_STATUSES:
+        if task.due_date != due_date or task.priority != priority:
+            task.due_date, task.priority = due_date, priority
+            stats["tasks_updated"] += 1
+        return
+    # A cancelled task skips this occurrence; the next service raises a new one
+    if task is not None and task.status == "отменена":
+        if schedule.serviced_at is None or task.created_at > schedule.serviced_at:
+            return
+
+    schedule.task = Task(
+        title=f"ТО: {rule.name} — {equipment.name}",
+        description=f"Плановое обслуживание по правилу «{rule.name}»",
+        city=equipment.city,
+        location=equipment.location,
+        priority=priority,
+        status="новая",
+        date_type="nextService",
+        due_date=result["due_date"] or result["default_due_date"],
+        equipment_id=equipment.id,
+        created_by_id=rule.created_by_id,
+    )
+    db.add(schedule.task)
+    stats["tasks_created"] += 1
+
+
+def _evaluate_batch(
+    db: Session, ids: List[int], rules: List[MaintenanceRule], now: datetime, stats: Dict[str, int]
+) -> None:
+    equipment_list = db.execute(select(Equipment).where(Equipment.id.in_(ids))).scalars().all()
+    schedules = db.execute(
+        select(MaintenanceSchedule)
+        .options(selectinload(MaintenanceSchedule.task))
+        .where(MaintenanceSchedule.equipment_id.in_(ids))
+    ).scalars().all()
+    by_equipment: Dict[int, Dict[int, MaintenanceSchedule]] = {}
+    for schedule in schedules:
+        by_equipment.setdefault(schedule.equipment_id, {})[schedule.rule_id] = schedule
+
+    checks = []
+    for equipment in equipment_list:
+        unit_schedules = by_equipment.get(equipment.id, {})
+        was_due = any(s.is_due for s in unit_schedules.values())
+        is_due = False
+        next_checks = []
+        for rule in rules:
+            if not _matches(rule, equipment):
+                continue
+            schedule = unit_schedules.get(rule.id)
+            if schedule is None:
+                schedule = MaintenanceSchedule(equipment_id=equipment.id, rule_id=rule.id)
+                db.add(schedule)
+            result = evaluate_schedule(equipment, rule, schedule, now)
+            _sync_task(db, equipment, rule, schedule, result, stats)
+            is_due = is_due or schedule.is_due
+            next_checks.append(result["next_check_at"])
+
+        # Only undo a "Требует ТО" this scheduler set; "В ремонте" is left alone
+        if is_due and equipment.status == "Рабочий":
+            equipment.status = "Требует ТО"
+            stats["status_changed"] += 1
+        elif not is_due and was_due and equipment.status == "Требует ТО":
+            equipment.status = "Рабочий"
+            stats["status_changed"] += 1
+        checks.append({"b_id": equipment.id, "b_next": _future(now, *next_checks)})
+
+    db.flush()
+    table = Equipment.__table__
+    if checks:
+        checked_at = datetime.utcnow()
+        db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                maintenance_checked_at=checked_at,
+                maintenance_next_check_at=bindparam("b_next"),
+                updated_at=table.c.updated_at,
+            ),
+            checks,
+        )
+    db.commit()
+    stats["evaluated"] += len(equipment_list)
+
+
+def run_maintenance(
+    db: Session, now: Optional[datetime] = None, full: bool = False, batch_size: int = 500
+) -> Dict[str, int]:
+    """
+    Evaluate equipment against the active maintenance rules.
+
+    Incremental unless ``full``: only units that changed since their last
+    check (hours, service dates or any other field), whose scheduler task
+    changed, or whose next time-based check has come are loaded. Each batch
+    is one commit.
+    """
+    now = now or datetime.utcnow()
+    stats = {"evaluated": 0, "tasks_created": 0, "tasks_updated": 0, "status_changed": 0, "batches": 0}
+    rules = db.execute(select(MaintenanceRule).where(MaintenanceRule.is_active.is_(True))).scalars().all()
+    if not rules:
+        return stats
+
+    stmt = select(Equipment.id)
+    if not full:
+        task_changed = exists().where(
+            MaintenanceSchedule.equipment_id == Equipment.id,
+            MaintenanceSchedule.task_id == Task.id,
+            Task.updated_at > Equipment.maintenance_checked_at,
+        )
+        stmt = stmt.where(
+            or_(
+                Equipment.maintenance_checked_at.is_(None),
+                Equipment.updated_at > Equipment.maintenance_checked_at,
+                Equipment.maintenance_next_check_at <= now,
+                task_changed,
+            )
+        )
+
+    last_id = 0
+    while True:
+        ids = db.execute(
+            stmt.where(Equipment.id > last_id).order_by(Equipment.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        _evaluate_batch(db, ids, rules, now, stats)
+        stats["batches"] += 1
+        last_id = ids[-1]
+
+    if stats["tasks_created"] or stats["tasks_updated"] or stats["status_changed"]:
+        cache.invalidate_tags(Equipment.__tablename__, Task.__tablename__)
+    logger.info("Maintenance run: %s", stats)
+    return stats
@@ -0,0 +1,66 @@
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.http_cache import version_statement
+from app.db.pagination import Keyset
+from app.models.part import Part
+
+part_keyset = Keyset(Part.id)
+
+
+def _part_filters(
+    equipment_id: Optional[int] = None,
+    equipment_type: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[Any]:
+    criteria = []
+    if equipment_id is not None:
+        criteria.append(Part.equipment_id == equipment_id)
+    if equipment_type:
+        criteria.append(Part.equipment_type == equipment_type)
+    if status:
+        criteria.append(Part.status == status)
+    return criteria
+
+
+def _parts_statement(cursor: Optional[str], limit: int, **filters: Any) -> Select:
+    return part_keyset.apply(select(Part).where(*_part_filters(**filters)), cursor, limit)
+
+
+def get_part(db: Session, part_id: int) -> Optional[Part]:
+    return db.query(Part).filter(Part.id == part_id).first()
+
+
+def get_parts(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Part], Optional[str]]:
+    parts = db.execute(_parts_statement(cursor, limit, **filters)).scalars().all()
+    return part_keyset.page(parts, limit)
+
+
+def get_parts_version(db: Session, **filters: Any) -> Tuple[Any, ...]:
+    return tuple(db.execute(version_statement(Part, *_part_filters(**filters))).one())
+
+
+async def get_part_async(db: AsyncSession, part_id: int) -> Optional[Part]:
+    return (await db.execute(select(Part).where(Part.id == part_id))).scalar_one_or_none()
+
+
+async def get_parts_async(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Part], Optional[str]]:
+    parts = (await db.execute(_parts_statement(cursor, limit, **filters))).scalars().all()
+    return part_keyset.page(parts, limit)
+
+
+async def get_part_version_async(db: AsyncSession, part_id: int) -> Optional[Tuple[Any, ...]]:
+    row = (await db.execute(select(Part.updated_at).where(Part.id == part_id))).first()
+    return tuple(row) if row else None
+
+
+async def get_parts_version_async(db: AsyncSession, **filters: Any) -> Tuple[Any, ...]:
+    return tuple((await db.execute(version_statement(Part, *_part_filters(**filters)))).one())
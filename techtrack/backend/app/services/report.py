@@ -0,0 +1,228 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.core.config import settings
+from app.models.equipment import Equipment
+from app.models.report import Report
+from app.models.task import Task
+from app.services.report_render import REPORT_MEDIA_TYPES, TEMPLATE_VERSION, render_to_file
+
+logger = logging.getLogger(__name__)
+
+# Everything a rendered report shows, loaded in a fixed number of queries per batch
+RENDER_OPTIONS = (
+    joinedload(Report.created_by),
+    joinedload(Report.equipment).selectinload(Equipment.parts),
+    joinedload(Report.task).options(
+        joinedload(Task.assigned_to),
+        joinedload(Task.equipment).selectinload(Equipment.parts),
+    ),
+)
+
+_FILE_NAME = re.compile(r"^[0-9a-f]{64}\.(pdf|html)$")
+
+# Process pool for rendering, created on first use
+_render_executor: Optional[Executor] = None
+
+
+def get_report(db: Session, report_id: int) -> Optional[Report]:
+    return db.get(Report, report_id)
+
+
+def _display(value: Any) -> Any:
+    """
+    Datetimes as shown in a report, to the minute; other values unchanged
+    """
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _person(user: Any) -> Optional[str]:
+    return (user.full_name or user.username) if user is not None else None
+
+
+def build_report_context(report: Report) -> Dict[str, Any]:
+    """
+    Plain data shown in a rendered report; its hash names the output file
+    """
+    task = report.task
+    equipment = report.equipment or (task.equipment if task is not None else None)
+    context: Dict[str, Any] = {
+        "report": {
+            "id": report.id,
+            "title": report.title,
+            "type": report.type,
+            "content": report.content,
+            "created_at": _display(report.created_at),
+        },
+        "author": _person(report.created_by),
+        "task": None,
+        "equipment": None,
+        "parts": [],
+    }
+    if task is not None:
+        context["task"] = {
+            "id": task.id,
+            "title": task.title,
+            "status": task.status,
+            "priority": task.priority,
+            "city": task.city,
+            "location": task.location,
+            "engineer": _person(task.assigned_to),
+            "due_date": _display(task.due_date),
+            "completed_at": _display(task.completed_at),
+        }
+    if equipment is not None:
+        context["equipment"] = {
+            field: _display(getattr(equipment, field))
+            for field in (
+                "name", "model", "manufacturer", "serial_number", "organization",
+                "address", "working_hours", "last_service", "warranty_expiry",
+            )
+        }
+        context["parts"] = [
+            {"name": p.name, "article_number": p.article_number, "quantity": p.quantity, "status": p.status}
+            for p in sorted(equipment.parts, key=lambda p: p.id)
+        ]
+    return context
+
+
+def report_file_name(fmt: str, context: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"format": fmt, "template": TEMPLATE_VERSION, "context": context},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return f"{hashlib.sha256(payload.encode()).hexdigest()}.{fmt}"
+
+
+def report_file_path(file_name: str) -> str:
+    """
+    Storage path of a rendered file; raises ValueError for anything that
+    isn't a content-addressed report file name
+    """
+    if not _FILE_NAME.match(file_name):
+        raise ValueError("Invalid report file name")
+    return os.path.join(settings.REPORT_STORAGE_DIR, file_name[:2], file_name)
+
+
+def report_file_url(file_name: str) -> str:
+    return f"{settings.API_V1_STR}/reports/files/{file_name}"
+
+
+def _get_executor() -> Optional[Executor]:
+    global _render_executor
+
+    if settings.REPORT_RENDER_PROCESSES > 0 and _render_executor is None:
+        _render_executor = ProcessPoolExecutor(max_workers=settings.REPORT_RENDER_PROCESSES)
+    return _render_executor
+
+
+def stop_report_rendering() -> None:
+    global _render_executor
+
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=True)
+        _render_executor = None
+
+
+def _render_missing(fmt: str, contexts: Dict[str, Dict[str, Any]]) -> int:
+    # Only files not on disk yet; re-renders of unchanged reports cost a stat
+    missing = {name: ctx for name, ctx in contexts.items() if not os.path.exists(report_file_path(name))}
+    if not missing:
+        return 0
+    names = list(missing)
+    args = (
+        [fmt] * len(names),
+        [missing[n] for n in names],
+        [report_file_path(n) for n in names],
+        [settings.REPORT_FONT_PATH] * len(names),
+    )
+    executor = _get_executor()
+    if executor is None:
+        list(map(render_to_file, *args))
+    else:
+        chunksize = max(1, len(names) // (settings.REPORT_RENDER_PROCESSES * 4))
+        list(executor.map(render_to_file, *args, chunksize=chunksize))
+    return len(names)
+
+
+def render_reports(db: Session, report_ids: Sequence[int], fmt: str = "pdf") -> Dict[str, int]:
+    """
+    Render reports in batches on the process pool.
+
+    Files are content-addressed by the hash of their inputs, so reports
+    whose task, equipment and parts didn't change are not rendered again.
+    PDF renders are recorded in file_url.
+    """
+    if fmt not in REPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported report format: {fmt} (use pdf or html)")
+    stats = {"reports": 0, "rendered": 0, "cached": 0}
+    ids = sorted(set(report_ids))
+    batch_size = settings.REPORT_RENDER_BATCH_SIZE
+    for offset in range(0, len(ids), batch_size):
+        reports = db.execute(
+            select(Report).options(*RENDER_OPTIONS).where(Report.id.in_(ids[offset:offset + batch_size]))
+        ).unique().scalars().all()
+        contexts = {}
+        urls = []
+        for report in reports:
+            context = build_report_context(report)
+            name = report_file_name(fmt, context)
+            contexts[name] = context
+            if fmt == "pdf" and report.file_url != report_file_url(name):
+                urls.append({"b_id": report.id, "b_url": report_file_url(name)})
+        rendered = _render_missing(fmt, contexts)
+        if urls:
+            table = Report.__table__
+            db.execute(
+                update(table).where(table.c.id == bindparam("b_id")).values(file_url=bindparam("b_url")),
+                urls,
+            )
+        db.commit()
+        stats["reports"] += len(reports)
+        stats["rendered"] += rendered
+        stats["cached"] += len(reports) - rendered
+    logger.info("Rendered reports: %s", stats)
+    return stats
+
+
+def render_report(db: Session, report_id: int, fmt: str = "pdf") -> str:
+    """
+    Render one report and return the URL of the file
+    """
+    if fmt not in REPORT_MEDIA_TYPES:
+        raise ValueError(f"Unsupported report format: {fmt} (use pdf or html)")
+    report = db.execute(
+        select(Report).options(*RENDER_OPTIONS).where(Report.id == report_id)
+    ).unique().scalar_one_or_none()
+    if report is None:
+        raise ValueError(f"Report {report_id} not found")
+    context = build_report_context(report)
+    name = report_file_name(fmt, context)
+    _render_missing(fmt, {name: context})
+    if fmt == "pdf" and report.file_url != report_file_url(name):
+        report.file_url = report_file_url(name)
+        db.commit()
+    return report_file_url(name)
+
+
+def get_report_ids_for_month(db: Session, year: int, month: int, report_type: Optional[str] = None) -> List[int]:
+    # A range on created_at, so the index is used
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    stmt = select(Report.id).where(Report.created_at >= start, Report.created_at < end)
+    if report_type:
+        stmt = stmt.where(Report.type == report_type)
+    return list(db.execute(stmt.order_by(Report.id)).scalars().all())
@@ -0,0 +1,193 @@
+"""
+Service report rendering, run in the worker processes of the render pool.
+
+Functions here take the plain context built by app.services.report and
+must not touch the database: they are shipped to other processes.
+"""
+import io
+import os
+import tempfile
+from html import escape
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+REPORT_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+}
+
+# Bump when the layout changes so cached files are rendered again
+TEMPLATE_VERSION = 2
+
+_FONT_NAME = "ReportFont"
+
+
+def _value(value: Any) -> str:
+    # Datetimes arrive formatted by build_report_context
+    if value is None or value == "":
+        return "—"
+    return str(value)
+
+
+def _sections(context: Dict[str, Any]) -> List[Tuple[str, List[Tuple[str, Any]]]]:
+    report, task, equipment = context["report"], context.get("task"), context.get("equipment")
+    sections = [
+        ("Отчет", [
+            ("Тип", report["type"]),
+            ("Дата", report["created_at"]),
+            ("Составил", context.get("author")),
+        ]),
+    ]
+    if task:
+        sections.append(("Задача", [
+            ("№", task["id"]),
+            ("Название", task["title"]),
+            ("Статус", task["status"]),
+            ("Приоритет", task["priority"]),
+            ("Город", task["city"]),
+            ("Место", task["location"]),
+            ("Инженер", task["engineer"]),
+            ("Срок", task["due_date"]),
+            ("Выполнена", task["completed_at"]),
+        ]))
+    if equipment:
+        sections.append(("Оборудование", [
+            ("Название", equipment["name"]),
+            ("Модель", equipment["model"]),
+            ("Производитель", equipment["manufacturer"]),
+            ("Серийный номер", equipment["serial_number"]),
+            ("Организация", equipment["organization"]),
+            ("Адрес", equipment["address"]),
+            ("Наработка, ч", equipment["working_hours"]),
+            ("Последнее ТО", equipment["last_service"]),
+            ("Гарантия до", equipment["warranty_expiry"]),
+        ]))
+    return sections
+
+
+_PART_COLUMNS = ("Запчасть", "Артикул", "Кол-во", "Статус")
+
+
+def _part_rows(context: Dict[str, Any]) -> List[Sequence[Any]]:
+    return [(p["name"], p["article_number"], p["quantity"], p["status"]) for p in context.get("parts", [])]
+
+
+def render_html(context: Dict[str, Any]) -> bytes:
+    report = context["report"]
+    out = [
+        "<!DOCTYPE html>",
+        '<html lang="ru"><head><meta charset="utf-8">',
+        f"<title>{escape(report['title'] or '')}</title>",
+        "<style>body{font-family:sans-serif;max-width:800px;margin:2em auto;color:#222}"
+        "table{border-collapse:collapse;width:100%;margin-bottom:1.5em}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left;vertical-align:top}"
+        "th{background:#f3f4f6;width:30%}</style>",
+        "</head><body>",
+        f"<h1>{escape(report['title'] or '')}</h1>",
+    ]
+    for heading, rows in _sections(context):
+        out.append(f"<h2>{escape(heading)}</h2><table>")
+        out.extend(f"<tr><th>{escape(label)}</th><td>{escape(_value(v))}</td></tr>" for label, v in rows)
+        out.append("</table>")
+    if report.get("content"):
+        out.append("<h2>Описание работ</h2>")
+        out.extend(f"<p>{escape(line)}</p>" for line in report["content"].splitlines() if line.strip())
+    parts = _part_rows(context)
+    if parts:
+        out.append("<h2>Запчасти</h2><table><tr>")
+        out.extend(f"<th>{escape(c)}</th>" for c in _PART_COLUMNS)
+        out.append("</tr>")
+        for row in parts:
+            out.append("<tr>" + "".join(f"<td>{escape(_value(v))}</td>" for v in row) + "</tr>")
+        out.append("</table>")
+    out.append("</body></html>")
+    return "\n".join(out).encode("utf-8")
+
+
+def _register_font(font_path: Optional[str]) -> str:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    # The standard PDF fonts have no Cyrillic glyphs
+    if _FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return _FONT_NAME
+    if font_path and os.path.exists(font_path):
+        pdfmetrics.registerFont(TTFont(_FONT_NAME, font_path))
+        return _FONT_NAME
+    return "Helvetica"
+
+
+def render_pdf(context: Dict[str, Any], font_path: Optional[str] = None) -> bytes:
+    # Imported on first use: reportlab is slow to import and only PDF needs it
+    try:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import mm
+        from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    except ImportError:  # optional: only needed for PDF output
+        raise RuntimeError("PDF reports need the reportlab package")
+    font = _register_font(font_path)
+    styles = getSampleStyleSheet()
+    for style in styles.byName.values():
+        style.fontName = font
+    cell = styles["BodyText"]
+    table_style = TableStyle([
+        ("FONTNAME", (0, 0), (-1, -1), font),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ])
+
+    def paragraph(text: Any, style: Any = cell) -> Paragraph:
+        return Paragraph(escape(_value(text)), style)
+
+    report = context["report"]
+    story = [paragraph(report["title"], styles["Title"])]
+    for heading, rows in _sections(context):
+        story.append(paragraph(heading, styles["Heading2"]))
+        table = Table([[paragraph(k), paragraph(v)] for k, v in rows], colWidths=[50 * mm, 120 * mm])
+        table.setStyle(table_style)
+        story.append(table)
+    if report.get("content"):
+        story.append(paragraph("Описание работ", styles["Heading2"]))
+        story.extend(paragraph(line) for line in report["content"].splitlines() if line.strip())
+    parts = _part_rows(context)
+    if parts:
+        story.append(paragraph("Запчасти", styles["Heading2"]))
+        table = Table(
+            [[paragraph(c) for c in _PART_COLUMNS]] + [[paragraph(v) for v in row] for row in parts],
+            colWidths=[70 * mm, 40 * mm, 20 * mm, 40 * mm],
+            repeatRows=1,
+        )
+        table.setStyle(table_style)
+        story.append(table)
+    story.append(Spacer(1, 10 * mm))
+
+    buffer = io.BytesIO()
+    # invariant: no creation date or random document id, same input same bytes
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, title=report["title"] or "", invariant=1,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=15 * mm, bottomMargin=15 * mm,
+    )
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_to_file(fmt: str, context: Dict[str, Any], path: str, font_path: Optional[str] = None) -> int:
+    """
+    Render into `path` and return its size.
+
+    The file is written under a temporary name and moved into place, so a
+    reader never sees a partial file and concurrent renders of the same
+    input are harmless.
+    """
+    data = render_pdf(context, font_path) if fmt == "pdf" else render_html(context)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(data)
@@ -0,0 +1,455 @@
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.models.geocode import Geocode
+from app.models.task import Task
+from app.models.trip import Trip
+from app.models.user import User
+from app.services.audit import audit_bulk_rows
+
+# City centres (lat, lon) used when the geocodes table has no better match
+KAZAKHSTAN_CITIES: Dict[str, Tuple[float, float]] = {
+    "Алматы": (43.2389, 76.8897),
+    "Астана": (51.1605, 71.4704),
+    "Шымкент": (42.3417, 69.5901),
+    "Караганда": (49.8047, 73.1094),
+    "Актобе": (50.2839, 57.1670),
+    "Тараз": (42.9000, 71.3667),
+    "Павлодар": (52.2873, 76.9674),
+    "Усть-Каменогорск": (49.9483, 82.6279),
+    "Семей": (50.4111, 80.2275),
+    "Атырау": (47.1167, 51.8833),
+    "Костанай": (53.2144, 63.6246),
+    "Кызылорда": (44.8488, 65.4823),
+    "Уральск": (51.2333, 51.3667),
+    "Петропавловск": (54.8753, 69.1620),
+    "Актау": (43.6500, 51.1600),
+    "Темиртау": (50.0549, 72.9646),
+    "Туркестан": (43.2973, 68.2518),
+    "Кокшетау": (53.2833, 69.3833),
+    "Талдыкорган": (45.0156, 78.3739),
+    "Экибастуз": (51.7298, 75.3266),
+    "Жезказган": (47.7833, 67.7667),
+}
+
+OPEN_TASK_STATUSES = ("новая", "назначена")
+PRIORITY_WEIGHTS = {"высокий": 3, "средний": 2, "низкий": 1}
+
+# Heuristic weights, in driving minutes
+PRIORITY_BONUS_MINUTES = 60  # per priority weight when picking the next stop
+URGENCY_BONUS_MINUTES = 30  # per day of slack under a week
+LATE_DAY_PENALTY_MINUTES = 240  # per day late and priority weight
+EARTH_RADIUS_KM = 6371.0
+
+
+class PlanConflict(ValueError):
+    """
+    A planned task was put on a trip or closed while the plan was computed
+    """
+
+
+def distance_matrix_km(coords: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances between all (lat, lon) rows, in one pass
+    """
+    lat = np.radians(coords[:, 0])
+    lon = np.radians(coords[:, 1])
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def travel_minutes(distances_km: np.ndarray) -> np.ndarray:
+    """
+    Driving time estimate: road detour over the straight line at an average
+    speed, with a floor for moving between sites in the same city
+    """
+    minutes = distances_km * settings.ROUTE_DETOUR_FACTOR / settings.ROUTE_AVERAGE_SPEED_KMH * 60
+    minutes = np.maximum(minutes, settings.ROUTE_INTRA_CITY_MINUTES)
+    np.fill_diagonal(minutes, 0.0)
+    return minutes
+
+
+def load_geocodes(db: Session, cities: Sequence[str]) -> Dict[Tuple[str, str], Tuple[float, float]]:
+    points = {(city, ""): coords for city, coords in KAZAKHSTAN_CITIES.items()}
+    rows = db.execute(
+        select(Geocode.city, Geocode.location, Geocode.latitude, Geocode.longitude)
+        .where(Geocode.city.in_(set(cities)))
+    ).all()
+    for city, location, latitude, longitude in rows:
+        points[(city, location or "")] = (latitude, longitude)
+    return points
+
+
+def _locate(
+    points: Dict[Tuple[str, str], Tuple[float, float]], city: Optional[str], location: Optional[str]
+) -> Optional[Tuple[float, float]]:
+    if not city:
+        return None
+    return points.get((city, location or "")) or points.get((city, ""))
+
+
+class RoutePlanner:
+    """
+    Heuristic multi-day vehicle routing for field engineers.
+
+    Node indexes 0..E-1 are the engineers' starting points and E..E+N-1 the
+    tasks; one extra node is the open end of a route. Routes are built by a
+    parallel nearest-neighbour pass that favours urgent and high-priority
+    tasks, then each route is improved with 2-opt and or-opt moves. Move
+    deltas are computed for all positions at once with NumPy; a move is
+    kept only if the full schedule (travel plus lateness) gets cheaper.
+    """
+
+    def __init__(
+        self,
+        travel: np.ndarray,
+        service: np.ndarray,
+        weights: np.ndarray,
+        due_days: np.ndarray,
+        engineers: int,
+        horizon: int,
+        workday: float,
+    ) -> None:
+        size = travel.shape[0]
+        self.travel = np.zeros((size + 1, size + 1))
+        self.travel[:size, :size] = travel
+        self.end = size
+        self.service = service
+        self.weights = weights
+        self.due_days = due_days
+        self.engineers = engineers
+        self.horizon = horizon
+        self.workday = workday
+
+    def schedule(self, start: int, route: Sequence[int]) -> Tuple[float, float, List[int]]:
+        """
+        Split a route into working days: (travel minutes, penalty, day per stop)
+        """
+        day, clock, prev = 0, 0.0, start
+        travel = penalty = 0.0
+        days = []
+        for node in route:
+            leg = self.travel[prev, node]
+            if clock > 0 and clock + leg + self.service[node] > self.workday:
+                day, clock = day + 1, 0.0
+            clock += leg + self.service[node]
+            # Long drives spill over into the next days
+            while clock > self.workday:
+                day, clock = day + 1, clock - self.workday
+            travel += leg
+            late = day - self.due_days[node]
+            if late > 0:
+                penalty += late * LATE_DAY_PENALTY_MINUTES * self.weights[node]
+            days.append(day)
+            prev = node
+        return travel, penalty, days
+
+    def cost(self, start: int, route: Sequence[int]) -> float:
+        travel, penalty, _ = self.schedule(start, route)
+        return travel + penalty
+
+    def construct(self) -> List[List[int]]:
+        """
+        Parallel nearest neighbour: the engineer who is earliest in their
+        schedule takes the best next stop until the horizon is full
+        """
+        tasks = np.arange(self.engineers, self.end)
+        remaining = np.ones(len(tasks), dtype=bool)
+        routes: List[List[int]] = [[] for _ in range(self.engineers)]
+        state = [[0, 0.0, e] for e in range(self.engineers)]  # day, clock, node
+
+        while remaining.any():
+            active = [e for e in range(self.engineers) if state[e][0] < self.horizon]
+            if not active:
+                break
+            e = min(active, key=lambda i: (state[i][0], state[i][1]))
+            day, clock, node = state[e]
+            candidates = tasks[remaining]
+            legs = self.travel[node, candidates]
+            fits = clock + legs + self.service[candidates] <= self.workday
+            if clock > 0 and not fits.any():
+                state[e] = [day + 1, 0.0, node]
+                continue
+            slack = self.due_days[candidates] - day
+            score = (
+                legs
+                - PRIORITY_BONUS_MINUTES * self.weights[candidates]
+                - URGENCY_BONUS_MINUTES * np.clip(7 - slack, 0, 7)
+            )
+            if clock > 0:
+                score = np.where(fits, score, np.inf)
+            best = int(np.argmin(score))
+            chosen = int(candidates[best])
+            remaining[np.flatnonzero(remaining)[best]] = False
+            routes[e].append(chosen)
+
+            clock += legs[best] + self.service[chosen]
+            while clock > self.workday:
+                day, clock = day + 1, clock - self.workday
+            state[e] = [day, clock, chosen]
+        return routes
+
+    def _two_opt(self, start: int, route: List[int], deadline: float) -> Tuple[List[int], bool]:
+        improved = False
+        best_cost = self.cost(start, route)
+        n = len(route)
+        i = 0
+        while i < n - 1 and time.monotonic() < deadline:
+            seq = np.array([start] + route + [self.end])
+            a, b = seq[i], seq[i + 1]
+            c, d = seq[i + 2:n + 1], seq[i + 3:n + 2]
+            delta = self.travel[a, c] + self.travel[b, d] - self.travel[a, b] - self.travel[c, d]
+            moved = False
+            for k in np.argsort(delta)[:5]:
+                if delta[k] >= -1e-6:
+                    break
+                j = i + 2 + int(k)  # reverse seq[i+1..j], i.e. route[i..j-1]
+                candidate = route[:i] + route[i:j][::-1] + route[j:]
+                candidate_cost = self.cost(start, candidate)
+                if candidate_cost < best_cost - 1e-6:
+                    route, best_cost, moved, improved = candidate, candidate_cost, True, True
+                    break
+            if not moved:
+                i += 1
+        return route, improved
+
+    def _or_opt(self, start: int, route: List[int], deadline: float) -> Tuple[List[int], bool]:
+        improved = False
+        best_cost = self.cost(start, route)
+        for length in (1, 2, 3):
+            i = 0
+            while i + length <= len(route) and time.monotonic() < deadline:
+                segment = route[i:i + length]
+                rest = route[:i] + route[i + length:]
+                seq = np.array([start] + rest + [self.end])
+                prev = start if i == 0 else route[i - 1]
+                nxt = route[i + length] if i + length < len(route) else self.end
+                gain = (
+                    self.travel[prev, segment[0]]
+                    + self.travel[segment[-1], nxt]
+                    - self.travel[prev, nxt]
+                )
+                p, q = seq[:-1], seq[1:]
+                insert = self.travel[p, segment[0]] + self.travel[segment[-1], q] - self.travel[p, q]
+                delta = insert - gain
+                delta[i] = np.inf  # the original position
+                moved = False
+                for k in np.argsort(delta)[:5]:
+                    if delta[k] >= -1e-6:
+                        break
+                    candidate = rest[:k] + segment + rest[k:]
+                    candidate_cost = self.cost(start, candidate)
+                    if candidate_cost < best_cost - 1e-6:
+                        route, best_cost, moved, improved = candidate, candidate_cost, True, True
+                        break
+                if not moved:
+                    i += 1
+        return route, improved
+
+    def improve(self, routes: List[List[int]], time_limit: float) -> List[List[int]]:
+        deadline = time.monotonic() + time_limit
+        improved = [list(route) for route in routes]
+        for e, route in enumerate(improved):
+            changed = True
+            while changed and time.monotonic() < deadline:
+                route, by_two_opt = self._two_opt(e, route, deadline)
+                route, by_or_opt = self._or_opt(e, route, deadline)
+                changed = by_two_opt or by_or_opt
+            improved[e] = route
+        return improved
+
+
+def _as_date(value: Optional[datetime]) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def plan_trips(
+    db: Session,
+    engineer_ids: List[int],
+    start_date: date,
+    days: int,
+    cities: Optional[List[str]] = None,
+    service_minutes: Optional[int] = None,
+    commit: bool = False,
+    time_limit: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Itineraries for the engineers over `days` days from `start_date`,
+    covering the open tasks not yet on a trip (optionally in some cities).
+
+    With commit, one trip per engineer is created and the planned tasks are
+    assigned to it; otherwise the plan is only returned. Raises PlanConflict,
+    saving nothing, when a planned task was taken meanwhile.
+    """
+    started = time.monotonic()
+    engineers = db.execute(select(User).where(User.id.in_(engineer_ids))).scalars().all()
+    engineers = sorted(engineers, key=lambda u: engineer_ids.index(u.id))
+    if len(engineers) != len(set(engineer_ids)):
+        raise ValueError("Unknown engineer id")
+
+    stmt = select(Task).where(Task.status.in_(OPEN_TASK_STATUSES), Task.trip_id.is_(None))
+    if cities:
+        stmt = stmt.where(Task.city.in_(cities))
+    tasks = db.execute(stmt.order_by(Task.id).limit(settings.ROUTE_MAX_TASKS + 1)).scalars().all()
+    if len(tasks) > settings.ROUTE_MAX_TASKS:
+        raise ValueError(f"More than {settings.ROUTE_MAX_TASKS} open tasks, narrow the region")
+
+    points = load_geocodes(db, [t.city for t in tasks if t.city] + [u.city for u in engineers if u.city])
+    unplanned = []
+    located: List[Tuple[Task, Tuple[float, float]]] = []
+    for task in tasks:
+        coords = _locate(points, task.city, task.location)
+        if coords is None:
+            unplanned.append({"task_id": task.id, "reason": "No coordinates for the task's city"})
+        else:
+            located.append((task, coords))
+
+    # Engineers without a known home city start at their first stop
+    homes = [_locate(points, u.city, None) for u in engineers]
+    coords = np.array([h or (0.0, 0.0) for h in homes] + [c for _, c in located]).reshape(-1, 2)
+    travel = travel_minutes(distance_matrix_km(coords))
+    for e, home in enumerate(homes):
+        if home is None:
+            travel[e, :] = 0.0
+            travel[:, e] = 0.0
+
+    count = len(engineers)
+    service = np.zeros(len(coords))
+    service[count:] = service_minutes or settings.ROUTE_SERVICE_MINUTES
+    weights = np.zeros(len(coords))
+    weights[count:] = [PRIORITY_WEIGHTS.get(t.priority, 1) for t, _ in located]
+    due_days = np.full(len(coords), np.inf)
+    due_days[count:] = [
+        (_as_date(t.due_date) - start_date).days if t.due_date else np.inf for t, _ in located
+    ]
+
+    planner = RoutePlanner(
+        travel, service, weights, due_days,
+        engineers=count, horizon=days, workday=settings.ROUTE_WORKDAY_MINUTES,
+    )
+    routes = planner.improve(
+        planner.construct(),
+        settings.ROUTE_TIME_LIMIT_SECONDS if time_limit is None else time_limit,
+    )
+
+    distances = distance_matrix_km(coords) * settings.ROUTE_DETOUR_FACTOR
+    itineraries = []
+    for e, (engineer, route) in enumerate(zip(engineers, routes)):
+        _, _, stop_days = planner.schedule(e, route)
+        by_day: Dict[int, Dict[str, Any]] = {}
+        prev = e
+        for node, day in zip(route, stop_days):
+            task = located[node - count][0]
+            if day >= days:
+                unplanned.append({"task_id": task.id, "reason": "Does not fit in the planning horizon"})
+                continue
+            plan_day = by_day.setdefault(day, {
+                "date": start_date + timedelta(days=day),
+                "stops": [],
+                "travel_km": 0.0,
+                "travel_minutes": 0.0,
+            })
+            leg_km = 0.0 if homes[e] is None and prev == e else float(distances[prev, node])
+            plan_day["travel_km"] += leg_km
+            plan_day["travel_minutes"] += float(travel[prev, node])
+            plan_day["stops"].append({
+                "task_id": task.id,
+                "title": task.title,
+                "city": task.city,
+                "location": task.location,
+                "priority": task.priority,
+                "due_date": task.due_date,
+                "late_days": max(0, int(day - due_days[node])) if np.isfinite(due_days[node]) else 0,
+            })
+            prev = node
+        plan_days = [by_day[d] for d in sorted(by_day)]
+        itineraries.append({
+            "user_id": engineer.id,
+            "full_name": engineer.full_name,
+            "start_city": engineer.city,
+            "days": plan_days,
+            "travel_km": round(sum(d["travel_km"] for d in plan_days), 1),
+            "trip_id": None,
+        })
+
+    routed = {node for route in routes for node in route}
+    for node in range(count, count + len(located)):
+        if node not in routed:
+            task = located[node - count][0]
+            unplanned.append({"task_id": task.id, "reason": "Does not fit in the planning horizon"})
+
+    if commit:
+        _save_plan(db, itineraries, tasks)
+
+    return {
+        "itineraries": itineraries,
+        "unplanned": unplanned,
+        "total_travel_km": round(sum(i["travel_km"] for i in itineraries), 1),
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+    }
+
+
+def _save_plan(db: Session, itineraries: List[Dict[str, Any]], tasks: List[Task]) -> None:
+    """
+    Create the trips and assign the tasks with one conditional UPDATE per
+    trip: a task another planner or user took since it was read is not
+    overwritten, and the whole plan is rolled back instead
+    """
+    tasks_by_id = {task.id: task for task in tasks}
+    for itinerary in itineraries:
+        if not itinerary["days"]:
+            continue
+        first, last = itinerary["days"][0], itinerary["days"][-1]
+        cities = []
+        for day in itinerary["days"]:
+            for stop in day["stops"]:
+                if stop["city"] not in cities:
+                    cities.append(stop["city"])
+        trip = Trip(
+            title=f"Маршрут {first['date']:%d.%m}–{last['date']:%d.%m}",
+            description=" → ".join(cities),
+            city=cities[0],
+            start_date=datetime.combine(first["date"], datetime.min.time()),
+            end_date=datetime.combine(last["date"], datetime.min.time()),
+            user_id=itinerary["user_id"],
+        )
+        db.add(trip)
+        db.flush()
+        task_ids = [stop["task_id"] for day in itinerary["days"] for stop in day["stops"]]
+        taken = set(db.execute(
+            update(Task)
+            .where(Task.id.in_(task_ids), Task.trip_id.is_(None), Task.status.in_(OPEN_TASK_STATUSES))
+            .values(
+                trip_id=trip.id,
+                assigned_to_id=itinerary["user_id"],
+                status=case((Task.status == "новая", "назначена"), else_=Task.status),
+                updated_at=datetime.utcnow(),
+            )
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+        if len(taken) != len(task_ids):
+            db.rollback()
+            lost = sorted(set(task_ids) - taken)
+            raise PlanConflict(f"Tasks {lost} changed while planning, plan again")
+        rows = [_assignment(tasks_by_id[task_id], trip.id, itinerary["user_id"]) for task_id in task_ids]
+        audit_bulk_rows(db, Task.__table__, rows)
+        itinerary["trip_id"] = trip.id
+    db.commit()
+    cache.invalidate_tags(Task.__tablename__, Trip.__tablename__)
+
+
+def _assignment(task: Task, trip_id: int, user_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # The task as read for planning and as the UPDATE left it, for the audit log
+    before = {"id": task.id, "trip_id": task.trip_id, "assigned_to_id": task.assigned_to_id, "status": task.status}
+    status = "назначена" if task.status == "новая" else task.status
+    return before, {"id": task.id, "trip_id": trip_id, "assigned_to_id": user_id, "status": status}
@@ -0,0 +1,262 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.pagination import Keyset
+from app.db.session import Base
+from app.models.equipment import Equipment
+from app.models.part import Part
+from app.models.report import Report
+from app.models.sync import SyncTombstone
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.equipment import EquipmentCreate, EquipmentUpdate
+from app.schemas.part import PartCreate, PartUpdate
+from app.schemas.report import ReportCreate, ReportUpdate
+from app.schemas.sync import SyncMutation
+from app.schemas.task import TaskCreate, TaskUpdate
+
+# Offline stores of the PWA and their models, in dependency order
+SYNC_ENTITIES: Dict[str, Type[Base]] = {
+    "equipment": Equipment,
+    "parts": Part,
+    "tasks": Task,
+    "reports": Report,
+}
+
+# Create/update schemas per store
+_SCHEMAS: Dict[str, Tuple[Type[BaseModel], Type[BaseModel]]] = {
+    "equipment": (EquipmentCreate, EquipmentUpdate),
+    "parts": (PartCreate, PartUpdate),
+    "tasks": (TaskCreate, TaskUpdate),
+    "reports": (ReportCreate, ReportUpdate),
+}
+
+# Stores whose rows record the creating user
+_OWNED_ENTITIES = {"tasks", "reports"}
+
+_KEYSETS = {name: Keyset(model.updated_at, model.id) for name, model in SYNC_ENTITIES.items()}
+_TOMBSTONE_KEYSET = Keyset(SyncTombstone.deleted_at, SyncTombstone.id)
+_ENTITY_BY_TABLE = {model.__tablename__: name for name, model in SYNC_ENTITIES.items()}
+
+
+class SyncConflict(Exception):
+    """
+    A queued mutation can't be applied; the whole batch is rejected
+    """
+
+    def __init__(self, index: int, detail: str) -> None:
+        super().__init__(detail)
+        self.index = index
+        self.detail = detail
+
+
+class SyncForbidden(SyncConflict):
+    """
+    The user may not apply a queued mutation; the whole batch is rejected
+    """
+
+
+@event.listens_for(Session, "before_flush")
+def _record_tombstones(session: Session, flush_context: Any, instances: Any) -> None:
+    # Only ORM deletes are seen here; bulk DELETE statements leave no trace
+    for obj in session.deleted:
+        entity = _ENTITY_BY_TABLE.get(getattr(obj, "__tablename__", None))
+        if entity is not None:
+            session.add(SyncTombstone(entity=entity, entity_id=obj.id))
+
+
+def _decode_token(token: Optional[str]) -> Dict[str, Optional[str]]:
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        cursors = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid sync token")
+    if not isinstance(cursors, dict):
+        raise ValueError("Invalid sync token")
+    return cursors
+
+
+def _encode_token(cursors: Dict[str, Optional[str]]) -> str:
+    raw = json.dumps(cursors, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def get_changes(db: Session, token: Optional[str] = None, limit: int = 500) -> Dict[str, Any]:
+    """
+    Rows changed and deleted since the sync token, per offline store.
+
+    The token holds one keyset cursor on (updated_at, id) per store plus one
+    for tombstones. Rows touched in the last SYNC_SAFETY_LAG_SECONDS are held
+    back until the next call: a transaction that stamped updated_at before
+    an earlier sync but committed after it would otherwise be skipped.
+    Without a token everything is returned, which is the initial download.
+    """
+    cursors = _decode_token(token)
+    horizon = datetime.utcnow() - timedelta(seconds=settings.SYNC_SAFETY_LAG_SECONDS)
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    deleted: Dict[str, List[int]] = {name: [] for name in SYNC_ENTITIES}
+    has_more = False
+
+    for name, model in SYNC_ENTITIES.items():
+        keyset = _KEYSETS[name]
+        table = model.__table__
+        stmt = keyset.apply(select(table).where(table.c.updated_at <= horizon), cursors.get(name), limit)
+        rows, next_cursor = keyset.page(db.execute(stmt).all(), limit)
+        changes[name] = [dict(row._mapping) for row in rows]
+        if next_cursor:
+            has_more = True
+        elif rows:
+            next_cursor = keyset.encode([rows[-1].updated_at, rows[-1].id])
+        cursors[name] = next_cursor or cursors.get(name)
+
+    tombstones_stmt = _TOMBSTONE_KEYSET.apply(
+        select(SyncTombstone).where(SyncTombstone.deleted_at <= horizon),
+        cursors.get("deleted"),
+        limit,
+    )
+    tombstones, next_cursor = _TOMBSTONE_KEYSET.page(db.execute(tombstones_stmt).scalars().all(), limit)
+    for tombstone in tombstones:
+        deleted.setdefault(tombstone.entity, []).append(tombstone.entity_id)
+    if next_cursor:
+        has_more = True
+    elif tombstones:
+        next_cursor = _TOMBSTONE_KEYSET.encode([tombstones[-1].deleted_at, tombstones[-1].id])
+    cursors["deleted"] = next_cursor or cursors.get("deleted")
+
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "next_token": _encode_token(cursors),
+        "has_more": has_more,
+    }
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Stored timestamps are naive UTC; clients send "Z" or "+00:00"
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _base_updated_at(index: int, value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return _naive_utc(value) if value else None
+    if isinstance(value, str):
+        try:
+            # fromisoformat() of Python < 3.11 doesn't take "Z"
+            parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+        except ValueError:
+            pass
+        else:
+            return _naive_utc(parsed)
+    raise SyncConflict(index, f"Invalid updated_at {value}")
+
+
+def _owns_task(db: Session, task_id: Optional[int], user: User) -> bool:
+    task = db.get(Task, task_id) if task_id is not None else None
+    return task is not None and user.id in (task.assigned_to_id, task.created_by_id)
+
+
+def _check_permission(
+    db: Session, index: int, mutation: SyncMutation, obj: Any, data: Dict[str, Any], user: User
+) -> None:
+    """
+    Same rules as the online API: equipment and parts are reference data,
+    and tasks are created and deleted by superusers only. Engineers update
+    the tasks assigned to them and write reports on those tasks.
+    """
+    if user.is_superuser:
+        return
+    store = mutation.store_name
+    if store == "tasks" and mutation.type == "UPDATE":
+        allowed = _owns_task(db, obj.id, user)
+    elif store == "reports" and mutation.type == "CREATE":
+        allowed = _owns_task(db, data.get("task_id"), user)
+    elif store == "reports":
+        allowed = obj.created_by_id == user.id
+        # Moving a report onto someone else's task is not editing one's own report
+        if allowed and "task_id" in data and data["task_id"] != obj.task_id:
+            allowed = _owns_task(db, data["task_id"], user)
+    else:
+        allowed = False
+    if not allowed:
+        target = store if obj is None else f"{store} {obj.id}"
+        raise SyncForbidden(index, f"Not allowed to {mutation.type.lower()} {target}")
+
+
+def _apply_mutation(db: Session, index: int, mutation: SyncMutation, user: User) -> Dict[str, Any]:
+    model = SYNC_ENTITIES.get(mutation.store_name)
+    if model is None:
+        raise SyncConflict(index, f"Unknown store {mutation.store_name}")
+    create_schema, update_schema = _SCHEMAS[mutation.store_name]
+    data = dict(mutation.data)
+    object_id = data.pop("id", None)
+    base_updated_at = _base_updated_at(index, mutation.base_updated_at or data.pop("updated_at", None))
+
+    if mutation.type == "CREATE":
+        _check_permission(db, index, mutation, None, data, user)
+        try:
+            values = create_schema(**data).model_dump()
+        except ValidationError as e:
+            raise SyncConflict(index, str(e))
+        obj = model(**values)
+        if mutation.store_name in _OWNED_ENTITIES:
+            obj.created_by_id = user.id
+        db.add(obj)
+        db.flush()
+        return {"client_id": mutation.client_id, "id": obj.id, "updated_at": obj.updated_at}
+
+    obj = db.get(model, object_id) if object_id is not None else None
+    if obj is None:
+        raise SyncConflict(index, f"{mutation.store_name} {object_id} not found")
+    _check_permission(db, index, mutation, obj, data, user)
+    # Optimistic check: the client edited a copy that is now outdated
+    if base_updated_at and obj.updated_at and obj.updated_at > base_updated_at:
+        raise SyncConflict(index, f"{mutation.store_name} {object_id} was changed on the server")
+
+    if mutation.type == "DELETE":
+        db.delete(obj)
+        db.flush()
+        return {"client_id": mutation.client_id, "id": object_id, "updated_at": None}
+
+    try:
+        values = update_schema(**data).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        raise SyncConflict(index, str(e))
+    for field, value in values.items():
+        setattr(obj, field, value)
+    db.flush()
+    return {"client_id": mutation.client_id, "id": obj.id, "updated_at": obj.updated_at}
+
+
+def apply_batch(db: Session, mutations: List[SyncMutation], user: User) -> List[Dict[str, Any]]:
+    """
+    Apply a queued batch of offline mutations in a single transaction.
+
+    Either every mutation is committed or, on the first conflict, none is.
+    """
+    results = []
+    try:
+        for index, mutation in enumerate(mutations):
+            try:
+                results.append(_apply_mutation(db, index, mutation, user))
+            except IntegrityError as e:
+                raise SyncConflict(index, str(e.orig))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    cache.invalidate_tags(*{SYNC_ENTITIES[m.store_name].__tablename__ for m in mutations})
+    return results
@@ -0,0 +1,79 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.sql import Select
+
+from app.db.pagination import Keyset
+from app.models.task import Task
+
+# Loading profiles: what each view serializes, fetched up front so that
+# building the response never lazy-loads per row. Many-to-one relations are
+# joined into the main query; collections get one extra IN query each.
+TASK_LOAD_PROFILES: Dict[str, Sequence[Any]] = {
+    "list": (
+        joinedload(Task.equipment),
+        joinedload(Task.assigned_to),
+        joinedload(Task.created_by),
+        joinedload(Task.trip),
+    ),
+    "detail": (
+        joinedload(Task.equipment),
+        joinedload(Task.assigned_to),
+        joinedload(Task.created_by),
+        joinedload(Task.trip),
+        selectinload(Task.reports),
+    ),
+}
+
+# Newest tasks first
+task_keyset = Keyset(Task.id, descending=True)
+
+
+def _tasks_statement(
+    cursor: Optional[str],
+    limit: int,
+    status: Optional[str] = None,
+    city: Optional[str] = None,
+    assigned_to_id: Optional[int] = None,
+    equipment_id: Optional[int] = None,
+    trip_id: Optional[int] = None,
+    profile: str = "list",
+) -> Select:
+    stmt = select(Task).options(*TASK_LOAD_PROFILES[profile])
+    if status:
+        stmt = stmt.where(Task.status == status)
+    if city:
+        stmt = stmt.where(Task.city == city)
+    if assigned_to_id is not None:
+        stmt = stmt.where(Task.assigned_to_id == assigned_to_id)
+    if equipment_id is not None:
+        stmt = stmt.where(Task.equipment_id == equipment_id)
+    if trip_id is not None:
+        stmt = stmt.where(Task.trip_id == trip_id)
+    return task_keyset.apply(stmt, cursor, limit)
+
+
+def get_task(db: Session, task_id: int, profile: str = "detail") -> Optional[Task]:
+    stmt = select(Task).options(*TASK_LOAD_PROFILES[profile]).where(Task.id == task_id)
+    return db.execute(stmt).unique().scalar_one_or_none()
+
+
+def get_tasks(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Task], Optional[str]]:
+    tasks = db.execute(_tasks_statement(cursor, limit, **filters)).unique().scalars().all()
+    return task_keyset.page(tasks, limit)
+
+
+async def get_task_async(db: AsyncSession, task_id: int, profile: str = "detail") -> Optional[Task]:
+    stmt = select(Task).options(*TASK_LOAD_PROFILES[profile]).where(Task.id == task_id)
+    return (await db.execute(stmt)).unique().scalar_one_or_none()
+
+
+async def get_tasks_async(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Task], Optional[str]]:
+    tasks = (await db.execute(_tasks_statement(cursor, limit, **filters))).unique().scalars().all()
+    return task_keyset.page(tasks, limit)
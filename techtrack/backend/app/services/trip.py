@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.sql import Select
+
+from app.db.pagination import Keyset
+from app.models.task import Task
+from app.models.trip import Trip
+
+# Loading profiles, see app.services.task. The detail view lists the trip's
+# tasks the way the task list does; Task.trip resolves from the identity map.
+TRIP_LOAD_PROFILES: Dict[str, Sequence[Any]] = {
+    "list": (joinedload(Trip.user),),
+    "detail": (
+        joinedload(Trip.user),
+        selectinload(Trip.tasks).options(
+            joinedload(Task.equipment),
+            joinedload(Task.assigned_to),
+            joinedload(Task.created_by),
+        ),
+    ),
+}
+
+# Latest trips first
+trip_keyset = Keyset(Trip.id, descending=True)
+
+
+def _trips_statement(
+    cursor: Optional[str],
+    limit: int,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    profile: str = "list",
+) -> Select:
+    stmt = select(Trip).options(*TRIP_LOAD_PROFILES[profile])
+    if user_id is not None:
+        stmt = stmt.where(Trip.user_id == user_id)
+    if status:
+        stmt = stmt.where(Trip.status == status)
+    return trip_keyset.apply(stmt, cursor, limit)
+
+
+def get_trip(db: Session, trip_id: int, profile: str = "detail") -> Optional[Trip]:
+    stmt = select(Trip).options(*TRIP_LOAD_PROFILES[profile]).where(Trip.id == trip_id)
+    return db.execute(stmt).unique().scalar_one_or_none()
+
+
+def get_trips(
+    db: Session, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Trip], Optional[str]]:
+    trips = db.execute(_trips_statement(cursor, limit, **filters)).unique().scalars().all()
+    return trip_keyset.page(trips, limit)
+
+
+async def get_trip_async(db: AsyncSession, trip_id: int, profile: str = "detail") -> Optional[Trip]:
+    stmt = select(Trip).options(*TRIP_LOAD_PROFILES[profile]).where(Trip.id == trip_id)
+    return (await db.execute(stmt)).unique().scalar_one_or_none()
+
+
+async def get_trips_async(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100, **filters: Any
+) -> Tuple[List[Trip], Optional[str]]:
+    trips = (await db.execute(_trips_statement(cursor, limit, **filters))).unique().scalars().all()
+    return trip_keyset.page(trips, limit)
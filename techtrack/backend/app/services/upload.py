@@ -0,0 +1,348 @@
+import hashlib
+import io
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import aiofiles
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.storage import storage
+from app.db.session import SessionLocal
+from app.models.upload import FileBlob, Upload
+from app.models.user import User
+from app.schemas.upload import UploadCreate
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: chunks are then only serialized within a process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def upload_temp_path(upload_id: str) -> str:
+    return os.path.join(settings.UPLOAD_TEMP_DIR, upload_id)
+
+
+class UploadBusy(Exception):
+    """
+    Another request is writing a chunk of the same upload
+    """
+
+
+@contextmanager
+def lock_upload_file(upload_id: str) -> Iterator[None]:
+    """
+    Hold the upload's temporary file exclusively while a chunk is written,
+    its offset recorded and the upload finalized.
+
+    The lock is an flock on the file, so it covers every worker process on
+    the host and the kernel drops it when its holder dies. Raises
+    UploadBusy at once when another request holds it. Offsets read before
+    taking the lock must be read again under it.
+    """
+    path = upload_temp_path(upload_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadBusy(upload_id)
+        try:
+            yield
+        finally:
+            # An empty file left behind would outlive an upload completed
+            # meanwhile; write_chunk recreates it when it is needed
+            try:
+                if os.fstat(fd).st_size == 0 and os.path.samestat(os.fstat(fd), os.stat(path)):
+                    os.unlink(path)
+            except FileNotFoundError:
+                pass
+    finally:
+        os.close(fd)
+
+
+def _expires_at() -> datetime:
+    return datetime.utcnow() + timedelta(hours=settings.UPLOAD_EXPIRY_HOURS)
+
+
+def get_upload(db: Session, upload_id: str) -> Optional[Upload]:
+    return db.get(Upload, upload_id)
+
+
+def get_uploads(
+    db: Session,
+    report_id: Optional[int] = None,
+    task_id: Optional[int] = None,
+    created_by_id: Optional[int] = None,
+    limit: int = 500,
+) -> List[Upload]:
+    """
+    Completed uploads attached to a report or task, oldest first
+    """
+    stmt = select(Upload).where(Upload.status == "complete")
+    if report_id is not None:
+        stmt = stmt.where(Upload.report_id == report_id)
+    if task_id is not None:
+        stmt = stmt.where(Upload.task_id == task_id)
+    if created_by_id is not None:
+        stmt = stmt.where(Upload.created_by_id == created_by_id)
+    return db.execute(stmt.order_by(Upload.created_at, Upload.id).limit(limit)).scalars().all()
+
+
+def get_blob(db: Session, sha256: str) -> Optional[FileBlob]:
+    return db.execute(select(FileBlob).where(FileBlob.sha256 == sha256)).scalar_one_or_none()
+
+
+def can_read_blob(db: Session, blob: FileBlob, user: User) -> bool:
+    """
+    Whether the user may download the blob: superusers always, others
+    through a completed upload of their own or one attached to a task or
+    report, which every user can see
+    """
+    if user.is_superuser:
+        return True
+    stmt = select(Upload.id).where(
+        Upload.blob_id == blob.id,
+        Upload.status == "complete",
+        or_(Upload.created_by_id == user.id, Upload.task_id.isnot(None), Upload.report_id.isnot(None)),
+    )
+    return db.execute(stmt.limit(1)).first() is not None
+
+
+def _complete(upload: Upload, blob: FileBlob) -> None:
+    upload.blob = blob
+    upload.offset = upload.length
+    upload.status = "complete"
+    upload.completed_at = datetime.utcnow()
+    upload.expires_at = None
+
+
+def create_upload(db: Session, upload_in: UploadCreate, created_by_id: int) -> Upload:
+    """
+    Start an upload. The bytes are always sent: completing from a claimed
+    checksum would hand stored content to anyone who knows its hash.
+    Duplicates are dropped once the content has arrived and been hashed.
+    """
+    if upload_in.length > settings.UPLOAD_MAX_BYTES:
+        raise ValueError(f"File is larger than {settings.UPLOAD_MAX_BYTES} bytes")
+    upload = Upload(
+        id=uuid.uuid4().hex,
+        **upload_in.model_dump(),
+        offset=0,
+        status="uploading",
+        created_by_id=created_by_id,
+        expires_at=_expires_at(),
+    )
+    db.add(upload)
+    db.commit()
+    db.refresh(upload)
+    return upload
+
+
+async def write_chunk(upload: Upload, offset: int, chunks: AsyncIterator[bytes]) -> int:
+    """
+    Stream a chunk to the upload's temporary file from `offset` and return
+    the new offset.
+
+    Memory use is one network read whatever the chunk size. When the
+    stream ends early (a dropped connection) the bytes received so far are
+    kept and the client resumes from the returned offset. Raises ValueError
+    if the chunk goes past the declared length.
+    """
+    path = upload_temp_path(upload.id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    position = offset
+    async with aiofiles.open(path, "r+b" if os.path.exists(path) else "wb") as f:
+        # Bytes past the recorded offset are from a chunk that was never acknowledged
+        await f.seek(offset)
+        await f.truncate()
+        async for data in chunks:
+            if position + len(data) > upload.length:
+                raise ValueError("Chunk goes past the upload length")
+            await f.write(data)
+            position += len(data)
+    return position
+
+
+def record_offset(db: Session, upload_id: str, old_offset: int, new_offset: int) -> bool:
+    """
+    Save the offset reached by a chunk; False if another request moved it
+    """
+    result = db.execute(
+        update(Upload)
+        .where(Upload.id == upload_id, Upload.offset == old_offset, Upload.status == "uploading")
+        .values(offset=new_offset, expires_at=_expires_at(), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return bool(result.rowcount)
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_upload(upload_id: str) -> Tuple[Upload, bool]:
+    """
+    Hash a fully received upload and move it into storage, or drop it when
+    the same content is stored already. Returns the upload and whether a
+    new blob was stored.
+
+    Blocking file work: runs in a thread with its own session.
+    """
+    db = SessionLocal()
+    try:
+        upload = db.get(Upload, upload_id)
+        if upload is None or upload.status == "complete":
+            return upload, False
+        path = upload_temp_path(upload_id)
+        if upload.length == 0 and not os.path.exists(path):
+            open(path, "wb").close()
+        sha256 = hash_file(path)
+        if upload.checksum and upload.checksum != sha256:
+            # Start over: the file was corrupted somewhere on the way
+            os.unlink(path)
+            upload.offset = 0
+            db.commit()
+            raise ValueError("Checksum mismatch, upload the file again")
+
+        created = False
+        blob = get_blob(db, sha256)
+        if blob is None:
+            blob = FileBlob(sha256=sha256, size=upload.length, content_type=upload.content_type)
+            storage.put_file(blob.storage_key, path)
+            db.add(blob)
+            try:
+                db.flush()
+                created = True
+            except IntegrityError:
+                # Stored concurrently by another upload of the same content
+                db.rollback()
+                upload = db.get(Upload, upload_id)
+                blob = get_blob(db, sha256)
+        else:
+            os.unlink(path)
+        _complete(upload, blob)
+        db.commit()
+        db.refresh(upload)
+        db.expunge_all()
+        return upload, created
+    finally:
+        db.close()
+
+
+def store_file(db: Session, chunks: Iterable[bytes], content_type: Optional[str] = None) -> FileBlob:
+    """
+    Store generated content (exports, rendered files) as a blob, or return
+    the blob already holding the same content.
+
+    The content is spooled to a temporary file while it is hashed, so
+    memory use is one chunk whatever the size.
+    """
+    path = upload_temp_path(f"generated-{uuid.uuid4().hex}")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            for data in chunks:
+                f.write(data)
+                digest.update(data)
+                size += len(data)
+        sha256 = digest.hexdigest()
+        blob = get_blob(db, sha256)
+        if blob is None:
+            blob = FileBlob(sha256=sha256, size=size, content_type=content_type)
+            storage.put_file(blob.storage_key, path)
+            db.add(blob)
+            try:
+                db.commit()
+            except IntegrityError:
+                # Stored concurrently by someone else
+                db.rollback()
+                blob = get_blob(db, sha256)
+        return blob
+    finally:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def abort_upload(db: Session, upload: Upload) -> None:
+    if upload.status == "complete":
+        raise ValueError("Upload is complete")
+    try:
+        os.unlink(upload_temp_path(upload.id))
+    except FileNotFoundError:
+        pass
+    db.delete(upload)
+    db.commit()
+
+
+def make_thumbnail(db: Session, blob_id: int) -> Dict[str, Any]:
+    """
+    JPEG preview of a stored photo, rotated by its EXIF orientation
+    """
+    # Imported on first use: Pillow is slow to import and only thumbnails need it
+    try:
+        from PIL import Image, ImageOps, UnidentifiedImageError
+    except ImportError:  # optional: only needed for photo thumbnails
+        raise RuntimeError("Thumbnails need the Pillow package")
+    blob = db.get(FileBlob, blob_id)
+    if blob is None:
+        raise ValueError(f"File {blob_id} not found")
+    size = settings.THUMBNAIL_SIZE
+    with storage.open(blob.storage_key) as f:
+        try:
+            image = Image.open(f)
+            # JPEG decoders can scale while decoding: much less work for big photos
+            image.draft("RGB", (size * 2, size * 2))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((size, size))
+        except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+            raise ValueError(f"Not a supported image: {e}")
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, "JPEG", quality=85, optimize=True)
+    key = f"thumbnails/{blob.sha256[:2]}/{blob.sha256}.jpg"
+    storage.put_bytes(key, buffer.getvalue())
+    blob.thumbnail_key = key
+    db.commit()
+    return {"blob_id": blob.id, "thumbnail_key": key, "width": image.width, "height": image.height}
+
+
+def cleanup_expired_uploads(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Drop unfinished uploads nobody resumed in time, with their partial files
+    """
+    now = now or datetime.utcnow()
+    expired = db.execute(
+        select(Upload.id).where(Upload.status == "uploading", Upload.expires_at < now)
+    ).scalars().all()
+    for upload_id in expired:
+        try:
+            os.unlink(upload_temp_path(upload_id))
+        except FileNotFoundError:
+            pass
+    if expired:
+        db.execute(
+            Upload.__table__.delete().where(Upload.id.in_(expired), Upload.status == "uploading")
+        )
+        db.commit()
+    return {"deleted": len(expired)}
@@ -1,11 +1,23 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.security import get_password_hash, verify_password
+from app.core.principal_cache import principal_cache
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.db.pagination import Keyset, estimate_count_async
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 
+# Stable ordering for paginated user lists (primary key)
+user_keyset = Keyset(User.id)
+
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
@@ -20,7 +32,7 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
 
 
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+    return db.query(User).order_by(User.id).offset(skip).limit(limit).all()
 
 
 def create_user(db: Session, user_in: UserCreate) -> User:
@@ -57,9 +69,15 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
     # Update user fields
     update_data = user_in.model_dump(exclude_unset=True)
 
-    # Handle password separately
-    if "password" in update_data and update_data["password"]:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+    # Handle password separately; resending the current one changes nothing
+    # (and is not audited as a change) unless its hash is outdated
+    password = update_data.pop("password", None)
+    if password:
+        valid, new_hash = verify_and_update_password(password, user.hashed_password)
+        if not valid:
+            update_data["hashed_password"] = get_password_hash(password)
+        elif new_hash:
+            update_data["hashed_password"] = new_hash
 
     # Update user object
     for field, value in update_data.items():
@@ -68,6 +86,7 @@ def update_user(db: Session, user: User, user_in: UserUpdate) -> User:
     db.add(user)
     db.commit()
     db.refresh(user)
+    principal_cache.invalidate(user.id)
     return user
 
 
@@ -76,6 +95,7 @@ def delete_user(db: Session, user_id: int) -> Optional[User]:
     if user:
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(user.id)
     return user
 
 
@@ -83,8 +103,14 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     user = get_user_by_username(db, username=username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    # Transparently upgrade hashes made with an outdated cost
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
     return user
 
 
@@ -93,4 +119,111 @@ def is_active_user(user: User) -> bool:
 
 
 def is_superuser(user: User) -> bool:
-    return user.is_superuser
\ No newline at end of file
+    return user.is_superuser
+
+# Async versions of the CRUD functions for endpoints using AsyncSession.
+# Password hashing runs in the hashing process pool, off the event loop.
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    result = await db.execute(select(User).where(User.id == user_id))
+    return result.scalars().first()
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+
+async def get_user_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
+
+
+async def get_users_async(
+    db: AsyncSession, cursor: Optional[str] = None, limit: int = 100
+) -> Tuple[List[User], Optional[str]]:
+    result = await db.execute(user_keyset.apply(select(User), cursor, limit))
+    return user_keyset.page(result.scalars().all(), limit)
+
+
+async def count_users_async(db: AsyncSession) -> int:
+    return await estimate_count_async(db, select(User))
+
+
+async def create_user_async(db: AsyncSession, user_in: UserCreate) -> User:
+    # Check if user with this email already exists
+    db_user = await get_user_by_email_async(db, email=user_in.email)
+    if db_user:
+        raise ValueError(f"User with email {user_in.email} already exists")
+
+    # Check if user with this username already exists
+    db_user = await get_user_by_username_async(db, username=user_in.username)
+    if db_user:
+        raise ValueError(f"User with username {user_in.username} already exists")
+
+    # Create new user
+    user = User(
+        username=user_in.username,
+        email=user_in.email,
+        hashed_password=await get_password_hash_async(user_in.password),
+        full_name=user_in.full_name,
+        position=user_in.position,
+        phone=user_in.phone,
+        city=user_in.city,
+        specialization=user_in.specialization,
+        is_active=user_in.is_active,
+        is_superuser=user_in.is_superuser,
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def update_user_async(db: AsyncSession, user: User, user_in: UserUpdate) -> User:
+    # Update user fields
+    update_data = user_in.model_dump(exclude_unset=True)
+
+    # Handle password separately; resending the current one changes nothing
+    # (and is not audited as a change) unless its hash is outdated
+    password = update_data.pop("password", None)
+    if password:
+        valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not valid:
+            update_data["hashed_password"] = await get_password_hash_async(password)
+        elif new_hash:
+            update_data["hashed_password"] = new_hash
+
+    # Update user object
+    for field, value in update_data.items():
+        setattr(user, field, value)
+
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    await principal_cache.invalidate_async(user.id)
+    return user
+
+
+async def delete_user_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    user = await get_user_by_id_async(db, user_id)
+    if user:
+        await db.delete(user)
+        await db.commit()
+        await principal_cache.invalidate_async(user.id)
+    return user
+
+
+async def authenticate_user_async(db: AsyncSession, username: str, password: str) -> Optional[User]:
+    user = await get_user_by_username_async(db, username=username)
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not valid:
+        return None
+    # Transparently upgrade hashes made with an outdated cost
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        await db.commit()
+    return user
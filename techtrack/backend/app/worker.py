@@ -0,0 +1,170 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Dict
+
+from sqlalchemy.exc import OperationalError
+from tenacity import (
+    Retrying,
+    before_sleep_log,
+    retry_if_exception_type,
+    stop_when_event_set,
+    wait_exponential,
+)
+
+from app.core.config import settings
+from app.core.security import start_password_hashing, stop_password_hashing
+from app.db import query_counter  # noqa: F401 - slow job queries are logged too
+from app.db.session import SessionLocal
+from app.services.audit import stop_audit_log
+from app.services.job_handlers import PERIODIC_JOBS
+from app.services.jobs import (
+    claim_jobs,
+    enqueue_job,
+    heartbeat_jobs,
+    recover_stale_jobs,
+    release_jobs,
+    run_job,
+)
+from app.services.report import stop_report_rendering
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Job worker: claims due jobs and runs up to `concurrency` at a time.
+
+    Every lease interval / 3 it renews the leases of its jobs, requeues the
+    jobs of dead workers and enqueues the periodic jobs. On
+    SIGTERM or SIGINT it stops claiming and waits for running jobs up to
+    JOB_SHUTDOWN_TIMEOUT_SECONDS; jobs still running then are put back in
+    the queue for another worker. A second signal skips the wait.
+    """
+
+    def __init__(self, concurrency: int, poll_seconds: float) -> None:
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job")
+        self.running: Dict[int, Future] = {}
+        self.stopping = threading.Event()
+        self.aborting = threading.Event()
+        self.wake = threading.Event()
+        self.periodic_slots: Dict[str, int] = {}
+
+    def stop(self, signum: int, frame: Any) -> None:
+        if self.stopping.is_set():
+            self.aborting.set()
+        self.stopping.set()
+        self.wake.set()
+
+    def _db(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Ride out database restarts and failovers instead of exiting
+        retrying = Retrying(
+            retry=retry_if_exception_type(OperationalError),
+            wait=wait_exponential(multiplier=0.5, max=30),
+            stop=stop_when_event_set(self.aborting),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True,
+        )
+        for attempt in retrying:
+            with attempt:
+                db = SessionLocal()
+                try:
+                    return fn(db, *args)
+                finally:
+                    db.close()
+
+    def _housekeeping(self) -> None:
+        self._db(heartbeat_jobs, self.worker_id, list(self.running))
+        self._db(recover_stale_jobs)
+        for kind, interval in PERIODIC_JOBS.items():
+            if interval <= 0:
+                continue
+            # One run per interval across all workers: the slot is the key
+            slot = int(time.time() // interval)
+            if self.periodic_slots.get(kind) != slot:
+                self._db(partial(enqueue_job, kind=kind, dedupe_key=f"{kind}:{slot}"))
+                self.periodic_slots[kind] = slot
+
+    def _reap(self) -> None:
+        for job_id, future in list(self.running.items()):
+            if future.done():
+                del self.running[job_id]
+                if future.exception() is not None:
+                    # Recording the outcome failed; the lease expires and the job is retried
+                    logger.error("Job %s crashed the runner", job_id, exc_info=future.exception())
+
+    def _submit(self, job_id: int) -> None:
+        future = self.executor.submit(run_job, job_id, self.worker_id)
+        future.add_done_callback(lambda f: self.wake.set())
+        self.running[job_id] = future
+
+    def run(self) -> None:
+        # User imports hash passwords on the hashing pool
+        start_password_hashing()
+        logger.info("Worker %s started with %s threads", self.worker_id, self.concurrency)
+        housekeeping_every = settings.JOB_LEASE_SECONDS / 3
+        last_housekeeping = 0.0
+        while not self.stopping.is_set():
+            self._reap()
+            if time.monotonic() - last_housekeeping >= housekeeping_every:
+                self._housekeeping()
+                last_housekeeping = time.monotonic()
+            free = self.concurrency - len(self.running)
+            claimed = self._db(claim_jobs, self.worker_id, free) if free else []
+            for job_id in claimed:
+                self._submit(job_id)
+            # A full batch means more jobs are probably due
+            if not free or len(claimed) < free:
+                self.wake.wait(self.poll_seconds)
+                self.wake.clear()
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        self._reap()
+        logger.info("Worker %s stopping, waiting for %s running jobs", self.worker_id, len(self.running))
+        deadline = time.monotonic() + settings.JOB_SHUTDOWN_TIMEOUT_SECONDS
+        while self.running and not self.aborting.is_set() and time.monotonic() < deadline:
+            # Leases are renewed while waiting so no other worker takes the jobs
+            remaining = deadline - time.monotonic()
+            wait(list(self.running.values()), timeout=max(0, min(settings.JOB_LEASE_SECONDS / 3, remaining)))
+            self._reap()
+            self._db(heartbeat_jobs, self.worker_id, list(self.running))
+        if self.running:
+            logger.warning("Releasing unfinished jobs %s", sorted(self.running))
+            self._db(release_jobs, self.worker_id, list(self.running))
+            # Handler threads can't be interrupted; don't wait for them
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            stop_audit_log()
+            os._exit(1)
+        self.executor.shutdown()
+        stop_password_hashing()
+        stop_report_rendering()
+        stop_audit_log()
+        logger.info("Worker %s stopped", self.worker_id)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_CONCURRENCY)
+    parser.add_argument("--poll", type=float, default=settings.JOB_POLL_SECONDS, help="Idle poll interval, seconds")
+    args = parser.parse_args()
+
+    worker = Worker(concurrency=args.concurrency, poll_seconds=args.poll)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
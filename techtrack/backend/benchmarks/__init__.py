@@ -0,0 +1,11 @@
+"""
+Benchmarks of the API hot paths.
+
+Run from techtrack/backend:
+
+    python -m benchmarks.run --database-url sqlite:///./benchmark.db --output report.json
+    python -m benchmarks.compare baseline.json report.json
+
+The app is served in process over ASGI, so the numbers cover routing,
+validation, serialization and the database, not the network or uvicorn.
+"""
@@ -0,0 +1,94 @@
+"""
+Compare two benchmark reports and fail on regressions.
+
+    python -m benchmarks.compare baseline.json report.json --threshold 0.2
+
+Exits with status 1 when a scenario's p50 or p99 latency grew, or its
+throughput fell, by more than the threshold, or when it runs more queries
+per request than before. Reports of different datasets or databases are
+refused: their numbers don't compare.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Tuple
+
+# (label, path in the scenario result, True when higher is better)
+METRICS = [
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+    ("req/s", ("throughput_rps",), True),
+]
+
+QUERY_TOLERANCE = 0.5
+
+
+def _value(result: Dict[str, Any], path: Tuple[str, ...]) -> float:
+    for key in path:
+        result = result[key]
+    return result
+
+
+def _comparable(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    problems = []
+    for section, key in (("dataset", "scale"), ("dataset", "seed"), ("environment", "database")):
+        if baseline[section][key] != current[section][key]:
+            problems.append(f"{section}.{key} differs: {baseline[section][key]} vs {current[section][key]}")
+    return problems
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Returns the table lines and the regressions found
+    """
+    lines = [f"{'scenario':<24}{'metric':<10}{'baseline':>12}{'current':>12}{'change':>10}"]
+    regressions = []
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            lines.append(f"{name:<24}(new scenario)")
+            continue
+        for label, path, higher_is_better in METRICS:
+            old, new = _value(before, path), _value(result, path)
+            change = (new - old) / old if old else 0.0
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            lines.append(f"{name:<24}{label:<10}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{flag}")
+            if flag:
+                regressions.append(f"{name}: {label} {old:.2f} -> {new:.2f} ({change:+.1%})")
+        # Cache hits make the average drift a little; a new query per request doesn't
+        if result["queries_per_request"] >= before["queries_per_request"] + QUERY_TOLERANCE:
+            regressions.append(
+                f"{name}: queries per request {before['queries_per_request']} -> {result['queries_per_request']}"
+            )
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} failed requests")
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.2, help="tolerated relative change, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    problems = _comparable(baseline, current)
+    if problems:
+        print("Reports are not comparable:\n  " + "\n  ".join(problems), file=sys.stderr)
+        sys.exit(2)
+
+    lines, regressions = compare(baseline, current, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark dataset: the synthetic data of scripts/seed_database.py at a fixed
+seed and date, so that reports of different releases are comparable.
+
+At scale 1: 1k users, 10k equipment units, 500k tasks and the trips,
+reports, parts and knowledge items that go with them.
+"""
+import os
+import sys
+from datetime import datetime
+from typing import Callable, Dict
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+
+from app.db.base import Base
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+import seed_database  # noqa: E402
+
+# Every benchmark user logs in with this password
+PASSWORD = "benchmark"
+# Fixed, so the rows don't depend on the day the dataset was made
+NOW = datetime(2024, 1, 1)
+
+CITIES = seed_database.CITIES
+TASK_STATUSES = seed_database.TASK_STATUSES
+username = seed_database.username
+
+
+def row_counts(engine: Engine) -> Dict[str, int]:
+    tables = Base.metadata.tables
+    with engine.connect() as conn:
+        return {
+            name: conn.execute(select(func.count()).select_from(tables[name])).scalar()
+            for name in seed_database.COLUMNS
+        }
+
+
+def seed(
+    engine: Engine,
+    scale: float = 1.0,
+    seed: int = 42,
+    bcrypt_rounds: int = 10,
+    progress: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """
+    Create the tables and load the dataset unless the database already holds
+    it; returns the row counts
+    """
+    expected = seed_database.dataset_counts(scale)
+    Base.metadata.create_all(bind=engine)
+    existing = row_counts(engine)
+    if all(existing[name] == count for name, count in expected.items()):
+        progress("Dataset already loaded")
+        return existing
+    if any(existing.values()):
+        raise ValueError(f"Database holds another dataset {existing}, expected {expected}: use an empty database")
+
+    seed_database.load(
+        engine, scale=scale, seed=seed, now=NOW, password=PASSWORD, bcrypt_rounds=bcrypt_rounds, progress=progress
+    )
+    return row_counts(engine)
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from typing import Callable, ContextManager, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.query_counter import QueryCounter
+from app.models.equipment import Equipment
+from app.models.report import Report
+from app.models.task import Task
+from app.models.trip import Trip
+from app.models.user import User
+from app.services.audit import audit_log
+
+API = settings.API_V1_STR
+
+# More rows than a handful, so that a per-row lazy load blows the budget
+ROWS = 12
+
+
+@pytest.fixture
+def seeded(db: Session, make_user: Callable[..., User], superuser: User) -> Dict[str, int]:
+    engineers = [make_user() for _ in range(3)]
+    equipment = [
+        Equipment(name=f"Чиллер {i}", serial_number=f"QB-{superuser.id}-{i}", city="Алматы")
+        for i in range(ROWS)
+    ]
+    db.add_all(equipment)
+    db.flush()
+    trips = [
+        Trip(title=f"Выезд {i}", city="Алматы", start_date=datetime(2024, 1, 1) + timedelta(days=i),
+             user_id=engineers[i % 3].id)
+        for i in range(ROWS)
+    ]
+    db.add_all(trips)
+    db.flush()
+    tasks = [
+        Task(title=f"ТО {i}", city="Алматы", priority="средний", created_by_id=superuser.id,
+             assigned_to_id=engineers[i % 3].id, equipment_id=equipment[i].id, trip_id=trips[i % 4].id)
+        for i in range(ROWS)
+    ]
+    db.add_all(tasks)
+    db.flush()
+    db.add_all(
+        Report(title=f"Акт {i}-{j}", type="Акт ТО", task_id=task.id, equipment_id=task.equipment_id,
+               created_by_id=task.assigned_to_id)
+        for i, task in enumerate(tasks) for j in range(2)
+    )
+    db.commit()
+    # The audit writer thread must not insert the seeding's records mid-request
+    audit_log.flush()
+    return {"task": tasks[0].id, "equipment": equipment[0].id, "trip": trips[0].id}
+
+
+# Statements per request whatever the number of rows: the ETag version
+# check where there is one, the page or row, one selectin load per collection
+@pytest.mark.parametrize("path, budget", [
+    ("/tasks/", 1),
+    ("/tasks/{task}", 2),
+    ("/equipment/", 2),
+    ("/equipment/{equipment}", 5),
+    ("/trips/", 1),
+    ("/trips/{trip}", 2),
+])
+def test_endpoint_stays_within_query_budget(
+    client: TestClient,
+    seeded: Dict[str, int],
+    query_budget: Callable[[int], ContextManager[QueryCounter]],
+    path: str,
+    budget: int,
+):
+    with query_budget(budget):
+        response = client.get(API + path.format(**seeded), params={"limit": 100})
+    assert response.status_code == 200, response.text
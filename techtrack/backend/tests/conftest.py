@@ -0,0 +1,97 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from typing import Callable, ContextManager, Iterator
+
+# Settings are read on the first import of the app: point them at a
+# throwaway SQLite database, storage and cheap password hashing beforehand
+_db_dir = tempfile.mkdtemp(prefix="techtrack-tests-")
+for _name, _value in {
+    "SQLALCHEMY_DATABASE_URI": f"sqlite:///{_db_dir}/test.db",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_USER": "postgres",
+    "POSTGRES_PASSWORD": "postgres",
+    "POSTGRES_DB": "techtrack_test",
+    "FIRST_SUPERUSER": "admin",
+    "FIRST_SUPERUSER_EMAIL": "admin@example.techtrack.kz",
+    "FIRST_SUPERUSER_PASSWORD": "admin",
+    "PASSWORD_HASH_ROUNDS": "4",
+    "PASSWORD_HASH_WORKERS": "0",
+    "STORAGE_URL": f"file://{_db_dir}/files",
+    "UPLOAD_TEMP_DIR": f"{_db_dir}/uploads",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.core.dependencies import get_current_active_user  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.query_counter import QueryCounter, assert_max_queries  # noqa: E402
+from app.db.session import SessionLocal, close_pools, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def tables() -> Iterator[None]:
+    Base.metadata.create_all(bind=engine)
+    yield
+    # Open aiosqlite connections would keep the test run from exiting
+    asyncio.run(close_pools())
+
+
+@pytest.fixture
+def db(tables: None) -> Iterator[Session]:
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db: Session) -> Callable[..., User]:
+    """
+    Create a user with a unique name; keyword arguments set model fields
+    """
+    def make(**fields: object) -> User:
+        name = f"user-{uuid.uuid4().hex[:12]}"
+        fields.setdefault("hashed_password", "-")
+        user = User(username=name, email=f"{name}@example.techtrack.kz", **fields)
+        db.add(user)
+        db.commit()
+        return user
+
+    return make
+
+
+@pytest.fixture
+def superuser(make_user: Callable[..., User]) -> User:
+    return make_user(is_superuser=True)
+
+
+@pytest.fixture
+def client(tables: None, superuser: User) -> Iterator[TestClient]:
+    """
+    API client authenticated as a superuser; the app's startup is not run
+    """
+    app.dependency_overrides[get_current_active_user] = lambda: superuser
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_current_active_user, None)
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], ContextManager[QueryCounter]]:
+    """
+    Guard against N+1 queries:
+
+        with query_budget(4):
+            client.get("/api/v1/tasks/")
+    """
+    return assert_max_queries
@@ -0,0 +1,133 @@
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.core.metrics import AUDIT_DROPPED
+from app.core.security import get_password_hash, set_bcrypt_rounds, verify_password
+from app.models.audit import AuditEvent
+from app.models.equipment import Equipment
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services import audit
+from app.services.audit import AuditLog, audit_actor, audit_log
+from app.services.bulk_import import import_equipment
+from app.services.user import update_user
+
+
+def _events(db: Session, entity: str, entity_id: int) -> List[AuditEvent]:
+    audit_log.flush()
+    stmt = select(AuditEvent).where(AuditEvent.entity == entity, AuditEvent.entity_id == entity_id)
+    return db.execute(stmt.order_by(AuditEvent.occurred_at)).scalars().all()
+
+
+def _import(db: Session, *records: Dict[str, Any]) -> Dict[str, Any]:
+    *_, progress = import_equipment(db, ((n, r, None) for n, r in enumerate(records, start=1)))
+    return progress
+
+
+def test_bulk_upsert_is_audited(db: Session, make_user: Callable[..., User]) -> None:
+    actor = make_user(is_superuser=True)
+    serial = f"SN-{uuid.uuid4().hex[:8]}"
+    token = audit_actor.set(actor.id)
+    try:
+        _import(db, {"name": "Котел", "serial_number": serial, "model": "A"})
+        equipment_id = db.execute(select(Equipment.id).where(Equipment.serial_number == serial)).scalar_one()
+        _import(db, {"name": "Котел", "serial_number": serial, "model": "B"})
+        # Nothing changed: no record
+        _import(db, {"name": "Котел", "serial_number": serial, "model": "B"})
+    finally:
+        audit_actor.reset(token)
+
+    created, updated = _events(db, "equipment", equipment_id)
+    assert (created.action, created.actor_id) == ("create", actor.id)
+    assert created.changes["serial_number"] == [None, serial]
+    assert created.changes["id"] == [None, equipment_id]
+    assert (updated.action, updated.actor_id) == ("update", actor.id)
+    assert updated.changes == {"model": ["A", "B"]}
+
+
+@pytest.fixture
+def user(db: Session, make_user: Callable[..., User]) -> User:
+    user = make_user()
+    user.hashed_password = get_password_hash("secret-1")
+    db.commit()
+    return user
+
+
+def test_same_password_is_not_a_change(db: Session, user: User) -> None:
+    update_user(db, user, UserUpdate(password="secret-1", city="Астана"))
+    event = _events(db, "users", user.id)[-1]
+    assert event.changes == {"city": [None, "Астана"]}
+
+
+def test_new_password_is_recorded_without_its_value(db: Session, user: User) -> None:
+    update_user(db, user, UserUpdate(password="secret-2"))
+    event = _events(db, "users", user.id)[-1]
+    assert event.changes == {"hashed_password": ["***", "***"]}
+
+
+def test_same_password_with_outdated_hash_is_rehashed(db: Session, user: User) -> None:
+    saved = security.pwd_context.to_dict()
+    try:
+        set_bcrypt_rounds(4)
+        user.hashed_password = get_password_hash("secret-1")
+        db.commit()
+        set_bcrypt_rounds(5)
+        update_user(db, user, UserUpdate(password="secret-1"))
+    finally:
+        security.pwd_context.load(saved)
+    db.refresh(user)
+    assert user.hashed_password.startswith("$2b$05$")
+    assert verify_password("secret-1", user.hashed_password)
+    assert _events(db, "users", user.id)[-1].changes == {"hashed_password": ["***", "***"]}
+
+
+@pytest.fixture
+def small_log(monkeypatch) -> Iterator[Tuple[AuditLog, List[int]]]:
+    writes: List[int] = []
+    monkeypatch.setattr(audit, "write_audit_events", lambda records: writes.append(len(records)))
+    log = AuditLog(flush_interval=3600, batch_size=2, max_records=3)
+    yield log, writes
+    log.stop()
+
+
+def _records(count: int) -> List[Dict[str, Any]]:
+    return [{"entity": "tasks", "entity_id": n} for n in range(count)]
+
+
+def test_full_buffer_drops_without_flushing(small_log: Tuple[AuditLog, List[int]], caplog) -> None:
+    log, writes = small_log
+    dropped = AUDIT_DROPPED._values.get((), 0)
+    log.add(_records(2))
+    log.add(_records(2))
+    log.add(_records(1))
+
+    # Writers never flush themselves, whatever the buffer holds
+    assert writes == []
+    assert (log.pending(), log.dropped) == (3, 2)
+    assert AUDIT_DROPPED._values[()] == dropped + 2
+    assert [r.levelname for r in caplog.records if "dropping" in r.message] == ["ERROR"]
+
+    assert log.flush() == 3
+    log.add(_records(1))
+    assert (writes, log.pending(), log.dropped) == ([3], 1, 2)
+
+
+def test_failed_write_keeps_records_within_the_cap(
+    small_log: Tuple[AuditLog, List[int]], monkeypatch
+) -> None:
+    log, _ = small_log
+    log.add(_records(2))
+
+    def failing(records: List[Dict[str, Any]]) -> None:
+        # More records arrive while the write is failing
+        log.add(_records(2))
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(audit, "write_audit_events", failing)
+    assert log.flush() == 0
+    assert (log.pending(), log.dropped) == (3, 1)
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from app.core.cache import Cache, RedisCacheBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def server() -> "fakeredis.FakeServer":
+    return fakeredis.FakeServer()
+
+
+def make_cache(server: "fakeredis.FakeServer", **kwargs) -> Cache:
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return Cache(RedisCacheBackend(client), namespace="test", default_ttl=60, **kwargs)
+
+
+def cache_keys(server: "fakeredis.FakeServer") -> set:
+    return set(fakeredis.FakeRedis(server=server, decode_responses=True).keys("test:*"))
+
+
+@pytest.fixture
+def cache(server) -> Iterator[Cache]:
+    yield make_cache(server)
+
+
+def test_get_set_roundtrip(cache: Cache) -> None:
+    assert cache.get("missing") is None
+    cache.set("key", {"a": [1, 2], "b": None})
+    assert cache.get("key") == {"a": [1, 2], "b": None}
+    cache.delete("key")
+    assert cache.get("key") is None
+
+
+def test_set_applies_ttl(cache: Cache) -> None:
+    cache.set("default", 1)
+    cache.set("short", 1, ttl=5)
+    client = cache.backend.client
+    assert 55 <= client.ttl("test:default") <= 60
+    assert 0 < client.ttl("test:short") <= 5
+
+
+def test_entry_expires(cache: Cache) -> None:
+    cache.set("key", 1, ttl=1)
+    time.sleep(1.1)
+    assert cache.get("key") is None
+
+
+def test_tag_invalidation(cache: Cache) -> None:
+    cache.set("tagged", 1, tags=["tasks"])
+    cache.set("other", 2, tags=["parts"])
+    cache.set("both", 3, tags=["tasks", "parts"])
+    cache.invalidate_tags("tasks")
+    assert cache.get("tagged") is None
+    assert cache.get("both") is None
+    assert cache.get("other") == 2
+    # Entries stored after the invalidation are served again
+    cache.set("tagged", 4, tags=["tasks"])
+    assert cache.get("tagged") == 4
+
+
+def test_invalidation_during_load_is_not_served(cache: Cache) -> None:
+    def load() -> int:
+        cache.invalidate_tags("tasks")
+        return 1
+
+    assert cache.get_or_set("key", load, tags=["tasks"]) == 1
+    assert cache.get("key") is None
+
+
+def test_invalidation_is_shared_between_processes(server) -> None:
+    first, second = make_cache(server), make_cache(server)
+    first.set("key", 1, tags=["tasks"])
+    assert second.get("key") == 1
+    second.invalidate_tags("tasks")
+    assert first.get("key") is None
+
+
+def test_get_or_set_loads_once_across_threads(server) -> None:
+    # One cache per pair of threads stands in for separate processes
+    caches = [make_cache(server), make_cache(server)]
+    calls = []
+    start = threading.Barrier(8)
+
+    def load() -> str:
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results = []
+
+    def worker(n: int) -> None:
+        start.wait()
+        results.append(caches[n % 2].get_or_set("key", load))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+    # The cross-process lock is released after the load
+    assert cache_keys(server) == {"test:key"}
+
+
+def test_get_or_set_async_loads_once(cache: Cache) -> None:
+    calls = []
+
+    async def load() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "value"
+
+    async def run() -> list:
+        return await asyncio.gather(*(cache.get_or_set_async("key", load) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_failed_load_releases_lock(cache: Cache) -> None:
+    def fail() -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("key", fail)
+    assert cache.get_or_set("key", lambda: 1) == 1
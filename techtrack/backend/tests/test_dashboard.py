@@ -0,0 +1,88 @@
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.dashboard import DashboardSnapshot
+from app.models.task import Task
+from app.services.dashboard import (
+    SNAPSHOT_ID,
+    _take_refresher_lock,
+    refresh_dashboard_if_needed,
+    refresh_dashboard_stats,
+)
+
+
+def _snapshot(db: Session) -> DashboardSnapshot:
+    db.expire_all()
+    return db.get(DashboardSnapshot, SNAPSHOT_ID)
+
+
+def test_task_write_marks_snapshot_stale(db: Session):
+    refresh_dashboard_stats(db)
+    assert _snapshot(db).stale is False
+
+    db.add(Task(title="Замена фильтра", city="Алматы", priority="средний", created_by_id=1))
+    db.commit()
+    assert _snapshot(db).stale is True
+
+
+def test_bulk_update_marks_snapshot_stale(db: Session):
+    refresh_dashboard_stats(db)
+    db.execute(update(Task).where(Task.city == "Нигде").values(city="Нигде"))
+    db.commit()
+    assert _snapshot(db).stale is True
+
+
+def test_rolled_back_write_leaves_snapshot_fresh(db: Session):
+    refresh_dashboard_stats(db)
+    db.add(Task(title="Отменено", city="Алматы", priority="низкий", created_by_id=1))
+    db.flush()
+    db.rollback()
+    db.commit()
+    assert _snapshot(db).stale is False
+
+
+def test_refresh_runs_once_per_staleness(db: Session):
+    refresh_dashboard_stats(db)
+    db.add(Task(title="Диагностика", city="Астана", priority="высокий", created_by_id=1))
+    db.commit()
+
+    assert refresh_dashboard_if_needed(db) is not None
+    assert refresh_dashboard_if_needed(db) is None
+    snapshot = _snapshot(db)
+    assert snapshot.stale is False
+    assert snapshot.refresh_claimed_until is None
+
+
+def test_refresh_skipped_while_another_process_holds_the_lease(db: Session):
+    refresh_dashboard_stats(db)
+    db.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.id == SNAPSHOT_ID)
+        .values(stale=True, refresh_claimed_until=datetime.utcnow() + timedelta(minutes=1))
+    )
+    db.commit()
+    assert refresh_dashboard_if_needed(db) is None
+
+    db.execute(
+        update(DashboardSnapshot)
+        .where(DashboardSnapshot.id == SNAPSHOT_ID)
+        .values(refresh_claimed_until=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.commit()
+    assert refresh_dashboard_if_needed(db) is not None
+
+
+def test_refresher_lock_is_held_by_one_process(tmp_path):
+    path = str(tmp_path / "dashboard.lock")
+    holder = _take_refresher_lock(path)
+    assert holder is not None
+    # Another open file description, as another worker would have
+    assert _take_refresher_lock(path) is None
+    os.close(holder)
+    # Taken over once the holder is gone
+    successor = _take_refresher_lock(path)
+    assert successor is not None
+    os.close(successor)
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.equipment import Equipment
+from app.models.task import Task
+from app.models.user import User
+from app.services.export import export_table
+
+
+@pytest.fixture
+def city(db: Session) -> str:
+    name = f"Город {uuid.uuid4().hex[:8]}"
+    db.add_all([
+        Equipment(name="Рентген, цифровой", serial_number=f"SN-{uuid.uuid4().hex[:8]}", city=name,
+                  notes='Сказали "срочно"\nвторая строка', installed_at=datetime(2020, 5, 1, 9, 30)),
+        Equipment(name="КТ", serial_number=f"SN-{uuid.uuid4().hex[:8]}", city=name, status="В ремонте"),
+    ])
+    db.commit()
+    return name
+
+
+def _ndjson(client: TestClient, entity: str, **params: Any) -> List[Dict[str, Any]]:
+    response = client.get(f"/api/v1/{entity}/export", params=params)
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == f'attachment; filename="{entity}.ndjson"'
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_streams_filtered_rows(client: TestClient, city: str) -> None:
+    rows = _ndjson(client, "equipment", city=city)
+    assert [row["name"] for row in rows] == ["Рентген, цифровой", "КТ"]
+    assert rows[0]["id"] < rows[1]["id"]
+    assert set(rows[0]) == {c.key for c in Equipment.__table__.columns}
+    assert rows[0]["installed_at"] == "2020-05-01T09:30:00"
+    assert rows[0]["notes"] == 'Сказали "срочно"\nвторая строка'
+
+    broken = _ndjson(client, "equipment", city=city, status="В ремонте")
+    assert [row["name"] for row in broken] == ["КТ"]
+
+
+def test_csv_header_and_escaping(client: TestClient, city: str) -> None:
+    response = client.get("/api/v1/equipment/export", params={"format": "csv", "city": city})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="equipment.csv"'
+
+    header, *rows = list(csv.reader(io.StringIO(response.text)))
+    assert header == [c.key for c in Equipment.__table__.columns]
+    records = [dict(zip(header, row)) for row in rows]
+    assert [r["name"] for r in records] == ["Рентген, цифровой", "КТ"]
+    # Commas, quotes and newlines survive the round trip
+    assert records[0]["notes"] == 'Сказали "срочно"\nвторая строка'
+    assert records[0]["installed_at"] == "2020-05-01T09:30:00"
+    assert records[1]["installed_at"] == ""
+
+
+def test_task_filters(client: TestClient, db: Session, city: str, superuser: User) -> None:
+    db.add_all([
+        Task(title="ТО", city=city, priority="средний", status="новая", created_by_id=superuser.id),
+        Task(title="Ремонт", city=city, priority="высокий", status="назначена",
+             assigned_to_id=superuser.id, created_by_id=superuser.id),
+    ])
+    db.commit()
+    assert [row["title"] for row in _ndjson(client, "tasks", city=city)] == ["ТО", "Ремонт"]
+    assigned = _ndjson(client, "tasks", city=city, assigned_to_id=superuser.id)
+    assert [row["title"] for row in assigned] == ["Ремонт"]
+    assert _ndjson(client, "tasks", city=city, status="выполнена") == []
+
+
+def test_invalid_format_and_filter(client: TestClient) -> None:
+    assert client.get("/api/v1/tasks/export", params={"format": "xlsx"}).status_code == 422
+    assert client.get("/api/v1/tasks/export", params={"status": "unknown"}).status_code == 422
+    with pytest.raises(ValueError, match="Unknown export filter"):
+        next(export_table(Task.__table__, filters={"colour": "red"}))
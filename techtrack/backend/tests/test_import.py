@@ -0,0 +1,130 @@
+import json
+import uuid
+from typing import Any, Callable, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.equipment import Equipment
+from app.models.task import Task
+from app.models.user import User
+
+
+def _import(client: TestClient, entity: str, filename: str, content: str, **params: Any) -> List[Dict[str, Any]]:
+    response = client.post(
+        f"/api/v1/{entity}/import", params=params, files={"file": (filename, content.encode(), "text/plain")}
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _serials(count: int) -> List[str]:
+    return [f"SN-{uuid.uuid4().hex[:8]}" for _ in range(count)]
+
+
+def test_csv_with_good_and_bad_rows(client: TestClient, db: Session) -> None:
+    ok, other, repeated = _serials(3)
+    content = (
+        "name,serial_number,city,year\n"
+        f"Рентген,{ok},Алматы,2015\n"
+        ",no-name,Алматы,2015\n"  # line 3: name is required
+        f"КТ,{repeated},Астана,2019\n"  # line 4: superseded in its chunk by line 5
+        f"КТ Canon,{repeated},Шымкент,2020\n"
+        f"УЗИ,{other},Астана,not-a-year\n"  # line 6
+    )
+    *partial, final = _import(client, "equipment", "fleet.csv", content, chunk_size=2)
+
+    # One progress line per chunk of two records
+    assert [p["processed"] for p in partial] == [2, 4]
+    assert (final["processed"], final["written"], final["failed"], final["skipped"]) == (5, 2, 3, 0)
+    errors = {e["line"]: e["error"] for e in partial[0]["errors"] + partial[1]["errors"] + final["errors"]}
+    assert set(errors) == {3, 4, 6}
+    assert "name" in errors[3] and "year" in errors[6]
+    assert "superseded by line 5" in errors[4]
+
+    stored = db.execute(
+        select(Equipment.serial_number, Equipment.city).where(Equipment.serial_number.in_([ok, other, repeated]))
+    ).all()
+    assert sorted(stored) == sorted([(ok, "Алматы"), (repeated, "Шымкент")])
+
+
+def test_jsonl_reports_unparsable_lines(client: TestClient, db: Session) -> None:
+    serial, = _serials(1)
+    content = "\n".join([
+        json.dumps({"name": "Монитор", "serial_number": serial}),
+        "{not json",
+        json.dumps(["a list"]),
+        "",
+        json.dumps({"name": "Без номера"}),
+    ])
+    final = _import(client, "equipment", "fleet.jsonl", content)[-1]
+    assert (final["written"], final["failed"]) == (1, 3)
+    assert [(e["line"], e["error"][:12]) for e in final["errors"]] == [
+        (2, "Invalid JSON"), (3, "Expected a J"), (5, "serial_numbe"),
+    ]
+
+
+def test_existing_serial_is_updated_in_place(client: TestClient, db: Session) -> None:
+    serial, = _serials(1)
+    existing = Equipment(name="Старое имя", serial_number=serial, city="Алматы", model="A")
+    db.add(existing)
+    db.commit()
+    created_at = existing.created_at
+
+    content = json.dumps({"name": "Новое имя", "serial_number": serial, "city": "Алматы", "model": "B"}) + "\n"
+    final = _import(client, "equipment", "fleet.ndjson", content)[-1]
+    assert (final["written"], final["failed"]) == (1, 0)
+
+    db.expire_all()
+    rows = db.execute(select(Equipment).where(Equipment.serial_number == serial)).scalars().all()
+    assert len(rows) == 1
+    updated, = rows
+    assert (updated.id, updated.created_at) == (existing.id, created_at)
+    assert (updated.name, updated.model) == ("Новое имя", "B")
+
+
+def test_format_is_required(client: TestClient) -> None:
+    response = client.post("/api/v1/equipment/import", files={"file": ("fleet.xlsx", b"", "text/plain")})
+    assert response.status_code == 400
+    assert "Unsupported import format" in response.json()["detail"]
+    # An explicit format wins over the extension
+    assert _import(client, "equipment", "fleet.xlsx", "name,serial_number\n", format="csv") == []
+
+
+def test_users_with_taken_email_are_skipped(
+    client: TestClient, db: Session, make_user: Callable[..., User]
+) -> None:
+    taken = make_user()
+    name = f"import-{uuid.uuid4().hex[:8]}"
+    content = (
+        "username,email,password,full_name\n"
+        f"{name},{name}@example.techtrack.kz,secret-1,Новый Инженер\n"
+        f"{name}-2,{taken.email},secret-2,Дубликат\n"
+        f"{name}-3,not-an-email,secret-3,Ошибка\n"
+    )
+    final = _import(client, "users", "users.csv", content)[-1]
+    assert (final["written"], final["skipped"], final["failed"]) == (1, 1, 1)
+    assert [e["line"] for e in final["errors"]] == [4]
+    user = db.execute(select(User).where(User.username == name)).scalar_one()
+    assert user.hashed_password.startswith("$2")
+
+
+def test_tasks_reference_equipment_by_serial(client: TestClient, db: Session, superuser: User) -> None:
+    serial, = _serials(1)
+    equipment = Equipment(name="МРТ", serial_number=serial)
+    db.add(equipment)
+    db.commit()
+    title = f"Импорт {uuid.uuid4().hex[:8]}"
+    content = "\n".join([
+        json.dumps({"title": title, "equipment_serial_number": serial, "priority": "высокий"}),
+        json.dumps({"title": title, "equipment_serial_number": "SN-unknown"}),
+        json.dumps({"title": title, "priority": "срочно"}),
+    ])
+    final = _import(client, "tasks", "tasks.jsonl", content)[-1]
+    assert (final["written"], final["failed"]) == (1, 2)
+    assert "Unknown equipment serial number SN-unknown" in final["errors"][0]["error"]
+
+    task = db.execute(select(Task).where(Task.title == title)).scalar_one()
+    assert (task.equipment_id, task.created_by_id, task.status) == (equipment.id, superuser.id, "новая")
@@ -0,0 +1,237 @@
+import threading
+import uuid
+from typing import Any, Callable, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.inventory import StockLevel, StockMovement, Warehouse
+from app.models.part import Part, parse_year_range
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.inventory import StockMovementCreate, StockReservationCreate, StockTransferCreate
+from app.services.inventory import (
+    StockConflict,
+    consume_reservation,
+    find_compatible_parts,
+    reconcile_stock,
+    record_movement,
+    release_reservation,
+    reserve_part,
+    transfer_stock,
+)
+
+
+@pytest.fixture
+def warehouses(db: Session) -> List[Warehouse]:
+    suffix = uuid.uuid4().hex[:8]
+    found = [Warehouse(name=f"Склад {n} {suffix}", city="Алматы") for n in range(2)]
+    db.add_all(found)
+    db.commit()
+    return found
+
+
+@pytest.fixture
+def make_part(db: Session) -> Callable[..., Part]:
+    def make(years: Any = None, equipment_type: str = "Рентген") -> Part:
+        from_year, to_year = parse_year_range(years)
+        part = Part(
+            name="Детектор", equipment_type=equipment_type, quantity=0, compatible_years=years,
+            compatible_from_year=from_year, compatible_to_year=to_year,
+        )
+        db.add(part)
+        db.commit()
+        return part
+
+    return make
+
+
+@pytest.fixture
+def part(make_part: Callable[..., Part]) -> Part:
+    return make_part()
+
+
+@pytest.fixture
+def task(db: Session, superuser: User) -> Task:
+    task = Task(title="Замена детектора", city="Алматы", priority="высокий",
+                created_by_id=superuser.id)
+    db.add(task)
+    db.commit()
+    return task
+
+
+def _receive(db: Session, part: Part, warehouse: Warehouse, quantity: int, user: User) -> StockMovement:
+    return record_movement(
+        db, StockMovementCreate(part_id=part.id, warehouse_id=warehouse.id, kind="receipt", quantity=quantity),
+        user.id,
+    )
+
+
+def _transfer(db: Session, part: Part, source: Warehouse, destination: Warehouse, quantity: int, user: User) -> Any:
+    transfer = StockTransferCreate(
+        part_id=part.id, from_warehouse_id=source.id, to_warehouse_id=destination.id, quantity=quantity
+    )
+    return transfer_stock(db, transfer, user.id)
+
+
+def _stock(db: Session, part: Part, warehouse: Warehouse) -> StockLevel:
+    db.expire_all()
+    return db.query(StockLevel).filter_by(part_id=part.id, warehouse_id=warehouse.id).one()
+
+
+def _quantity(db: Session, part: Part) -> int:
+    db.expire_all()
+    return db.get(Part, part.id).quantity
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("2012-2018", (2012, 2018)),
+        ("2015, 2017", (2015, 2017)),
+        ("2019+", (2019, None)),
+        ("с 2016 года", (2016, 2016)),
+        ("2018 - н.в.", (2018, None)),
+        ("", (None, None)),
+        (None, (None, None)),
+    ],
+)
+def test_parse_year_range(text: Any, expected: Any) -> None:
+    assert parse_year_range(text) == expected
+
+
+def test_receipt_issue_and_adjustment(db: Session, part: Part, warehouses: List[Warehouse], superuser: User) -> None:
+    store = warehouses[0]
+    movement = _receive(db, part, store, 5, superuser)
+    assert (movement.kind, movement.quantity, movement.balance) == ("receipt", 5, 5)
+
+    issue = StockMovementCreate(part_id=part.id, warehouse_id=store.id, kind="issue", quantity=2)
+    assert record_movement(db, issue, superuser.id).balance == 3
+    adjustment = StockMovementCreate(part_id=part.id, warehouse_id=store.id, kind="adjustment", quantity=-1)
+    with pytest.raises(ValueError, match="note"):
+        record_movement(db, adjustment, superuser.id)
+    assert record_movement(db, adjustment.model_copy(update={"note": "Брак"}), superuser.id).balance == 2
+    with pytest.raises(StockConflict):
+        record_movement(db, issue.model_copy(update={"quantity": 3}), superuser.id)
+
+    assert _stock(db, part, store).on_hand == 2
+    assert _quantity(db, part) == 2
+
+
+def test_transfer_moves_stock(db: Session, part: Part, warehouses: List[Warehouse], superuser: User) -> None:
+    source, destination = warehouses
+    _receive(db, part, source, 4, superuser)
+
+    out, into = _transfer(db, part, source, destination, 3, superuser)
+    assert (out.kind, out.quantity, out.balance) == ("transfer_out", -3, 1)
+    assert (into.kind, into.quantity, into.balance) == ("transfer_in", 3, 3)
+    # Stock changed hands: the part's total stays
+    assert _quantity(db, part) == 4
+
+    with pytest.raises(StockConflict):
+        _transfer(db, part, source, destination, 2, superuser)
+    with pytest.raises(ValueError, match="same"):
+        _transfer(db, part, source, source, 1, superuser)
+    assert (_stock(db, part, source).on_hand, _stock(db, part, destination).on_hand) == (1, 3)
+
+
+def test_reserved_stock_cannot_be_transferred(
+    db: Session, part: Part, warehouses: List[Warehouse], task: Task, superuser: User
+) -> None:
+    source, destination = warehouses
+    _receive(db, part, source, 2, superuser)
+    reserve_part(db, StockReservationCreate(part_id=part.id, warehouse_id=source.id, task_id=task.id, quantity=2),
+                 superuser.id)
+    with pytest.raises(StockConflict):
+        _transfer(db, part, source, destination, 1, superuser)
+
+
+def test_release_and_consume(
+    db: Session, part: Part, warehouses: List[Warehouse], task: Task, superuser: User
+) -> None:
+    store = warehouses[0]
+    _receive(db, part, store, 5, superuser)
+    reserve = StockReservationCreate(part_id=part.id, warehouse_id=store.id, task_id=task.id, quantity=2)
+
+    released = reserve_part(db, reserve, superuser.id)
+    assert _stock(db, part, store).reserved == 2
+    assert release_reservation(db, released.id).status == "released"
+    assert _stock(db, part, store).reserved == 0
+    with pytest.raises(StockConflict, match="already released"):
+        release_reservation(db, released.id)
+    with pytest.raises(StockConflict, match="already released"):
+        consume_reservation(db, released.id, superuser.id)
+
+    consumed = reserve_part(db, reserve, superuser.id)
+    assert consume_reservation(db, consumed.id, superuser.id).status == "consumed"
+    stock = _stock(db, part, store)
+    assert (stock.on_hand, stock.reserved) == (3, 0)
+    assert _quantity(db, part) == 3
+    issue = db.query(StockMovement).filter_by(reservation_id=consumed.id).one()
+    assert (issue.kind, issue.quantity, issue.task_id) == ("issue", -2, task.id)
+    with pytest.raises(StockConflict, match="already consumed"):
+        release_reservation(db, consumed.id)
+    with pytest.raises(ValueError, match="not found"):
+        release_reservation(db, 10 ** 9)
+
+
+def test_reconcile_stock(db: Session, part: Part, warehouses: List[Warehouse], superuser: User) -> None:
+    store = warehouses[0]
+    _receive(db, part, store, 3, superuser)
+    assert not [row for row in reconcile_stock(db) if row["part_id"] == part.id]
+
+    # A stock level changed behind the ledger's back
+    stock = _stock(db, part, store)
+    stock.on_hand = 7
+    db.commit()
+    mismatch = [row for row in reconcile_stock(db) if row["part_id"] == part.id]
+    assert mismatch == [{"part_id": part.id, "warehouse_id": store.id, "on_hand": 7, "ledger": 3}]
+
+
+def test_find_compatible_parts(
+    db: Session, make_part: Callable[..., Part], warehouses: List[Warehouse], superuser: User
+) -> None:
+    kind = f"Тип {uuid.uuid4().hex[:8]}"
+    ranged = make_part("2012-2018", kind)
+    open_ended = make_part("2016+", kind)
+    any_year = make_part(None, kind)
+    make_part("2012-2018", "Другое")
+    _receive(db, ranged, warehouses[0], 2, superuser)
+    _receive(db, any_year, warehouses[0], 1, superuser)
+    _receive(db, any_year, warehouses[1], 4, superuser)
+
+    def found(**kwargs: Any) -> List[Any]:
+        return [(p.id, available) for p, available in find_compatible_parts(db, kind, **kwargs)]
+
+    # Most available first, parts without stock last
+    assert found() == [(any_year.id, 5), (ranged.id, 2), (open_ended.id, 0)]
+    assert found(year=2020) == [(any_year.id, 5), (open_ended.id, 0)]
+    assert found(year=2014) == [(any_year.id, 5), (ranged.id, 2)]
+    assert found(year=2014, warehouse_id=warehouses[1].id) == [(any_year.id, 4), (ranged.id, 0)]
+    assert found(in_stock=True, year=2017) == [(any_year.id, 5), (ranged.id, 2)]
+
+
+def test_concurrent_reservations_take_the_stock_once(
+    client: TestClient, db: Session, part: Part, warehouses: List[Warehouse], task: Task, superuser: User
+) -> None:
+    store = warehouses[0]
+    _receive(db, part, store, 1, superuser)
+    body = {"part_id": part.id, "warehouse_id": store.id, "task_id": task.id, "quantity": 1}
+    start = threading.Barrier(5)
+    responses = []
+
+    def reserve() -> None:
+        start.wait()
+        responses.append(client.post("/api/v1/inventory/reservations", json=body))
+
+    threads = [threading.Thread(target=reserve) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(r.status_code for r in responses) == [201, 409, 409, 409, 409]
+    assert all("available" in r.json()["detail"] for r in responses if r.status_code == 409)
+    stock = _stock(db, part, store)
+    assert (stock.on_hand, stock.reserved) == (1, 1)
@@ -0,0 +1,61 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.storage import storage
+from app.models.equipment import Equipment
+from app.services.audit import audit_actor
+from app.services.job_handlers import JOB_HANDLERS
+from app.services.upload import get_blob, store_file
+
+
+def test_export_job_stores_file(db: Session) -> None:
+    serial = f"SN-{uuid.uuid4().hex[:8]}"
+    db.add(Equipment(name="Export me", serial_number=serial))
+    db.commit()
+
+    result = JOB_HANDLERS["exports.run"](db, {"entity": "equipment", "format": "ndjson"})
+
+    blob = get_blob(db, result["sha256"])
+    assert blob.content_type == "application/x-ndjson"
+    assert result["file_url"].endswith(blob.sha256)
+    with storage.open(blob.storage_key) as f:
+        rows = [json.loads(line) for line in f]
+    assert serial in {row["serial_number"] for row in rows}
+    assert len(rows) == len(db.execute(select(Equipment.id)).all())
+
+
+def test_import_job_reads_stored_file(db: Session, make_user) -> None:
+    serials = [f"SN-{uuid.uuid4().hex[:8]}" for _ in range(3)]
+    lines = [{"name": f"Imported {n}", "serial_number": s} for n, s in enumerate(serials)]
+    lines.append({"name": "No serial"})
+    content = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    blob = store_file(db, [content], "application/x-ndjson")
+
+    token = audit_actor.set(make_user(is_superuser=True).id)
+    try:
+        result = JOB_HANDLERS["imports.run"](
+            db, {"entity": "equipment", "sha256": blob.sha256, "format": "jsonl", "chunk_size": 2}
+        )
+    finally:
+        audit_actor.reset(token)
+
+    assert result["processed"] == 4
+    assert result["written"] == 3
+    assert [error["line"] for error in result["errors"]] == [4]
+    stored = db.execute(select(Equipment.serial_number).where(Equipment.serial_number.in_(serials)))
+    assert set(stored.scalars()) == set(serials)
+
+
+def test_import_job_rejects_unknown_file(db: Session) -> None:
+    with pytest.raises(ValueError, match="not found"):
+        JOB_HANDLERS["imports.run"](db, {"entity": "equipment", "sha256": "0" * 64})
+
+
+@pytest.mark.parametrize("payload", [{}, {"blob_id": None}, {"blob_id": "12"}])
+def test_thumbnail_job_rejects_bad_payload(db: Session, payload) -> None:
+    with pytest.raises(ValueError, match="blob_id"):
+        JOB_HANDLERS["uploads.thumbnail"](db, payload)
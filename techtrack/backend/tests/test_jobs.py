@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services.job_handlers import JOB_HANDLERS
+from app.services.jobs import (
+    claim_jobs,
+    enqueue_job,
+    heartbeat_jobs,
+    recover_stale_jobs,
+    retry_delay,
+    run_job,
+)
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def empty_queue(db: Session) -> Iterator[None]:
+    # Jobs left by other tests would be claimed or recovered too
+    db.execute(update(Job).where(Job.status.in_(("queued", "running"))).values(status="cancelled"))
+    db.commit()
+    yield
+
+
+@pytest.fixture
+def handler_calls(monkeypatch) -> List[Dict[str, Any]]:
+    calls: List[Dict[str, Any]] = []
+
+    def flaky(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+        calls.append(payload)
+        if payload.get("error") == "value":
+            raise ValueError("bad payload")
+        if payload.get("error"):
+            raise RuntimeError("service down")
+        return {"ok": True}
+
+    monkeypatch.setitem(JOB_HANDLERS, "test.flaky", flaky)
+    return calls
+
+
+def _job(db: Session, **fields: Any) -> Job:
+    fields.setdefault("run_at", NOW - timedelta(minutes=1))
+    return enqueue_job(db, "test.flaky", fields.pop("payload", {}), **fields)
+
+
+def _reload(db: Session, job: Job) -> Job:
+    db.expire_all()
+    return db.get(Job, job.id)
+
+
+def test_claim_order_and_limit(db: Session, handler_calls) -> None:
+    low = _job(db, run_at=NOW - timedelta(hours=2))
+    high_late = _job(db, priority=5, run_at=NOW - timedelta(minutes=5))
+    high_early = _job(db, priority=5, run_at=NOW - timedelta(minutes=30))
+    _job(db, priority=9, run_at=NOW + timedelta(minutes=1))  # not due yet
+
+    assert claim_jobs(db, "w1", 2, now=NOW) == [high_early.id, high_late.id]
+    assert claim_jobs(db, "w2", 5, now=NOW) == [low.id]
+    assert claim_jobs(db, "w3", 5, now=NOW) == []
+
+    claimed = _reload(db, low)
+    assert (claimed.status, claimed.locked_by, claimed.attempts) == ("running", "w2", 1)
+    assert claimed.heartbeat_at == claimed.started_at == NOW
+
+
+def test_claim_skips_locked_rows(db: Session, handler_calls, monkeypatch) -> None:
+    _job(db)
+    statements = []
+    execute = db.execute
+
+    def recording(statement: Any, *args: Any, **kwargs: Any) -> Any:
+        statements.append(statement)
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db, "execute", recording)
+    claim_jobs(db, "w1", 1, now=NOW)
+
+    select_sql = str(statements[0].compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in select_sql
+    # The update only takes rows still queued, whatever the database locked
+    update_sql = str(statements[1].compile(dialect=postgresql.dialect()))
+    assert "jobs.status = " in update_sql
+
+
+def test_failed_job_is_retried_with_backoff_then_fails(db: Session, handler_calls) -> None:
+    job = _job(db, payload={"error": "runtime"}, max_attempts=2)
+
+    assert claim_jobs(db, "w1", 1, now=NOW) == [job.id]
+    before = datetime.utcnow()
+    assert run_job(job.id, "w1") == "queued"
+    retried = _reload(db, job)
+    assert retried.locked_by is None
+    assert retried.last_error == "RuntimeError: service down"
+    base = settings.JOB_RETRY_BASE_SECONDS
+    assert before + timedelta(seconds=base) <= retried.run_at <= datetime.utcnow() + timedelta(seconds=2 * base)
+    # Not due again until the backoff has passed
+    assert claim_jobs(db, "w1", 1, now=before) == []
+
+    assert claim_jobs(db, "w2", 1, now=retried.run_at) == [job.id]
+    assert run_job(job.id, "w2") == "failed"
+    failed = _reload(db, job)
+    assert (failed.status, failed.attempts) == ("failed", 2)
+    assert failed.finished_at is not None
+    assert len(handler_calls) == 2
+
+
+def test_retry_delay_grows() -> None:
+    base = settings.JOB_RETRY_BASE_SECONDS
+    for attempt in (1, 2, 3):
+        expected = min(base * 2 ** (attempt - 1), settings.JOB_RETRY_MAX_SECONDS)
+        assert expected <= retry_delay(attempt) <= expected + base
+
+
+def test_value_error_fails_without_retry(db: Session, handler_calls) -> None:
+    job = _job(db, payload={"error": "value"})
+    claim_jobs(db, "w1", 1, now=NOW)
+    assert run_job(job.id, "w1") == "failed"
+    assert _reload(db, job).last_error == "ValueError: bad payload"
+
+
+def test_expired_lease_is_reclaimed(db: Session, handler_calls) -> None:
+    job = _job(db)
+    lease = timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    claim_jobs(db, "dead", 1, now=NOW)
+
+    # A lease still within its time is left alone
+    assert recover_stale_jobs(db, now=NOW + lease / 2)["requeued"] == 0
+    assert recover_stale_jobs(db, now=NOW + lease + timedelta(seconds=1))["requeued"] == 1
+    requeued = _reload(db, job)
+    assert (requeued.status, requeued.locked_by) == ("queued", None)
+    assert requeued.last_error == "Worker stopped heartbeating"
+
+    later = NOW + 2 * lease
+    assert claim_jobs(db, "alive", 1, now=later) == [job.id]
+    # The dead worker coming back can't renew the new lease
+    heartbeat_jobs(db, "dead", [job.id])
+    assert _reload(db, job).heartbeat_at == later
+    assert run_job(job.id, "alive") == "succeeded"
+    done = _reload(db, job)
+    assert (done.status, done.attempts, done.result) == ("succeeded", 2, {"ok": True})
+
+
+def test_expired_lease_on_last_attempt_fails(db: Session, handler_calls) -> None:
+    job = _job(db, max_attempts=1)
+    claim_jobs(db, "dead", 1, now=NOW)
+    stale = NOW + timedelta(seconds=settings.JOB_LEASE_SECONDS + 1)
+    assert recover_stale_jobs(db, now=stale)["failed"] == 1
+    assert _reload(db, job).status == "failed"
@@ -0,0 +1,25 @@
+from sqlalchemy.orm import Session
+
+from app.models.knowledge import KnowledgeItem
+from app.services.knowledge import highlight_snippet, search_knowledge
+
+
+def test_snippet_escapes_content_and_marks_matches(db: Session):
+    db.add(KnowledgeItem(
+        title="Компрессор",
+        content='Проверьте <img src=x onerror="alert(1)"> компрессор & клапан',
+        category="manual",
+        tags=["hvac"],
+        created_by_id=1,
+    ))
+    db.commit()
+
+    [hit] = search_knowledge(db, "компрессор")["items"]
+    assert "<img" not in hit["snippet"]
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt;" in hit["snippet"]
+    assert "&amp; клапан" in hit["snippet"]
+    assert "<mark>компрессор</mark>" in hit["snippet"]
+
+
+def test_highlight_snippet_without_snippet():
+    assert highlight_snippet(None) is None
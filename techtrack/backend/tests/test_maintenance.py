@@ -0,0 +1,141 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.equipment import Equipment
+from app.models.maintenance import MaintenanceRule, MaintenanceSchedule
+from app.models.user import User
+from app.services.maintenance import evaluate_schedule, run_maintenance
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+
+def _rule(**fields: Any) -> MaintenanceRule:
+    return MaintenanceRule(**{"name": "ТО", "lead_days": 14, "lead_hours": 50, "priority": "средний", **fields})
+
+
+def _evaluate(equipment: Equipment, rule: MaintenanceRule, schedule: MaintenanceSchedule = None):
+    schedule = schedule or MaintenanceSchedule()
+    return schedule, evaluate_schedule(equipment, rule, schedule, NOW)
+
+
+def test_never_serviced_unit_is_due_past_its_first_hours_interval():
+    schedule, result = _evaluate(Equipment(working_hours=9990), _rule(hours_interval=1000))
+    assert schedule.due_hours == 1000
+    assert schedule.is_due and result["in_window"]
+
+
+def test_new_unit_is_not_due_before_its_first_hours_interval():
+    schedule, result = _evaluate(Equipment(working_hours=900), _rule(hours_interval=1000))
+    assert not schedule.is_due and not result["in_window"]
+    schedule, result = _evaluate(Equipment(working_hours=960), _rule(hours_interval=1000))
+    # Within lead_hours of the interval: the task is raised, not overdue yet
+    assert not schedule.is_due and result["in_window"]
+
+
+def test_serviced_unit_counts_hours_from_the_service():
+    equipment = Equipment(working_hours=9500, last_service=NOW - timedelta(days=1))
+    rule = _rule(hours_interval=1000)
+    schedule, result = _evaluate(equipment, rule)
+    assert schedule.service_hours == 9500
+    assert schedule.due_hours == 10500
+    assert not result["in_window"]
+
+    equipment.working_hours = 10500
+    schedule, result = _evaluate(equipment, rule, schedule)
+    assert schedule.is_due and result["in_window"]
+
+
+def test_hours_usage_estimates_a_due_date():
+    equipment = Equipment(working_hours=800)
+    schedule = MaintenanceSchedule(observed_at=NOW - timedelta(days=10), observed_hours=700)
+    schedule, result = _evaluate(equipment, _rule(hours_interval=1000), schedule)
+    # 10 h a day, 200 h to go
+    assert result["due_date"] == NOW + timedelta(days=20)
+    assert result["next_check_at"] == NOW + timedelta(days=6)
+
+
+@pytest.mark.parametrize("age_days, in_window, is_due, next_check", [
+    (60, False, False, 16),   # next check when the lead time starts
+    (80, True, False, 10),    # in the lead time: next check when it is due
+    (100, True, True, None),  # overdue: nothing left to wait for
+])
+def test_days_interval(age_days, in_window, is_due, next_check):
+    equipment = Equipment(installed_at=NOW - timedelta(days=age_days))
+    schedule, result = _evaluate(equipment, _rule(days_interval=90))
+    assert schedule.due_at == NOW + timedelta(days=90 - age_days)
+    assert (result["in_window"], schedule.is_due) == (in_window, is_due)
+    assert result["next_check_at"] == (NOW + timedelta(days=next_check) if next_check else None)
+
+
+@pytest.mark.parametrize("expires_in, in_window, next_check", [
+    (40, False, 10),  # notice starts 30 days before the expiry
+    (20, True, 20),   # in the notice period until the expiry
+    (-1, False, None),
+])
+def test_warranty_notice(expires_in, in_window, next_check):
+    equipment = Equipment(warranty_expiry=NOW + timedelta(days=expires_in))
+    schedule, result = _evaluate(equipment, _rule(warranty_notice_days=30))
+    assert result["in_window"] is in_window
+    assert not schedule.is_due
+    assert result["next_check_at"] == (NOW + timedelta(days=next_check) if next_check else None)
+
+
+@pytest.fixture
+def model(db: Session, make_user: Callable[..., User]) -> str:
+    """
+    Equipment model covered by a rule of this test only
+    """
+    name = f"model-{uuid.uuid4().hex[:8]}"
+    db.add(MaintenanceRule(name="ТО", equipment_model=name, hours_interval=1000, days_interval=90,
+                           created_by_id=make_user().id))
+    db.commit()
+    return name
+
+
+def _unit(db: Session, model: str, **fields: Any) -> Equipment:
+    equipment = Equipment(name="Котел", model=model, serial_number=f"SN-{uuid.uuid4().hex[:8]}", **fields)
+    db.add(equipment)
+    db.commit()
+    return equipment
+
+
+def _schedule(db: Session, equipment: Equipment) -> MaintenanceSchedule:
+    db.expire_all()
+    return db.execute(
+        select(MaintenanceSchedule).where(MaintenanceSchedule.equipment_id == equipment.id)
+    ).scalar_one()
+
+
+def test_overdue_unit_gets_an_urgent_task_and_status(db: Session, model: str):
+    equipment = _unit(db, model, working_hours=9990, installed_at=NOW - timedelta(days=10))
+    run_maintenance(db, now=NOW)
+
+    schedule = _schedule(db, equipment)
+    assert schedule.is_due
+    assert schedule.task.priority == "высокий"
+    assert db.get(Equipment, equipment.id).status == "Требует ТО"
+
+
+def test_unit_is_checked_again_when_its_next_check_comes(db: Session, model: str):
+    equipment = _unit(db, model, working_hours=10, installed_at=NOW - timedelta(days=30))
+    run_maintenance(db, now=NOW)
+    schedule = _schedule(db, equipment)
+    assert schedule.task is None
+    # Due after 90 days, raised 14 days ahead
+    next_check = NOW + timedelta(days=46)
+    assert db.get(Equipment, equipment.id).maintenance_next_check_at == next_check
+
+    # Nothing changed and the time hasn't come: not evaluated again
+    run_maintenance(db, now=NOW + timedelta(days=45))
+    assert _schedule(db, equipment).evaluated_at == NOW
+
+    run_maintenance(db, now=next_check)
+    schedule = _schedule(db, equipment)
+    assert schedule.evaluated_at == next_check
+    assert schedule.task.due_date == NOW + timedelta(days=60)
+    assert db.get(Equipment, equipment.id).maintenance_next_check_at == NOW + timedelta(days=60)
@@ -0,0 +1,83 @@
+import os
+from typing import Iterator
+
+import pytest
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import (
+    REQUEST_DURATION,
+    REQUESTS,
+    REQUESTS_IN_PROGRESS,
+    fold_exited_worker,
+    render_metrics,
+)
+
+OTHER_PID = 2 ** 22 + 1
+LABELS = ("GET", "/test-metrics")
+
+
+@pytest.fixture
+def multiprocess_dir(tmp_path, monkeypatch) -> Iterator[str]:
+    monkeypatch.setattr(settings, "METRICS_MULTIPROCESS_DIR", str(tmp_path))
+    yield str(tmp_path)
+
+
+def _sample(text: str, name: str, labels: str = "") -> float:
+    prefix = f"{name}{labels} "
+    values = [line[len(prefix):] for line in text.splitlines() if line.startswith(prefix)]
+    assert len(values) == 1, prefix
+    return float(values[0])
+
+
+def _export_as(pid: int, monkeypatch) -> None:
+    with monkeypatch.context() as m:
+        m.setattr(os, "getpid", lambda: pid)
+        metrics.export_metrics()
+
+
+def test_scrape_adds_up_all_workers(multiprocess_dir: str, monkeypatch) -> None:
+    REQUESTS.inc(LABELS + ("200",), 2)
+    REQUEST_DURATION.observe(0.02, LABELS)
+    REQUESTS_IN_PROGRESS.inc()
+    try:
+        # Another worker with the same values
+        _export_as(OTHER_PID, monkeypatch)
+        text = render_metrics()
+    finally:
+        REQUESTS_IN_PROGRESS.inc(amount=-1)
+
+    own = dict(REQUESTS._values)[LABELS + ("200",)]
+    labels = '{method="GET",route="/test-metrics",status="200"}'
+    assert _sample(text, REQUESTS.name, labels) == 2 * own
+    count = _sample(text, f"{REQUEST_DURATION.name}_count", '{method="GET",route="/test-metrics"}')
+    assert count == 2 * sum(REQUEST_DURATION._values[LABELS][0])
+    assert _sample(text, REQUESTS_IN_PROGRESS.name) >= 2
+
+
+def test_exited_worker_keeps_its_counters_only(multiprocess_dir: str, monkeypatch) -> None:
+    REQUESTS.inc(LABELS + ("201",))
+    REQUESTS_IN_PROGRESS.inc()
+    try:
+        _export_as(OTHER_PID, monkeypatch)
+    finally:
+        REQUESTS_IN_PROGRESS.inc(amount=-1)
+    fold_exited_worker(OTHER_PID)
+    # Folding twice, or a worker that never exported, changes nothing
+    fold_exited_worker(OTHER_PID)
+    fold_exited_worker(OTHER_PID + 1)
+
+    assert sorted(os.listdir(multiprocess_dir)) == [".lock", "exited.json"]
+    text = render_metrics()
+    own = REQUESTS._values[LABELS + ("201",)]
+    assert _sample(text, REQUESTS.name, '{method="GET",route="/test-metrics",status="201"}') == 2 * own
+    # The exited worker's in-flight requests are gone
+    assert _sample(text, REQUESTS_IN_PROGRESS.name) == REQUESTS_IN_PROGRESS._values.get((), 0)
+
+
+def test_single_process_renders_own_values() -> None:
+    REQUESTS.inc(LABELS + ("204",), 3)
+    text = render_metrics()
+    assert _sample(text, REQUESTS.name, '{method="GET",route="/test-metrics",status="204"}') == (
+        REQUESTS._values[LABELS + ("204",)]
+    )
@@ -0,0 +1,45 @@
+import base64
+import json
+
+import pytest
+
+from app.db.pagination import Keyset
+from app.models.task import Task
+from app.models.user import User
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b"=").decode()
+
+
+def test_cursor_round_trip():
+    keyset = Keyset(Task.updated_at, Task.id)
+    cursor = keyset.encode(["2024-01-02T03:04:05", 42])
+    assert [v.isoformat() if hasattr(v, "isoformat") else v for v in keyset.decode(cursor)] == [
+        "2024-01-02T03:04:05", 42
+    ]
+
+
+@pytest.mark.parametrize("payload", [
+    [[]],            # a list where an int is expected
+    ["a"],           # a string where an int is expected
+    [True],          # bool is an int subclass, not a key
+    [1.5],
+    [{"id": 1}],
+    [1, 2],          # wrong length
+    "1",
+])
+def test_wrong_typed_cursor_is_rejected(payload):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        Keyset(User.id).decode(_cursor(payload))
+
+
+@pytest.mark.parametrize("payload", [[1, 1], ["not a date", 1], ["2024-01-02", "1"]])
+def test_wrong_typed_datetime_cursor_is_rejected(payload):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        Keyset(Task.updated_at, Task.id).decode(_cursor(payload))
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        Keyset(User.id).decode("%%%")
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from typing import Callable, Dict, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.core import dependencies
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services.user import delete_user, update_user
+
+
+@pytest.fixture
+def api(tables: None, monkeypatch) -> Iterator[TestClient]:
+    """
+    Client that authenticates with real tokens; counts user lookups
+    """
+    monkeypatch.setattr(principal_cache, "ttl", 60)
+    yield TestClient(app)
+
+
+@pytest.fixture
+def lookups(monkeypatch) -> List[int]:
+    calls: List[int] = []
+    lookup = dependencies.get_user_by_id_async
+
+    async def counting(db, user_id: int):
+        calls.append(user_id)
+        return await lookup(db, user_id)
+
+    monkeypatch.setattr(dependencies, "get_user_by_id_async", counting)
+    return calls
+
+
+def _auth(user: User) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
+def test_repeat_requests_are_served_from_cache(
+    api: TestClient, make_user: Callable[..., User], lookups: List[int]
+) -> None:
+    user = make_user(full_name="Инженер")
+    headers = _auth(user)
+    for _ in range(3):
+        response = api.get("/api/v1/users/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["full_name"] == "Инженер"
+    assert lookups == [user.id]
+
+    # Another token of the same user has its own entry
+    other = create_access_token(user.id, timedelta(minutes=5))
+    assert api.get("/api/v1/users/me", headers={"Authorization": f"Bearer {other}"}).status_code == 200
+    assert lookups == [user.id] * 2
+
+
+def test_cached_user_is_a_fresh_detached_instance(
+    db: Session, make_user: Callable[..., User], monkeypatch
+) -> None:
+    monkeypatch.setattr(principal_cache, "ttl", 60)
+    user = make_user(full_name="Инженер")
+    principal_cache.set(user.id, "token", user)
+    first, second = principal_cache.get(user.id, "token"), principal_cache.get(user.id, "token")
+
+    assert first is not second and first is not user
+    assert inspect(first).detached
+    assert (first.id, first.full_name, first.created_at) == (user.id, "Инженер", user.created_at)
+    # A cached principal can still be updated through another session
+    with SessionLocal() as other:
+        update_user(other, first, UserUpdate(full_name="Старший инженер"))
+    assert principal_cache.get(user.id, "token") is None
+    db.expire_all()
+    assert db.get(User, user.id).full_name == "Старший инженер"
+
+
+def test_update_user_invalidates(
+    api: TestClient, db: Session, make_user: Callable[..., User], lookups: List[int]
+) -> None:
+    user = make_user(full_name="Инженер")
+    headers = _auth(user)
+    api.get("/api/v1/users/me", headers=headers)
+
+    update_user(db, user, UserUpdate(full_name="Старший инженер"))
+    assert api.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Старший инженер"
+    # Updating yourself from a cached principal goes through the same path
+    assert api.put("/api/v1/users/me", headers=headers, json={"full_name": "Ведущий"}).status_code == 200
+    assert api.get("/api/v1/users/me", headers=headers).json()["full_name"] == "Ведущий"
+    assert lookups == [user.id] * 3
+
+
+def test_deactivated_user_is_rejected(api: TestClient, db: Session, make_user: Callable[..., User]) -> None:
+    user = make_user()
+    headers = _auth(user)
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    update_user(db, user, UserUpdate(is_active=False))
+    response = api.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Inactive user"
+
+
+def test_deleted_user_is_not_found(api: TestClient, db: Session, make_user: Callable[..., User]) -> None:
+    user = make_user()
+    headers = _auth(user)
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 200
+
+    delete_user(db, user.id)
+    assert api.get("/api/v1/users/me", headers=headers).status_code == 404
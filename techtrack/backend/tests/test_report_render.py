@@ -0,0 +1,35 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.report import build_report_context
+from app.services.report_render import render_html
+
+
+def make_report(**task_fields) -> SimpleNamespace:
+    author = SimpleNamespace(full_name="Иван Петров", username="ivan")
+    task = SimpleNamespace(
+        id=7, title="ТО", status="completed", priority="high", city="Алматы", location="Цех 2",
+        assigned_to=author, due_date=datetime(2024, 3, 1, 9, 30, 45), completed_at=None,
+        equipment=None,
+    )
+    for name, value in task_fields.items():
+        setattr(task, name, value)
+    return SimpleNamespace(
+        id=1, title="Отчет", type="Акт ТО", content="", created_at=datetime(2024, 3, 2, 14, 5, 59),
+        created_by=author, task=task, equipment=None,
+    )
+
+
+def test_datetimes_are_shown_to_the_minute() -> None:
+    context = build_report_context(make_report())
+    assert context["report"]["created_at"] == "2024-03-02 14:05"
+    assert context["task"]["due_date"] == "2024-03-01 09:30"
+    html = render_html(context).decode()
+    assert "<td>2024-03-01 09:30</td>" in html
+    assert "<td>—</td>" in html
+
+
+def test_strings_shaped_like_datetimes_are_rendered_unchanged() -> None:
+    location = "2024-03-01T09:30:45 у главного входа"
+    html = render_html(build_report_context(make_report(location=location))).decode()
+    assert f"<td>{location}</td>" in html
@@ -0,0 +1,174 @@
+import uuid
+from datetime import date, datetime
+from typing import Callable, List, Sequence
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.geocode import Geocode
+from app.models.task import Task
+from app.models.trip import Trip
+from app.models.user import User
+from app.services import route_planner
+from app.services.route_planner import (
+    KAZAKHSTAN_CITIES,
+    PlanConflict,
+    RoutePlanner,
+    distance_matrix_km,
+    plan_trips,
+)
+
+INF = float("inf")
+
+
+def line_planner(
+    positions: Sequence[float],
+    engineers: int = 1,
+    weights: Sequence[float] = (),
+    due_days: Sequence[float] = (),
+    workday: float = 1000.0,
+    service: float = 0.0,
+) -> RoutePlanner:
+    """
+    Planner over points on a line, travel time = distance; engineers first
+    """
+    x = np.array(positions, dtype=float)
+    size = len(x)
+    service_times = np.full(size, service)
+    service_times[:engineers] = 0.0
+    stop_weights = np.zeros(size)
+    stop_weights[engineers:] = list(weights) or [1] * (size - engineers)
+    due = np.full(size, INF)
+    due[engineers:] = list(due_days) or [INF] * (size - engineers)
+    return RoutePlanner(
+        np.abs(x[:, None] - x[None, :]), service_times, stop_weights, due,
+        engineers=engineers, horizon=5, workday=workday,
+    )
+
+
+def test_distance_matrix() -> None:
+    coords = np.array([KAZAKHSTAN_CITIES["Алматы"], KAZAKHSTAN_CITIES["Астана"]])
+    distances = distance_matrix_km(coords)
+    assert distances[0, 0] == distances[1, 1] == 0
+    assert distances[0, 1] == distances[1, 0]
+    assert 950 < distances[0, 1] < 1000
+
+
+def test_schedule_splits_days_and_counts_lateness() -> None:
+    planner = line_planner([0, 100, 200, 300], due_days=[0, 0, 0], workday=250, service=50)
+    travel, penalty, days = planner.schedule(0, [1, 2, 3])
+    assert travel == 300
+    # 150 minutes, then 300 overflows the day: the third stop moves on
+    assert days == [0, 1, 2]
+    assert penalty == (1 + 2) * route_planner.LATE_DAY_PENALTY_MINUTES
+
+
+def test_construct_takes_nearest_then_priority() -> None:
+    assert line_planner([0, 30, 10, 20]).construct() == [[2, 3, 1]]
+    # A high-priority stop outweighs a short drive
+    assert line_planner([0, 10, 100], weights=[1, 3]).construct() == [[2, 1]]
+
+
+def test_construct_shares_stops_between_engineers() -> None:
+    planner = line_planner([0, 1000, 10, 990, 20, 1010], engineers=2)
+    routes = planner.construct()
+    assert sorted(routes[0]) == [2, 4]
+    assert sorted(routes[1]) == [3, 5]
+
+
+def test_two_opt_uncrosses_route() -> None:
+    planner = line_planner([0, 1, 2, 3, 4])
+    assert planner.cost(0, [2, 1, 3, 4]) == 6
+    route, improved = planner._two_opt(0, [2, 1, 3, 4], deadline=INF)
+    assert (route, improved) == ([1, 2, 3, 4], True)
+    assert planner._two_opt(0, route, deadline=INF) == ([1, 2, 3, 4], False)
+
+
+def test_or_opt_moves_misplaced_stop() -> None:
+    planner = line_planner([0, 1, 2, 3, 4])
+    route, improved = planner._or_opt(0, [1, 3, 4, 2], deadline=INF)
+    assert (route, improved) == ([1, 2, 3, 4], True)
+
+
+def test_improve_never_makes_route_worse() -> None:
+    rng = np.random.default_rng(7)
+    positions = [0.0] + list(rng.uniform(0, 500, 12))
+    planner = line_planner(positions, due_days=list(rng.integers(0, 3, 12)), workday=400, service=30)
+    routes = planner.construct()
+    improved = planner.improve(routes, time_limit=5)
+    assert sorted(improved[0]) == sorted(routes[0])
+    assert planner.cost(0, improved[0]) <= planner.cost(0, routes[0])
+
+
+@pytest.fixture
+def city(db: Session) -> str:
+    name = f"Город {uuid.uuid4().hex[:8]}"
+    db.add_all([
+        Geocode(city=name, location="", latitude=43.24, longitude=76.89),
+        Geocode(city=name, location="Больница №1", latitude=43.25, longitude=76.95),
+        Geocode(city=name, location="Больница №2", latitude=43.30, longitude=76.90),
+    ])
+    db.commit()
+    return name
+
+
+@pytest.fixture
+def tasks(db: Session, city: str, superuser: User) -> List[Task]:
+    found = [
+        Task(title=f"ТО {n}", city=city, location=f"Больница №{n % 2 + 1}", priority="средний",
+             status="новая", created_by_id=superuser.id)
+        for n in range(3)
+    ]
+    db.add_all(found)
+    db.commit()
+    return found
+
+
+def _plan(db: Session, engineer: User, city: str, **kwargs) -> dict:
+    return plan_trips(db, [engineer.id], date(2024, 6, 3), 3, cities=[city], time_limit=1, **kwargs)
+
+
+def test_plan_commit_assigns_tasks(db: Session, make_user: Callable[..., User], city: str, tasks: List[Task]) -> None:
+    engineer = make_user(city=city)
+    plan = _plan(db, engineer, city, commit=True)
+
+    itinerary, = plan["itineraries"]
+    assert plan["unplanned"] == []
+    assert sorted(stop["task_id"] for day in itinerary["days"] for stop in day["stops"]) == [t.id for t in tasks]
+    db.expire_all()
+    trip = db.get(Trip, itinerary["trip_id"])
+    assert (trip.user_id, trip.start_date) == (engineer.id, datetime(2024, 6, 3))
+    for task in tasks:
+        task = db.get(Task, task.id)
+        assert (task.trip_id, task.assigned_to_id, task.status) == (trip.id, engineer.id, "назначена")
+    # Planned tasks are no longer open for planning
+    assert _plan(db, engineer, city)["itineraries"][0]["days"] == []
+
+
+def test_plan_commit_conflict_saves_nothing(
+    db: Session, make_user: Callable[..., User], city: str, tasks: List[Task], monkeypatch
+) -> None:
+    engineer, other = make_user(city=city), make_user(city=city)
+    improve = RoutePlanner.improve
+
+    def improve_while_taken(self, routes, time_limit):
+        # Another planner commits one of the tasks meanwhile
+        with SessionLocal() as other_db:
+            trip = Trip(title="Другой маршрут", city=city, user_id=other.id)
+            other_db.add(trip)
+            other_db.flush()
+            other_db.get(Task, tasks[1].id).trip_id = trip.id
+            other_db.commit()
+        return improve(self, routes, time_limit)
+
+    monkeypatch.setattr(RoutePlanner, "improve", improve_while_taken)
+    with pytest.raises(PlanConflict, match=str(tasks[1].id)):
+        _plan(db, engineer, city, commit=True)
+
+    db.expire_all()
+    assert db.execute(select(Trip.id).where(Trip.user_id == engineer.id)).first() is None
+    assert [db.get(Task, t.id).status for t in tasks] == ["новая"] * 3
+    assert db.get(Task, tasks[0].id).trip_id is None
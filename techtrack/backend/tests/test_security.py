@@ -0,0 +1,75 @@
+import uuid
+from typing import Callable, Iterator, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import calibrate_bcrypt_rounds, get_password_hash, set_bcrypt_rounds
+from app.main import app
+from app.models.user import User
+from app.services.user import authenticate_user
+
+
+def _probe_takes(milliseconds: float, monkeypatch) -> None:
+    ticks = iter([0.0, milliseconds / 1000])
+    monkeypatch.setattr(security.time, "perf_counter", lambda: next(ticks))
+
+
+@pytest.mark.parametrize(
+    "probe_ms, expected",
+    [
+        (10, 8),  # 25x under target: four doublings fit
+        (100, 5),
+        (250, 4),  # at the target already
+        (1000, 4),  # slower than the target never goes below the minimum
+        (0.01, 9),  # capped at the maximum
+    ],
+)
+def test_calibration_stays_in_bounds(probe_ms: float, expected: int, monkeypatch) -> None:
+    _probe_takes(probe_ms, monkeypatch)
+    assert calibrate_bcrypt_rounds(target_ms=250, min_rounds=4, max_rounds=9) == expected
+
+
+def _cost(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+@pytest.fixture
+def weak_user(make_user: Callable[..., User]) -> Iterator[Tuple[User, str]]:
+    """
+    A user hashed at cost 4 while new hashes use cost 5
+    """
+    saved = security.pwd_context.to_dict()
+    set_bcrypt_rounds(4)
+    password = uuid.uuid4().hex
+    user = make_user(hashed_password=get_password_hash(password))
+    set_bcrypt_rounds(5)
+    yield user, password
+    security.pwd_context.load(saved)
+
+
+def test_login_rehashes_outdated_hash(db: Session, weak_user: Tuple[User, str]) -> None:
+    user, password = weak_user
+    assert _cost(user.hashed_password) == 4
+
+    assert authenticate_user(db, user.username, "wrong") is None
+    db.refresh(user)
+    assert _cost(user.hashed_password) == 4
+
+    assert authenticate_user(db, user.username, password) is not None
+    db.refresh(user)
+    assert _cost(user.hashed_password) == 5
+    assert security.verify_password(password, user.hashed_password)
+
+
+def test_api_login_rehashes_outdated_hash(tables: None, db: Session, weak_user: Tuple[User, str]) -> None:
+    user, password = weak_user
+    response = TestClient(app).post(
+        f"{settings.API_V1_STR}/auth/login", data={"username": user.username, "password": password}
+    )
+    assert response.status_code == 200, response.text
+    db.refresh(user)
+    assert _cost(user.hashed_password) == 5
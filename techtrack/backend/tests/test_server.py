@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("gunicorn")
+
+from app import server  # noqa: E402
+from app.core import cache as cache_module  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.principal_cache import principal_cache  # noqa: E402
+
+
+@pytest.fixture
+def shared_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PRINCIPAL_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(principal_cache, "ttl", 60)
+    monkeypatch.setattr(settings, "METRICS_ENABLED", True)
+    monkeypatch.setattr(settings, "METRICS_MULTIPROCESS_DIR", str(tmp_path / "metrics"))
+
+
+def test_private_cache_disables_principal_cache(shared_settings) -> None:
+    assert isinstance(cache_module.cache.backend, cache_module.MemoryCacheBackend)
+    server._share_between_workers()
+    assert principal_cache.ttl == 0
+    assert settings.PRINCIPAL_CACHE_TTL_SECONDS == 0
+
+
+def test_shared_cache_keeps_principal_cache(shared_settings, monkeypatch) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    backend = cache_module.RedisCacheBackend(fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(cache_module.cache, "backend", backend)
+    server._share_between_workers()
+    assert principal_cache.ttl == 60
+
+
+def test_metrics_directory_is_prepared(shared_settings, tmp_path) -> None:
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    (directory / "worker-1.json").write_text("{}")
+    server._share_between_workers()
+    # Files of a previous run are dropped
+    assert list(directory.iterdir()) == []
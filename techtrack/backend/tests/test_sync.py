@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.equipment import Equipment
+from app.models.part import Part
+from app.models.task import Task
+from app.models.user import User
+from app.schemas.sync import SyncMutation
+from app.services.sync import SyncConflict, SyncForbidden, apply_batch
+
+
+def _mutation(**fields: Any) -> SyncMutation:
+    return SyncMutation.model_validate(fields)
+
+
+@pytest.fixture
+def engineer(make_user: Callable[..., User]) -> User:
+    return make_user()
+
+
+@pytest.fixture
+def admin(make_user: Callable[..., User]) -> User:
+    return make_user(is_superuser=True)
+
+
+@pytest.fixture
+def task(db: Session, admin: User, engineer: User) -> Task:
+    task = Task(title="Плановое ТО", city="Алматы", priority="средний",
+                created_by_id=admin.id, assigned_to_id=engineer.id)
+    db.add(task)
+    db.commit()
+    return task
+
+
+def _iso(value: datetime, suffix: str) -> str:
+    return value.isoformat() + suffix
+
+
+@pytest.mark.parametrize("suffix", ["Z", "+00:00"])
+def test_base_updated_at_with_utc_offset(db: Session, engineer: User, task: Task, suffix: str):
+    base = _iso(task.updated_at, suffix)
+    [result] = apply_batch(db, [_mutation(type="UPDATE", storeName="tasks", data={"id": task.id, "status": "в работе"},
+                                          base_updated_at=base)], engineer)
+    assert result["id"] == task.id
+
+
+@pytest.mark.parametrize("suffix", ["Z", "+00:00"])
+def test_data_updated_at_with_utc_offset(db: Session, engineer: User, task: Task, suffix: str):
+    data = {"id": task.id, "status": "в работе", "updated_at": _iso(task.updated_at, suffix)}
+    [result] = apply_batch(db, [_mutation(type="UPDATE", storeName="tasks", data=data)], engineer)
+    assert result["id"] == task.id
+
+
+def test_outdated_base_with_utc_offset_conflicts(db: Session, engineer: User, task: Task):
+    base = _iso(task.updated_at - timedelta(minutes=1), "Z")
+    with pytest.raises(SyncConflict, match="changed on the server"):
+        apply_batch(db, [_mutation(type="UPDATE", storeName="tasks", data={"id": task.id, "status": "в работе"},
+                                   base_updated_at=base)], engineer)
+
+
+def test_engineer_cannot_write_reference_data(db: Session, engineer: User):
+    with pytest.raises(SyncForbidden):
+        apply_batch(db, [_mutation(type="CREATE", storeName="equipment", data={"name": "Чиллер", "serial_number": "SN-chiller"})], engineer)
+    assert db.query(Equipment).filter(Equipment.name == "Чиллер").count() == 0
+
+
+def test_engineer_cannot_update_someone_elses_task(db: Session, make_user: Callable[..., User], task: Task):
+    with pytest.raises(SyncForbidden):
+        apply_batch(db, [_mutation(type="UPDATE", storeName="tasks", data={"id": task.id, "status": "отменена"})],
+                    make_user())
+
+
+def test_engineer_cannot_delete_own_task(db: Session, engineer: User, task: Task):
+    with pytest.raises(SyncForbidden):
+        apply_batch(db, [_mutation(type="DELETE", storeName="tasks", data={"id": task.id})], engineer)
+
+
+def test_engineer_reports_on_assigned_task(db: Session, engineer: User, task: Task):
+    [result] = apply_batch(db, [_mutation(type="CREATE", storeName="reports", data={
+        "title": "Акт ТО", "type": "Акт ТО", "task_id": task.id,
+    })], engineer)
+    assert result["id"]
+
+
+def test_superuser_writes_reference_data(db: Session, admin: User):
+    data = {"name": "Компрессор", "serial_number": f"SN-{admin.id}"}
+    [result] = apply_batch(db, [_mutation(type="CREATE", storeName="equipment", data=data)], admin)
+    assert db.get(Equipment, result["id"]).name == "Компрессор"
+
+
+def test_part_quantity_is_read_only(db: Session, admin: User):
+    [created] = apply_batch(db, [_mutation(type="CREATE", storeName="parts",
+                                           data={"name": "Фильтр", "article_number": "F-1", "quantity": 50})], admin)
+    part = db.get(Part, created["id"])
+    assert part.quantity == 0
+
+    apply_batch(db, [_mutation(type="UPDATE", storeName="parts",
+                               data={"id": part.id, "quantity": 99, "status": "Заказано"})], admin)
+    db.refresh(part)
+    assert part.quantity == 0
+    assert part.status == "Заказано"
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.dependencies import get_current_active_user
+from app.main import app
+from app.models.task import Task
+from app.models.upload import Upload
+from app.services.upload import UploadBusy, lock_upload_file, store_file, upload_temp_path
+
+
+def test_upload_file_lock_is_exclusive() -> None:
+    upload_id = uuid.uuid4().hex
+    with lock_upload_file(upload_id):
+        # A second open file description, as another worker process would have
+        with pytest.raises(UploadBusy):
+            with lock_upload_file(upload_id):
+                pass
+        with open(upload_temp_path(upload_id), "wb") as f:
+            f.write(b"data")
+    with lock_upload_file(upload_id):
+        pass
+    assert os.path.exists(upload_temp_path(upload_id))
+
+
+def test_upload_file_lock_leaves_no_empty_file() -> None:
+    upload_id = uuid.uuid4().hex
+    with lock_upload_file(upload_id):
+        pass
+    assert not os.path.exists(upload_temp_path(upload_id))
+
+
+@pytest.mark.parametrize("content_type, disposition", [
+    ("image/jpeg", None),
+    ("application/pdf", None),
+    ("image/svg+xml", "attachment"),
+    ("text/html", "attachment"),
+    (None, "attachment"),
+])
+def test_files_are_not_sniffed_or_opened_in_place(
+    client: TestClient, db: Session, content_type: str, disposition: str
+) -> None:
+    blob = store_file(db, [uuid.uuid4().bytes], content_type)
+    response = client.get(f"{settings.API_V1_STR}/files/{blob.sha256}")
+    assert response.status_code == 200
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers.get("content-disposition") == disposition
+
+
+def test_chunks_resume_and_complete(client: TestClient) -> None:
+    content = uuid.uuid4().bytes * 4
+    created = client.post(
+        f"{settings.API_V1_STR}/uploads/",
+        json={"filename": "notes.bin", "length": len(content)},
+    )
+    assert created.status_code == 201
+    url = created.headers["location"]
+    headers = {"Content-Type": "application/offset+octet-stream"}
+
+    first = client.patch(url, content=content[:20], headers={**headers, "Upload-Offset": "0"})
+    assert first.json()["offset"] == 20
+    stale = client.patch(url, content=content[:20], headers={**headers, "Upload-Offset": "0"})
+    assert stale.status_code == 409
+    assert stale.headers["upload-offset"] == "20"
+
+    last = client.patch(url, content=content[20:], headers={**headers, "Upload-Offset": "20"})
+    assert last.json()["status"] == "complete"
+    download = client.get(last.json()["file_url"])
+    assert download.content == content
+    assert not os.path.exists(upload_temp_path(created.json()["id"]))
+
+
+def test_no_connection_is_held_while_a_chunk_streams(client: TestClient, monkeypatch) -> None:
+    from app.api.v1.endpoints import uploads
+    from app.db.session import async_engine
+
+    checked_out = []
+
+    async def write_chunk(*args, **kwargs):
+        checked_out.append(async_engine.sync_engine.pool.checkedout())
+        return await real_write_chunk(*args, **kwargs)
+
+    real_write_chunk = uploads.write_chunk
+    monkeypatch.setattr(uploads, "write_chunk", write_chunk)
+    created = client.post(f"{settings.API_V1_STR}/uploads/", json={"filename": "a.bin", "length": 4})
+    response = client.patch(
+        created.headers["location"], content=b"data",
+        headers={"Content-Type": "application/offset+octet-stream", "Upload-Offset": "0"},
+    )
+    assert response.json()["status"] == "complete"
+    assert checked_out == [0]
+
+
+CHUNK_HEADERS = {"Content-Type": "application/offset+octet-stream", "Upload-Offset": "0"}
+
+
+def _upload(client: TestClient, content: bytes, **fields) -> dict:
+    created = client.post(
+        f"{settings.API_V1_STR}/uploads/", json={"filename": "f.bin", "length": len(content), **fields}
+    )
+    return client.patch(created.headers["location"], content=content, headers=CHUNK_HEADERS).json()
+
+
+@pytest.fixture
+def as_user(make_user):
+    """
+    Act as a new regular user for the rest of the test
+    """
+    def switch():
+        user = make_user()
+        app.dependency_overrides[get_current_active_user] = lambda: user
+        return user
+
+    return switch
+
+
+def test_known_checksum_does_not_complete_an_upload(client: TestClient, as_user) -> None:
+    content = uuid.uuid4().bytes
+    _upload(client, content)
+
+    as_user()
+    created = client.post(f"{settings.API_V1_STR}/uploads/", json={
+        "filename": "guess.bin", "length": len(content), "checksum": hashlib.sha256(content).hexdigest(),
+    })
+    assert created.json()["status"] == "uploading"
+    assert created.json()["offset"] == 0
+
+
+def test_stored_content_is_deduplicated_after_transfer(client: TestClient, db: Session) -> None:
+    content = uuid.uuid4().bytes
+    first, second = _upload(client, content), _upload(client, content)
+    assert second["status"] == "complete"
+    blob_ids = {db.get(Upload, u["id"]).blob_id for u in (first, second)}
+    assert len(blob_ids) == 1
+
+
+def test_files_are_readable_only_through_a_visible_upload(
+    client: TestClient, db: Session, as_user, superuser
+) -> None:
+    content = uuid.uuid4().bytes
+    private = _upload(client, content)
+    task = Task(title="ТО", city="Алматы", priority="средний", created_by_id=superuser.id)
+    db.add(task)
+    db.commit()
+    attached = _upload(client, uuid.uuid4().bytes, task_id=task.id)
+
+    as_user()
+    assert client.get(private["file_url"]).status_code == 404
+    assert client.get(attached["file_url"]).status_code == 200
+    # Sending the same bytes is an upload of one's own
+    mine = _upload(client, content)
+    assert mine["file_url"] == private["file_url"]
+    assert client.get(private["file_url"]).status_code == 200